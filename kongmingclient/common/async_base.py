@@ -0,0 +1,274 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+asyncio counterparts of the manager helpers in :mod:`base`.
+
+Python 3.6 or later only, the listings are asynchronous generators.
+"""
+
+import asyncio
+
+from kongmingclient.common import base
+from kongmingclient.common import exceptions
+from kongmingclient.common import utils
+
+
+class AsyncManagerMixin(object):
+    """Turn a :class:`base.Manager` into a coroutine based manager.
+
+    Mix this in front of a concrete manager: the public methods of the
+    manager keep building URLs as usual, while the request helpers they call
+    return coroutines running on an :class:`async_http.AsyncHTTPClient`.
+
+    Resources are always built as loaded, since lazy-loading an attribute
+    cannot await a request. ``iter_list()`` and ``iter_many()`` return
+    asynchronous generators, and the ``*_async`` methods return an
+    :class:`asyncio.Task` instead of running on the executor.
+    """
+
+    def _submit(self, func, *args, **kwargs):
+        return asyncio.ensure_future(func(*args, **kwargs))
+
+    async def _bulk(self, func, items, parallel=None):
+        """Await ``func`` for every item, ``parallel`` of them at once.
+
+        :param func: coroutine function taking a single item
+        :returns: :class:`base.BulkResult` in the order of ``items``
+        """
+        semaphore = asyncio.Semaphore(
+            max(1, parallel or base.DEFAULT_BULK_WORKERS))
+
+        async def _run(item):
+            async with semaphore:
+                try:
+                    return base.BulkItem(item, await func(item), None)
+                except Exception as e:
+                    return base.BulkItem(item, None, e)
+
+        return base.BulkResult(
+            await asyncio.gather(*[_run(item) for item in items]))
+
+    async def _bulk_iter(self, func, items, parallel=None):
+        """Like :meth:`_bulk` but yield each result as soon as it is done.
+
+        :class:`base.BulkItem` entries are yielded in completion order, and
+        the calls still running are cancelled if the iteration is abandoned.
+        """
+        workers = max(1, parallel or base.DEFAULT_BULK_WORKERS)
+
+        async def _run(item):
+            try:
+                return base.BulkItem(item, await func(item), None)
+            except Exception as e:
+                return base.BulkItem(item, None, e)
+
+        items = iter(items)
+        pending = set()
+        try:
+            while True:
+                for item in items:
+                    pending.add(asyncio.ensure_future(_run(item)))
+                    if len(pending) >= workers:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _list_pages(self, url, response_key=None, headers=None):
+        if headers is None:
+            headers = {}
+        while url:
+            resp, body = await self.api.get(url, headers=headers)
+            if response_key:
+                data = body.get(response_key) or []
+            else:
+                data = body
+            yield resp, data
+
+            next_url = self._next_link(body, response_key)
+            url = next_url if next_url != url else None
+
+    async def _iter(self, url, response_key=None, obj_class=None,
+                    headers=None):
+        """Asynchronously yield resources page by page."""
+        seconds = 0.0
+        size = 0
+        pages = self._list_pages(url, response_key, headers)
+        while True:
+            start = utils.now()
+            try:
+                _resp, data = await pages.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                seconds += utils.now() - start
+            for item in self._to_items(data, obj_class):
+                size += 1
+                yield item
+        # NOTE: see ManagerWithFind._list().
+        if '?' not in url:
+            self.lookup_stats.observe_list(seconds, size)
+
+    async def _list(self, url, response_key=None, obj_class=None,
+                    data=None, headers=None):
+        items = []
+        resps = []
+        start = utils.now()
+        async for resp, data in self._list_pages(url, response_key,
+                                                 headers):
+            items.extend(self._to_items(data, obj_class))
+            resps.append(resp)
+        if '?' not in url:
+            self.lookup_stats.observe_list(utils.now() - start, len(items))
+
+        return base.ListWithMeta(items, resps)
+
+    async def _delete(self, url, headers=None):
+        if headers is None:
+            headers = {}
+        resp, body = await self.api.delete(url, headers=headers)
+
+        return self.convert_into_with_meta(body, resp)
+
+    async def _send(self, method, url, data=None, response_key=None,
+                    return_raw=False, headers=None):
+        if headers is None:
+            headers = {}
+        if data:
+            resp, body = await method(url, data=data, headers=headers)
+        else:
+            resp, body = await method(url, headers=headers)
+        if return_raw:
+            if response_key:
+                body = body[response_key]
+            return self.convert_into_with_meta(body, resp)
+        if body:
+            if response_key:
+                body = body[response_key]
+            return self.resource_class(self, body, loaded=True, resp=resp)
+        return base.StrWithMeta(body or '', resp)
+
+    def _update(self, url, data, response_key=None, return_raw=False,
+                headers=None):
+        return self._send(self.api.patch, url, data, response_key,
+                          return_raw, headers)
+
+    def _update_all(self, url, data, response_key=None, return_raw=False,
+                    headers=None):
+        return self._send(self.api.put, url, data, response_key,
+                          return_raw, headers)
+
+    def _create(self, url, data=None, response_key=None, return_raw=False,
+                headers=None):
+        return self._send(self.api.post, url, data, response_key,
+                          return_raw, headers)
+
+    async def _get(self, url, response_key=None, return_raw=False,
+                   headers=None):
+        if headers is None:
+            headers = {}
+        resp, body = await self.api.get(url, headers=headers)
+        if return_raw:
+            if response_key:
+                body = body[response_key]
+            return self.convert_into_with_meta(body, resp)
+
+        if response_key:
+            body = body[response_key]
+        return self.resource_class(self, body, loaded=True, resp=resp)
+
+    async def get_many(self, ids, parallel=None, strategy=None,
+                       detailed=True):
+        """Look up many resources by ID, see :meth:`base.Manager.get_many`."""
+        ids = list(ids)
+        workers = parallel or base.DEFAULT_BULK_WORKERS
+        strategy = self._lookup_strategy(ids, workers, strategy, detailed)
+        if strategy is None:
+            return base.BulkResult([])
+        if strategy == 'list':
+            return await self._get_many_listed(ids)
+
+        async def _get(obj):
+            start = utils.now()
+            try:
+                return await self.get(obj)
+            finally:
+                self.lookup_stats.observe_get(utils.now() - start)
+
+        return await self._bulk(_get, ids, parallel=workers)
+
+    async def _get_many_listed(self, ids):
+        wanted = set(self._lookup_id(obj) for obj in ids)
+        found = {}
+        async for res in self.iter_list():
+            key = res._info.get(self.id_attr)
+            if key in wanted:
+                found[key] = res
+        return self._listed_result(ids, found)
+
+    async def ensure_loaded(self, resources, filters=None, parallel=None):
+        """Load the resources not loaded yet, see
+        :meth:`base.Manager.ensure_loaded`.
+        """
+        resources = list(resources)
+        stale = [res for res in resources if not res.is_loaded()]
+        if stale and not self.detailed_list:
+            loaded = await self._bulk(self._load, stale, parallel=parallel)
+            return self._loaded_result(resources, loaded)
+        wanted = {}
+        for res in stale:
+            wanted.setdefault(res._info.get(self.id_attr), []).append(res)
+        if wanted:
+            async for new in self.iter_list(filters=filters):
+                self._refresh_listed(wanted, new)
+                if not wanted:
+                    break
+        return self._loaded_result(resources, missing=wanted)
+
+    async def _load(self, res):
+        new = await self.get(self._lookup_id(res))
+        res._add_details(new._info)
+        res.append_request_ids(new.request_ids)
+        res.set_loaded(True)
+        return res
+
+    async def find(self, **kwargs):
+        """Find a single item with attributes matching ``**kwargs``."""
+        matches = await self.findall(**kwargs)
+        num = len(matches)
+
+        if num == 0:
+            msg = "No %s matching %s." % (self.resource_class.__name__, kwargs)
+            raise exceptions.NotFound(msg)
+        elif num > 1:
+            raise exceptions.NoUniqueMatch
+        elif self.detailed_list:
+            return matches[0]
+        else:
+            return await self.get(getattr(matches[0], self.id_attr))
+
+    async def findall(self, **kwargs):
+        """Find all items with attributes matching ``**kwargs``."""
+        filters, searches = self._split_filters(kwargs)
+        if filters:
+            listing = await self.list(filters=filters)
+        else:
+            listing = await self.list()
+        return base._filter_by(listing, searches)
@@ -0,0 +1,272 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""asyncio HTTP transport for the KongMing API (Python 3.6 or later)."""
+
+import asyncio
+import copy
+import logging
+import ssl
+
+from oslo_utils import importutils
+import requests
+from requests import structures
+from six.moves.urllib import parse
+
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import http
+from kongmingclient.common.i18n import _
+from kongmingclient.common import jsoncodec
+from kongmingclient.common import utils
+
+aiohttp = importutils.try_import('aiohttp')
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+
+class AsyncHTTPClient(object):
+    """HTTP client running on an aiohttp connection pool.
+
+    The responses handed back to the managers are plain
+    :class:`requests.Response` objects, so the error mapping in
+    :func:`exceptions.from_response`, the body decoding and the request id
+    tracking of :class:`base.RequestIdMixin` are shared with the blocking
+    client.
+
+    :param max_concurrency: maximum number of requests in flight at the same
+        time; further requests wait for a free slot.
+    :param coalesce_gets: share the response of concurrent identical GETs
+        between the coroutines sending them, each getting its own copy of
+        the body.
+    """
+
+    def __init__(self, endpoint, **kwargs):
+        if aiohttp is None:
+            raise exc.CommandError(
+                _("The aiohttp library is required for AsyncClient."))
+        self.endpoint = endpoint
+        self.endpoint_url = endpoint
+        self.auth_url = kwargs.get('auth_url')
+        self.auth_token = kwargs.get('token')
+        self.username = kwargs.get('username')
+        self.password = kwargs.get('password')
+        self.region_name = kwargs.get('region_name')
+        self.include_pass = kwargs.get('include_pass')
+        self.keystone_session = kwargs.get('session')
+        self.keystone_auth = kwargs.get('auth')
+        self.timeout = kwargs.get('timeout')
+
+        self.pool_maxsize = kwargs.get('pool_maxsize',
+                                       http.DEFAULT_POOL_MAXSIZE)
+        self.max_concurrency = kwargs.get('max_concurrency',
+                                          DEFAULT_MAX_CONCURRENCY)
+
+        self.ssl_context = None
+        if parse.urlparse(endpoint).scheme == "https":
+            if kwargs.get('insecure'):
+                self.ssl_context = False
+            else:
+                self.ssl_context = ssl.create_default_context(
+                    cafile=kwargs.get('ca_file',
+                                      http.get_system_ca_file()))
+                if kwargs.get('cert_file') and kwargs.get('key_file'):
+                    self.ssl_context.load_cert_chain(kwargs['cert_file'],
+                                                     kwargs['key_file'])
+
+        self.coalesce_gets = kwargs.get('coalesce_gets', False)
+        # coalescing key -> task of the GET in flight
+        self._inflight = {}
+
+        self._session = None
+        self._semaphore = None
+
+    @property
+    def session(self):
+        # NOTE: aiohttp sessions must be created inside a running loop, so
+        # the pool is built on first use.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize,
+                                             limit_per_host=self.pool_maxsize,
+                                             ssl=self.ssl_context)
+            timeout = aiohttp.ClientTimeout(
+                total=float(self.timeout) if self.timeout else None)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout)
+        return self._session
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        """Close the pooled connections held by this client."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def credentials_headers(self):
+        creds = {}
+        if self.username:
+            creds['X-Auth-User'] = self.username
+        if self.password:
+            creds['X-Auth-Key'] = self.password
+        return creds
+
+    def _request_headers(self, headers):
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', http.USER_AGENT)
+        if self.keystone_session is not None:
+            # NOTE: keystoneauth caches the token, this only blocks while
+            # the token is being refreshed.
+            headers.update(self.keystone_session.get_auth_headers(
+                auth=self.keystone_auth) or {})
+        elif self.auth_token:
+            headers.setdefault('X-Auth-Token', self.auth_token)
+        else:
+            headers.update(self.credentials_headers())
+        if self.auth_url:
+            headers.setdefault('X-Auth-Url', self.auth_url)
+        if self.region_name:
+            headers.setdefault('X-Region-Name', self.region_name)
+        if self.include_pass and 'X-Auth-Key' not in headers:
+            headers.update(self.credentials_headers())
+        return headers
+
+    @staticmethod
+    def _to_response(aio_resp, content):
+        resp = requests.Response()
+        resp.status_code = aio_resp.status
+        resp.reason = aio_resp.reason
+        resp.headers = structures.CaseInsensitiveDict(aio_resp.headers)
+        resp.url = str(aio_resp.url)
+        resp._content = content
+        return resp
+
+    async def _http_request(self, url, method, **kwargs):
+        headers = self._request_headers(kwargs.get('headers'))
+        redirect = kwargs.get('redirect', True)
+
+        if not parse.urlparse(url).netloc:
+            url = self.endpoint_url + url
+
+        try:
+            async with self.semaphore:
+                async with self.session.request(
+                        method, url, headers=headers,
+                        data=kwargs.get('data'),
+                        allow_redirects=False) as aio_resp:
+                    content = await aio_resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            message = (_("Error communicating with %(endpoint)s %(e)s") %
+                       {'endpoint': self.endpoint, 'e': e})
+            raise exc.ConnectionError(message=message)
+
+        resp = self._to_response(aio_resp, content)
+        LOG.debug("%(method)s %(url)s returned %(status)s",
+                  {'method': method, 'url': url, 'status': resp.status_code})
+
+        if 'X-Auth-Key' not in headers and resp.status_code == 401:
+            raise exc.AuthorizationFailure(_("Authentication failed: %s")
+                                           % resp.content)
+        elif 400 <= resp.status_code < 600:
+            raise exc.from_response(resp, method, url)
+        elif resp.status_code in (301, 302, 305):
+            if redirect:
+                location = resp.headers.get('location')
+                location = self.strip_endpoint(location)
+                resp = await self._http_request(location, method, **kwargs)
+        elif resp.status_code == 300:
+            raise exc.from_response(resp, method, url)
+
+        return resp
+
+    def strip_endpoint(self, location):
+        if location is None:
+            message = _("Location not returned with redirect")
+            raise exc.EndpointException(message=message)
+        if location.lower().startswith(self.endpoint):
+            return location[len(self.endpoint):]
+        else:
+            return location
+
+    async def json_request(self, method, url, **kwargs):
+        kwargs.setdefault('headers', {})
+        kwargs['headers'].setdefault('Content-Type', 'application/json')
+        kwargs['headers'].setdefault('Accept', 'application/json')
+
+        if 'data' in kwargs:
+            kwargs['data'] = jsoncodec.dumps(kwargs['data'])
+
+        resp = await self._http_request(url, method, **kwargs)
+        body = utils.get_response_body(resp)
+        return resp, body
+
+    async def raw_request(self, method, url, **kwargs):
+        kwargs.setdefault('headers', {})
+        kwargs['headers'].setdefault('Content-Type',
+                                     'application/octet-stream')
+        resp = await self._http_request(url, method, **kwargs)
+        body = utils.get_response_body(resp)
+        return resp, body
+
+    def head(self, url, **kwargs):
+        return self.json_request("HEAD", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        if self.coalesce_gets:
+            return self._coalesced_get(url, **kwargs)
+        return self.json_request("GET", url, **kwargs)
+
+    async def _coalesced_get(self, url, **kwargs):
+        key = (url, tuple(sorted((kwargs.get('headers') or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self.json_request("GET", url, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task: self._forget(key, task))
+        # NOTE: shielded, a waiter being cancelled must not cancel the
+        # request of the others.
+        resp, body = await asyncio.shield(task)
+        return resp, copy.deepcopy(body)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _write(self, request, method, url, **kwargs):
+        try:
+            return await request(method, url, **kwargs)
+        finally:
+            self._inflight.clear()
+
+    def post(self, url, **kwargs):
+        return self._write(self.json_request, "POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._write(self.json_request, "PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._write(self.raw_request, "DELETE", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._write(self.json_request, "PATCH", url, **kwargs)
+
+
+def _construct_async_http_client(endpoint=None, **kwargs):
+    kwargs.pop('endpoint_type', None)
+    return AsyncHTTPClient(endpoint, **kwargs)
@@ -16,12 +16,99 @@ Base utilities to build API operation managers and objects on top of.
 """
 
 import abc
+import collections
+from concurrent import futures
 import copy
+import logging
+import math
+import threading
 
 from requests import Response
 import six
+from six.moves.urllib import parse
 
+from kongmingclient.common import context
 from kongmingclient.common import exceptions
+from kongmingclient.common import jsonstream
+from kongmingclient.common import utils
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BULK_WORKERS = 8
+
+# NOTE: to_dict() takes a ``copy`` argument shadowing the module.
+_deepcopy = copy.deepcopy
+
+# (resource class name, attribute) -> number of lazy loads it triggered
+_lazy_loads = collections.Counter()
+_lazy_loads_lock = threading.Lock()
+
+
+def lazy_load_counts():
+    """Return the number of lazy loads per (resource class, attribute).
+
+    Each lazy load is a GET sent because a missing attribute was read on a
+    resource which was not loaded, e.g. one returned by a create or update
+    call. Use :meth:`ManagerWithFind.ensure_loaded` on the paths showing up
+    here, or build the client with ``lazy_load=False``.
+    """
+    with _lazy_loads_lock:
+        return dict(_lazy_loads)
+
+
+def reset_lazy_load_counts():
+    with _lazy_loads_lock:
+        _lazy_loads.clear()
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor():
+    """Return the executor shared by the managers built without one."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = futures.ThreadPoolExecutor(
+                max_workers=DEFAULT_BULK_WORKERS)
+        return _default_executor
+
+
+def async_variant(name):
+    """Build the ``<name>_async`` variant of the manager method ``name``.
+
+    The variant takes the same arguments, runs the method on the executor
+    of the manager, in the request context of the caller, and returns a
+    :class:`concurrent.futures.Future`.
+    """
+    def _async(self, *args, **kwargs):
+        return self._submit(getattr(self, name), *args, **kwargs)
+
+    _async.__name__ = '%s_async' % name
+    _async.__doc__ = ("Like :meth:`%s`, returning a "
+                      ":class:`concurrent.futures.Future` of its result."
+                      % name)
+    return _async
+
+
+def _lazy_load(resource, k):
+    """Load ``resource`` because its attribute ``k`` is missing.
+
+    :raises AttributeError: if the manager of the resource has lazy loading
+        disabled
+    """
+    name = type(resource).__name__
+    if not getattr(resource.manager, 'lazy_load', True):
+        # NOTE: AttributeError so that hasattr() keeps working.
+        raise AttributeError(
+            "%s has no attribute '%s' and lazy loading is disabled" %
+            (name, k))
+    with _lazy_loads_lock:
+        _lazy_loads[(name, k)] += 1
+    LOG.debug("Lazy loading %(resource)s to read its '%(attr)s' attribute",
+              {'resource': name, 'attr': k})
+    resource.get()
 
 
 def getid(obj):
@@ -43,32 +130,126 @@ class Manager(object):
     and provide CRUD operations for them.
     """
     resource_class = None
-
-    def __init__(self, api):
+    # Lighter CompactResource variant of resource_class, used instead of it
+    # when the manager is built with compact=True.
+    compact_resource_class = None
+    # Attribute identifying the resources, passed to get().
+    id_attr = 'uuid'
+
+    def __init__(self, api, compact=False, lazy_load=True, executor=None):
+        """:param lazy_load: whether reading a missing attribute of a
+            resource which is not loaded fetches it, otherwise
+            AttributeError is raised
+        :param executor: :class:`concurrent.futures.Executor` running the
+            ``*_async`` methods, a shared bounded thread pool by default
+        """
         self.api = api
+        self.lazy_load = lazy_load
+        self._executor = executor
+        if compact and self.compact_resource_class is not None:
+            self.resource_class = self.compact_resource_class
 
-    def _list(self, url, response_key=None, obj_class=None,
-              data=None, headers=None):
-
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = _get_default_executor()
+        return self._executor
+
+    def _submit(self, func, *args, **kwargs):
+        """Run ``func`` in the background in the request context."""
+        return self.executor.submit(context.bind(func), *args, **kwargs)
+
+    @staticmethod
+    def _build_query(url, params=None):
+        """Append ``params`` to ``url`` as a query string."""
+        params = dict((k, v) for k, v in (params or {}).items()
+                      if v is not None)
+        if not params:
+            return url
+        return '%s?%s' % (url, parse.urlencode(sorted(params.items())))
+
+    @staticmethod
+    def _next_link(body, response_key=None):
+        """Return the URL of the next page referenced by ``body``, if any."""
+        if not isinstance(body, dict):
+            return None
+        if body.get('next'):
+            return body['next']
+        for link in body.get('%s_links' % response_key) or []:
+            if link.get('rel') == 'next':
+                return link.get('href')
+        return None
+
+    def _list_pages(self, url, response_key=None, headers=None):
+        """Yield ``(resp, data)`` for every page, following next links."""
         if headers is None:
             headers = {}
-        resp, body = self.api.get(url, headers=headers)
+        while url:
+            resp, body = self.api.get(url, headers=headers)
+            if response_key:
+                data = body.get(response_key) or []
+            else:
+                data = body
+            yield resp, data
 
+            next_url = self._next_link(body, response_key)
+            url = next_url if next_url != url else None
+
+    def _to_items(self, data, obj_class=None):
         if obj_class is None:
             obj_class = self.resource_class
-
-        if response_key:
-            if response_key not in body:
-                body[response_key] = []
-            data = body[response_key]
-        else:
-            data = body
         if all([isinstance(res, six.string_types) for res in data]):
-            items = data
-        else:
-            items = [obj_class(self, res, loaded=True) for res in data if res]
+            return data
+        return [obj_class(self, res, loaded=True) for res in data if res]
+
+    def _stream_pages(self, url, response_key, headers=None):
+        """Like :meth:`_list_pages`, decoding the items as they arrive.
+
+        ``data`` is a :class:`jsonstream.ArrayStream` over the items of the
+        page, the response is only released once they have been read.
+        """
+        if headers is None:
+            headers = {}
+        while url:
+            resp = self.api.get_stream(url, headers=headers)
+            try:
+                stream = jsonstream.iter_response(resp, response_key)
+                yield resp, stream
+                # NOTE: the pagination links may follow the items.
+                for _item in stream:
+                    pass
+            finally:
+                resp.close()
+
+            next_url = self._next_link(stream.rest, response_key)
+            url = next_url if next_url != url else None
+
+    def _iter(self, url, response_key=None, obj_class=None, headers=None):
+        """Yield resources page by page, following next links.
+
+        When the API client can stream responses, the pages are decoded
+        incrementally so memory use does not grow with the page size.
+        """
+        if response_key and hasattr(self.api, 'get_stream'):
+            for _resp, data in self._stream_pages(url, response_key,
+                                                  headers):
+                for res in data:
+                    for item in self._to_items([res], obj_class):
+                        yield item
+            return
+        for _resp, data in self._list_pages(url, response_key, headers):
+            for item in self._to_items(data, obj_class):
+                yield item
+
+    def _list(self, url, response_key=None, obj_class=None,
+              data=None, headers=None):
+        items = []
+        resps = []
+        for resp, data in self._list_pages(url, response_key, headers):
+            items.extend(self._to_items(data, obj_class))
+            resps.append(resp)
 
-        return ListWithMeta(items, resp)
+        return ListWithMeta(items, resps)
 
     def _delete(self, url, headers=None):
         if headers is None:
@@ -143,6 +324,76 @@ class Manager(object):
                                        resp=resp)
         return self.resource_class(self, body, loaded=True, resp=resp)
 
+    def _bulk(self, func, items, parallel=None):
+        """Call ``func`` for every item on a bounded thread pool.
+
+        :param func: callable taking a single item
+        :param items: iterable of items
+        :param parallel: maximum number of concurrent calls, defaults to
+            DEFAULT_BULK_WORKERS
+        :returns: :class:`BulkResult` in the order of ``items``
+        """
+        items = list(items)
+        workers = max(1, min(parallel or DEFAULT_BULK_WORKERS,
+                             len(items) or 1))
+
+        def _run(item):
+            try:
+                return BulkItem(item, func(item), None)
+            except Exception as e:
+                return BulkItem(item, None, e)
+
+        _run = context.bind(_run)
+        if workers == 1:
+            return BulkResult([_run(item) for item in items])
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return BulkResult(list(executor.map(_run, items)))
+
+    def _bulk_iter(self, func, items, parallel=None):
+        """Like :meth:`_bulk` but yield each result as soon as it is done.
+
+        :class:`BulkItem` entries are yielded in completion order. At most
+        twice ``parallel`` calls are queued ahead of the consumer, and the
+        calls not started yet are cancelled if the iteration is abandoned.
+        """
+        workers = max(1, parallel or DEFAULT_BULK_WORKERS)
+
+        def _run(item):
+            try:
+                return BulkItem(item, func(item), None)
+            except Exception as e:
+                return BulkItem(item, None, e)
+
+        # NOTE: bound here rather than in the generator, which only starts
+        # running on the first next(), possibly outside of the context.
+        return self._iter_bulk(context.bind(_run), items, workers)
+
+    @staticmethod
+    def _iter_bulk(_run, items, workers):
+        if workers == 1:
+            for item in items:
+                yield _run(item)
+            return
+        items = iter(items)
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+        pending = set()
+        try:
+            while True:
+                for item in items:
+                    pending.add(executor.submit(_run, item))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    return
+                done, pending = futures.wait(
+                    pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
     def convert_into_with_meta(self, item, resp):
         if isinstance(item, six.string_types):
             if six.PY2 and isinstance(item, six.text_type):
@@ -161,20 +412,156 @@ class Manager(object):
             return DictWithMeta(item, resp)
 
 
+def _index_by(objs, attrs):
+    """Build a hash index of ``objs`` keyed by the values of ``attrs``.
+
+    Objects missing one of the attributes are skipped. Values which are not
+    hashable are kept aside in the second returned list as ``(key, obj)``
+    tuples. Both keep the order of ``objs``.
+    """
+    index = {}
+    unhashable = []
+    for obj in objs:
+        try:
+            key = tuple(getattr(obj, attr) for attr in attrs)
+        except AttributeError:
+            continue
+        try:
+            index.setdefault(key, []).append(obj)
+        except TypeError:
+            unhashable.append((key, obj))
+    return index, unhashable
+
+
+def _filter_by(objs, searches):
+    """Return the items of ``objs`` matching every (attr, value) search."""
+    attrs = tuple(attr for attr, _value in searches)
+    wanted = tuple(value for _attr, value in searches)
+    index, unhashable = _index_by(objs, attrs)
+    try:
+        return index.get(wanted, [])
+    except TypeError:
+        # NOTE: only unhashable attribute values can match an unhashable
+        # search value.
+        return [obj for key, obj in unhashable if key == wanted]
+
+
+class LookupStats(object):
+    """Observed costs of the strategies of :meth:`ManagerWithFind.get_many`.
+
+    Looking up N resources takes ``ceil(N / workers)`` rounds of concurrent
+    GETs or a single listing of the whole collection, whichever is expected
+    to be faster given the latency of the GETs and the duration and size of
+    the last listing.
+    """
+
+    # Weight of a new observation in the moving average of the GET latency.
+    ALPHA = 0.2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.get_seconds = None
+        self.list_seconds = None
+        self.collection_size = None
+
+    def observe_get(self, seconds):
+        with self._lock:
+            if self.get_seconds is None:
+                self.get_seconds = seconds
+            else:
+                self.get_seconds += self.ALPHA * (seconds - self.get_seconds)
+
+    def observe_list(self, seconds, size):
+        with self._lock:
+            self.list_seconds = seconds
+            self.collection_size = size
+
+    def choose(self, count, workers):
+        """Return ``'get'`` or ``'list'`` for a lookup of ``count`` IDs."""
+        with self._lock:
+            get_seconds = self.get_seconds
+            list_seconds = self.list_seconds
+            size = self.collection_size
+        if size is not None and count >= size:
+            return 'list'
+        if get_seconds is None or list_seconds is None:
+            # NOTE: the collection may be far larger than the lookup, only
+            # list once a listing has shown it is worth it.
+            return 'get'
+        rounds = int(math.ceil(float(count) / workers))
+        return 'get' if rounds * get_seconds < list_seconds else 'list'
+
+
 @six.add_metaclass(abc.ABCMeta)
 class ManagerWithFind(Manager):
     """Manager with additional `find()`/`findall()` methods."""
 
+    # Attributes the API can filter the listing on. They are sent as query
+    # parameters by findall(), other attributes are matched client side.
+    filter_attrs = ()
+
+    # Whether list() returns the same representation as get(), in which
+    # case find() does not need to fetch the match again.
+    detailed_list = False
+
     @abc.abstractmethod
-    def list(self):
+    def list(self, filters=None, marker=None, limit=None):
         pass
 
-    def find(self, **kwargs):
-        """Find a single item with attributes matching ``**kwargs``.
+    def __init__(self, *args, **kwargs):
+        super(ManagerWithFind, self).__init__(*args, **kwargs)
+        self.lookup_stats = LookupStats()
+
+    get_async = async_variant('get')
+    list_async = async_variant('list')
+    find_async = async_variant('find')
+    findall_async = async_variant('findall')
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+    # NOTE: only a listing without query parameters covers the whole
+    # collection, the others tell nothing about its size.
+    def _list(self, url, response_key=None, obj_class=None,
+              data=None, headers=None):
+        start = utils.now()
+        result = super(ManagerWithFind, self)._list(
+            url, response_key, obj_class, data, headers)
+        if '?' not in url:
+            self.lookup_stats.observe_list(utils.now() - start, len(result))
+        return result
+
+    def _iter(self, url, response_key=None, obj_class=None, headers=None):
+        items = super(ManagerWithFind, self)._iter(
+            url, response_key, obj_class, headers)
+        if '?' in url:
+            return items
+        return self._observed_listing(items)
+
+    def _observed_listing(self, items):
+        """Yield ``items``, timing the listing once it is exhausted.
+
+        The time the consumer spends between the items is not counted.
         """
+        seconds = 0.0
+        size = 0
+        while True:
+            start = utils.now()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            finally:
+                seconds += utils.now() - start
+            size += 1
+            yield item
+        self.lookup_stats.observe_list(seconds, size)
+
+    @staticmethod
+    def _page_params(filters=None, marker=None, limit=None):
+        params = dict(filters or {})
+        params.update(marker=marker, limit=limit)
+        return params
+
+    def find(self, **kwargs):
+        """Find a single item with attributes matching ``**kwargs``."""
         matches = self.findall(**kwargs)
         num = len(matches)
 
@@ -183,38 +570,206 @@ class ManagerWithFind(Manager):
             raise exceptions.NotFound(msg)
         elif num > 1:
             raise exceptions.NoUniqueMatch
+        elif self.detailed_list:
+            return matches[0]
         else:
-            return self.get(matches[0].uuid)
+            return self.get(getattr(matches[0], self.id_attr))
+
+    def _split_filters(self, kwargs):
+        filters = dict((k, v) for k, v in kwargs.items()
+                       if k in self.filter_attrs)
+        return filters, list(kwargs.items())
 
     def findall(self, **kwargs):
         """Find all items with attributes matching ``**kwargs``.
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        Attributes listed in ``filter_attrs`` are filtered by the API, the
+        listing is then matched against all of ``kwargs`` through a hash
+        index built in a single pass.
         """
-        found = []
-        searches = kwargs.items()
+        filters, searches = self._split_filters(kwargs)
+        listing = self.list(filters=filters) if filters else self.list()
+        return _filter_by(listing, searches)
+
+    def _lookup_id(self, obj):
+        """Return the ID of ``obj``, an ID or a resource.
 
-        for obj in self.list():
+        The ID of a resource of this manager is its ``id_attr``, other
+        resources, e.g. the instance of a mapping, are referred to by UUID.
+        """
+        info = getattr(obj, '_info', None)
+        if info is None:
+            return obj
+        if self.id_attr in info:
+            return info[self.id_attr]
+        return getid(obj)
+
+    def get_many(self, ids, parallel=None, strategy=None, detailed=True):
+        """Look up many resources by ID.
+
+        The resources are either fetched with concurrent GETs or picked from
+        a single listing of the collection, whichever :class:`LookupStats`
+        expects to be faster from the previous lookups.
+
+        :param ids: iterable of IDs or resources
+        :param parallel: maximum number of concurrent GETs
+        :param strategy: ``'get'`` or ``'list'`` to force a strategy
+        :param detailed: whether the resources must have the representation
+            returned by ``get()``. When ``list()`` returns a lighter one,
+            only an explicit ``strategy='list'`` uses the listing.
+        :returns: :class:`BulkResult` in the order of ``ids``, missing
+            resources failing with :class:`exceptions.NotFound`
+        """
+        ids = list(ids)
+        workers = parallel or DEFAULT_BULK_WORKERS
+        strategy = self._lookup_strategy(ids, workers, strategy, detailed)
+        if strategy is None:
+            return BulkResult([])
+        if strategy == 'list':
+            return self._get_many_listed(ids)
+
+        def _get(obj):
+            start = utils.now()
             try:
-                if all(getattr(obj, attr) == value
-                       for (attr, value) in searches):
-                    found.append(obj)
-            except AttributeError:
-                continue
+                return self.get(obj)
+            finally:
+                self.lookup_stats.observe_get(utils.now() - start)
+
+        return self._bulk(_get, ids, parallel=workers)
+
+    def _lookup_strategy(self, ids, workers, strategy, detailed):
+        """Return the strategy of :meth:`get_many`, None if nothing to get."""
+        if strategy not in (None, 'get', 'list'):
+            raise ValueError("Unknown lookup strategy '%s'." % strategy)
+        if strategy is not None:
+            return strategy
+        wanted = len(set(self._lookup_id(obj) for obj in ids))
+        if not wanted:
+            return None
+        if detailed and not self.detailed_list:
+            return 'get'
+        return self.lookup_stats.choose(wanted, workers)
+
+    def _get_many_listed(self, ids):
+        wanted = set(self._lookup_id(obj) for obj in ids)
+        found = {}
+        # NOTE: the whole collection is read, the listing records its
+        # duration and size in lookup_stats.
+        for res in self._listing():
+            key = res._info.get(self.id_attr)
+            if key in wanted:
+                found[key] = res
+        return self._listed_result(ids, found)
+
+    def _listing(self, filters=None):
+        if hasattr(self, 'iter_list'):
+            return self.iter_list(filters=filters)
+        return self.list(filters=filters)
+
+    def _listed_result(self, ids, found):
+        entries = []
+        for obj in ids:
+            key = self._lookup_id(obj)
+            res = found.get(key)
+            if res is None:
+                entries.append(BulkItem(obj, None, self._not_found(key)))
+            else:
+                entries.append(BulkItem(obj, res, None))
+        return BulkResult(entries)
+
+    def _not_found(self, key):
+        msg = "No %s with an ID of '%s' exists." % (
+            self.resource_class.__name__, key)
+        return exceptions.NotFound(msg)
+
+    get_many_async = async_variant('get_many')
+
+    def ensure_loaded(self, resources, filters=None, parallel=None):
+        """Load the resources of ``resources`` which are not loaded yet.
+
+        When ``list()`` returns the full representation, the resources are
+        refreshed from a single listing instead of a GET each; otherwise
+        they are fetched concurrently. Resources which cannot be loaded,
+        e.g. missing from the listing, are left unloaded.
+
+        :param resources: iterable of resources of this manager
+        :param filters: filters of the listing, e.g. the host of the
+            resources, to keep it small
+        :param parallel: maximum number of concurrent GETs when the listing
+            cannot be used
+        :returns: :class:`BulkResult` in the order of ``resources``, the
+            resources which could not be loaded failing with the error of
+            their GET or :class:`exceptions.NotFound`
+        """
+        resources = list(resources)
+        stale = [res for res in resources if not res.is_loaded()]
+        if stale and not self.detailed_list:
+            loaded = self._bulk(self._load, stale, parallel=parallel)
+            return self._loaded_result(resources, loaded)
+        wanted = {}
+        for res in stale:
+            wanted.setdefault(res._info.get(self.id_attr), []).append(res)
+        if wanted:
+            for new in self._listing(filters):
+                self._refresh_listed(wanted, new)
+                if not wanted:
+                    break
+        return self._loaded_result(resources, missing=wanted)
+
+    def _refresh_listed(self, wanted, new):
+        """Load the resources of ``wanted`` having the ID of ``new``.
+
+        :param wanted: dict of the lists of resources waiting to be loaded
+            by ID, the loaded ones are removed from it
+        """
+        for res in wanted.pop(new._info.get(self.id_attr), ()):
+            res._add_details(new._info)
+            res.set_loaded(True)
 
-        return found
+    def _loaded_result(self, resources, loaded=(), missing=None):
+        """Build the report of :meth:`ensure_loaded`.
+
+        :param loaded: :class:`BulkResult` of the resources loaded one by one
+        :param missing: dict of the lists of resources missing from the
+            listing by ID
+        """
+        errors = dict((id(entry.item), entry.error)
+                      for entry in loaded if entry.error is not None)
+        for key, matches in (missing or {}).items():
+            for res in matches:
+                errors[id(res)] = self._not_found(key)
+        return BulkResult([BulkItem(res, None, errors[id(res)])
+                           if id(res) in errors else BulkItem(res, res, None)
+                           for res in resources])
+
+    @staticmethod
+    def _load(res):
+        try:
+            res.get()
+        except Exception:
+            # NOTE: get() marks the resource as loaded before fetching it.
+            res.set_loaded(False)
+            raise
+        return res
 
 
 class RequestIdMixin(object):
     """Wrapper class to expose x-openstack-request-id to the caller."""
+    __slots__ = ()
+
     def request_ids_setup(self):
         self.x_openstack_request_ids = []
+        self._request_retries = 0
 
     @property
     def request_ids(self):
         return self.x_openstack_request_ids
 
+    @property
+    def request_retries(self):
+        """Number of retries the requests behind this object needed."""
+        return self._request_retries
+
     def append_request_ids(self, resp):
         """Add request_ids as an attribute to the object
 
@@ -235,6 +790,7 @@ class RequestIdMixin(object):
             request_id = (resp.headers.get('Openstack-Request-Id') or
                           resp.headers.get('x-openstack-request-id') or
                           resp.headers.get('x-compute-request-id'))
+            self._request_retries += getattr(resp, 'retries', 0)
         else:
             # If resp is of type string or None.
             request_id = resp
@@ -279,7 +835,7 @@ class Resource(RequestIdMixin):
         if k not in self.__dict__:
             # NOTE(RuiChen): disallow lazy-loading if already loaded once
             if not self.is_loaded():
-                self.get()
+                _lazy_load(self, k)
                 return self.__getattr__(k)
             raise AttributeError(k)
         else:
@@ -297,7 +853,8 @@ class Resource(RequestIdMixin):
         if not hasattr(self.manager, 'get'):
             return
 
-        new = self.manager.get(self.uuid)
+        new = self.manager.get(
+            getattr(self, getattr(type(self.manager), 'id_attr', 'uuid')))
         if new:
             self._add_details(new._info)
             # The 'request_ids' attribute has been added,
@@ -318,8 +875,137 @@ class Resource(RequestIdMixin):
     def set_loaded(self, val):
         self._loaded = val
 
-    def to_dict(self):
-        return copy.deepcopy(self._info)
+    def to_dict(self, copy=True):
+        """Return the resource info.
+
+        :param copy: return a deep copy the caller may modify. When False,
+            return a read-only view of the info instead, which is much
+            cheaper but reflects later changes of the resource and does not
+            protect nested values.
+        """
+        if not copy:
+            return utils.MappingProxy(self._info)
+        return _deepcopy(self._info)
+
+
+class CompactResource(RequestIdMixin):
+    """Memory efficient variant of :class:`Resource`.
+
+    The resource info is kept once: the ``_info`` dict is the ``__dict__``
+    of the instance rather than being copied into it. The gain is memory
+    only, a listing retains about a third less than with :class:`Resource`;
+    building and reading the resources costs about the same as for
+    :class:`Resource`. Setting an attribute which is not part of the
+    wrapper stores it in ``_info``. ``to_dict()``, comparison, ``repr()``,
+    pickling and lazy-loading behave as for :class:`Resource`.
+
+    :param manager: BaseManager object
+    :param info: dictionary representing resource attributes
+    :param loaded: prevent lazy-loading if set to True
+    :param resp: Response or list of Response objects
+    """
+    __slots__ = ('manager', '_loaded', 'x_openstack_request_ids',
+                 '_request_retries', '__dict__')
+
+    def __init__(self, manager, info, loaded=False, resp=None):
+        # NOTE: the slots are set directly, request_ids_setup() would cost
+        # two more method calls per resource.
+        _set = object.__setattr__
+        _set(self, '__dict__', info)
+        _set(self, 'manager', manager)
+        _set(self, '_loaded', loaded)
+        _set(self, 'x_openstack_request_ids', [])
+        _set(self, '_request_retries', 0)
+        if resp is not None:
+            self.append_request_ids(resp)
+
+    @property
+    def _info(self):
+        return self.__dict__
+
+    def _add_details(self, info):
+        self.__dict__.update(info)
+
+    def __getstate__(self):
+        state = {'_info': self.__dict__}
+        for k in _COMPACT_SLOTS:
+            try:
+                state[k] = object.__getattribute__(self, k)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, d):
+        # NOTE: the state of a pickled Resource holds its info keys as well,
+        # so _info has to be restored first.
+        d = dict(d)
+        if '_info' in d:
+            object.__setattr__(self, '__dict__', d.pop('_info'))
+        for k, v in d.items():
+            setattr(self, k, v)
+
+    def __getattr__(self, k):
+        # NOTE: only called when the regular lookup failed, which includes
+        # unset slots while unpickling.
+        if k in _COMPACT_SLOTS or k.startswith('__'):
+            raise AttributeError(k)
+        # NOTE(RuiChen): disallow lazy-loading if already loaded once
+        if not self.is_loaded():
+            _lazy_load(self, k)
+            try:
+                return self.__dict__[k]
+            except KeyError:
+                pass
+        raise AttributeError(k)
+
+    def __repr__(self):
+        reprkeys = sorted(k for k in self._info if k[0] != '_' and
+                          k not in ('manager', 'x_openstack_request_ids'))
+        info = ", ".join("%s=%s" % (k, self._info[k]) for k in reprkeys)
+        return "<%s %s>" % (self.__class__.__name__, info)
+
+    def get(self):
+        # set_loaded() first ... so if we have to bail, we know we tried.
+        self.set_loaded(True)
+        if not hasattr(self.manager, 'get'):
+            return
+
+        new = self.manager.get(
+            getattr(self, getattr(type(self.manager), 'id_attr', 'uuid')))
+        if new:
+            self._add_details(new._info)
+            self.append_request_ids(new.request_ids)
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return False
+        return self._info == other._info
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def is_loaded(self):
+        return self._loaded
+
+    def set_loaded(self, val):
+        self._loaded = val
+
+    def to_dict(self, copy=True):
+        """Return the resource info.
+
+        :param copy: return a deep copy the caller may modify. When False,
+            return a read-only view of the info instead, which is much
+            cheaper but reflects later changes of the resource and does not
+            protect nested values.
+        """
+        if not copy:
+            return utils.MappingProxy(self._info)
+        return _deepcopy(self._info)
+
+
+_COMPACT_SLOTS = frozenset(CompactResource.__slots__) - set(['__dict__'])
 
 
 class ListWithMeta(list, RequestIdMixin):
@@ -329,6 +1015,38 @@ class ListWithMeta(list, RequestIdMixin):
         self.append_request_ids(resp)
 
 
+BulkItem = collections.namedtuple('BulkItem', ['item', 'result', 'error'])
+
+
+class BulkResult(ListWithMeta):
+    """Per item report of a bulk operation.
+
+    Every entry is a :class:`BulkItem` holding the input item together with
+    either the result or the exception raised for it. ``request_ids``
+    collects the request ids of successful calls as well as of failed HTTP
+    calls.
+    """
+    def __init__(self, values):
+        super(BulkResult, self).__init__(values, None)
+        for entry in values:
+            if entry.error is not None:
+                request_id = getattr(entry.error, 'request_id', None)
+                if request_id:
+                    self.append_request_ids(request_id)
+            elif isinstance(entry.result, RequestIdMixin):
+                for request_id in entry.result.request_ids:
+                    self.append_request_ids(request_id)
+                self._request_retries += entry.result.request_retries
+
+    @property
+    def succeeded(self):
+        return [entry for entry in self if entry.error is None]
+
+    @property
+    def failed(self):
+        return [entry for entry in self if entry.error is not None]
+
+
 class DictWithMeta(dict, RequestIdMixin):
     def __init__(self, values, resp):
         super(DictWithMeta, self).__init__(values)
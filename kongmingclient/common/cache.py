@@ -0,0 +1,247 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Client side cache of read-only GET responses.
+"""
+
+import collections
+import copy
+import threading
+
+from six.moves.urllib import parse
+
+from kongmingclient.common import context
+from kongmingclient.common import utils
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 5
+DEFAULT_TTLS = {
+    'hosts': DEFAULT_TTL,
+    'instances': DEFAULT_TTL,
+    'instance_cpu_mappings': DEFAULT_TTL,
+}
+
+
+def collection_of(url):
+    """Return the collection name of an API URL, e.g. ``hosts``."""
+    path = parse.urlparse(url).path
+    return path.strip('/').split('/', 1)[0]
+
+
+def is_collection_url(url):
+    """Whether ``url`` points to a collection rather than an item."""
+    return '/' not in parse.urlparse(url).path.strip('/')
+
+
+class ResponseCache(object):
+    """Thread safe TTL + LRU cache keyed by request URL and scope.
+
+    The scope tells the callers apart, see :func:`context.scope`: the
+    response of a GET is only served to callers sending the same headers
+    and credentials. Invalidation drops a URL in every scope.
+
+    :param maxsize: maximum number of cached responses, the least recently
+        used one is evicted beyond that
+    :param ttls: dict of collection name (``hosts``, ``instances``, ...) to
+        time to live in seconds. URLs of other collections are not cached.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttls=None):
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self._entries)}
+
+    def cacheable(self, url):
+        return bool(self.ttls.get(collection_of(url)))
+
+    def get(self, url, scope=None):
+        """Return the cached value of ``url`` or None."""
+        key = (url, scope)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= utils.now():
+                self.misses += 1
+                return None
+            # NOTE: re-inserting marks the entry as most recently used.
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, url, scope=None):
+        """Return the cached value of ``url`` without touching the stats."""
+        with self._lock:
+            entry = self._entries.get((url, scope))
+        if entry is None or entry[0] <= utils.now():
+            return None
+        return entry[1]
+
+    def set(self, url, value, scope=None):
+        ttl = self.ttls.get(collection_of(url))
+        if not ttl:
+            return
+        key = (url, scope)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (utils.now() + ttl, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _drop(self, match):
+        with self._lock:
+            for key in [key for key in self._entries if match(key[0])]:
+                del self._entries[key]
+
+    def invalidate(self, url):
+        self._drop(lambda cached: cached == url)
+
+    def invalidate_collection(self, name):
+        """Drop the cached listings of the ``name`` collection."""
+        self._drop(lambda url: (collection_of(url) == name and
+                                is_collection_url(url)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ValidatorCache(object):
+    """Bounded store of GET bodies with their ETag/Last-Modified validators.
+
+    Used by the HTTP clients to send conditional GETs: a ``304 Not
+    Modified`` answer is resolved to the body stored for the URL, which
+    saves both the transfer and the decoding of the body.
+
+    The bodies are stored by request key rather than URL, see
+    :func:`context.request_key`, so that a body is never resolved for a
+    caller with other credentials than the one it was fetched with.
+
+    :param maxsize: maximum number of stored keys, the least recently used
+        one is evicted beyond that
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def add_validators(self, key, headers):
+        """Add the If-None-Match/If-Modified-Since headers of ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        etag, last_modified, _body = entry
+        if etag:
+            headers.setdefault('If-None-Match', etag)
+        if last_modified:
+            headers.setdefault('If-Modified-Since', last_modified)
+
+    def resolve(self, key, resp, body):
+        """Return the body to use for the response of the GET of ``key``.
+
+        :param body: decoded body of ``resp`` or a callable returning it, so
+            that decoding is skipped when the stored body is used
+        """
+        if resp.status_code == 304:
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is not None:
+                return copy.deepcopy(entry[2])
+        if callable(body):
+            body = body()
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        if resp.status_code == 200 and (etag or last_modified):
+            with self._lock:
+                self._entries.pop(key, None)
+                self._entries[key] = (etag, last_modified,
+                                      copy.deepcopy(body))
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return body
+
+
+class CachingHTTPClient(object):
+    """Serve GETs of an HTTP client from a :class:`ResponseCache`.
+
+    A GET sent with a ``Cache-Control: no-cache`` header always goes to the
+    API, its response still refreshes the cache.
+
+    Any other method goes to the wrapped client and drops the cached entry of
+    its URL as well as the cached listings of its collection.
+    """
+
+    def __init__(self, http_client, cache):
+        self.http_client = http_client
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.http_client, name)
+
+    def scope(self, headers=None):
+        """Return the cache scope of a GET of the caller with ``headers``."""
+        headers = dict(headers or {})
+        headers.pop('Cache-Control', None)
+        return context.scope(headers,
+                             getattr(self.http_client, 'auth_token', None))
+
+    def get(self, url, **kwargs):
+        if not self.cache.cacheable(url):
+            return self.http_client.get(url, **kwargs)
+        headers = kwargs.get('headers') or {}
+        no_cache = headers.get('Cache-Control') == 'no-cache'
+        scope = self.scope(headers)
+        cached = None if no_cache else self.cache.get(url, scope)
+        if cached is not None:
+            resp, body = cached
+            # NOTE: managers keep the body as the resource info, hand out a
+            # copy so callers never share state through the cache.
+            return resp, copy.deepcopy(body)
+        resp, body = self.http_client.get(url, **kwargs)
+        self.cache.set(url, (resp, copy.deepcopy(body)), scope)
+        return resp, body
+
+    def _write(self, method, url, **kwargs):
+        try:
+            return getattr(self.http_client, method)(url, **kwargs)
+        finally:
+            self.cache.invalidate(url)
+            self.cache.invalidate_collection(collection_of(url))
+
+    def head(self, url, **kwargs):
+        return self.http_client.head(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._write('post', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._write('put', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._write('patch', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._write('delete', url, **kwargs)
@@ -0,0 +1,146 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Coalescing of concurrent identical GET requests.
+
+When many threads ask for the same resource at the same moment, e.g. all
+evaluating the placements on one host after a failover, only the first
+request goes to the API and the others wait for its response.
+"""
+
+import copy
+import threading
+
+from kongmingclient.common import context
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """Run at most one call per key at a time.
+
+    Callers asking for a key while its call is in flight wait for it and
+    share its result, or its exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """Call ``func`` unless a call of ``key`` is already in flight.
+
+        :returns: ``(result, shared)``, ``shared`` telling whether other
+            callers got the same result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # NOTE: no caller can join once the call is removed, so the
+            # number of waiters is final.
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.event.set()
+        return call.result, call.waiters > 0
+
+    def forget(self, match):
+        """Let new callers of the keys matching ``match`` start a new call.
+
+        The calls in flight still complete for the callers already waiting
+        for them.
+
+        :param match: callable taking a key
+        """
+        with self._lock:
+            for key in [key for key in self._calls if match(key)]:
+                del self._calls[key]
+
+
+class CoalescingHTTPClient(object):
+    """Share the response of concurrent identical GETs of an HTTP client.
+
+    Every caller gets its own copy of the shared body, so the resources
+    built from it never share state. Other methods, and GETs sent with a
+    ``Cache-Control: no-cache`` header, go to the wrapped client. Once a
+    write returns, new GETs no longer join the GETs sent before it.
+    """
+
+    def __init__(self, http_client, group=None):
+        self.http_client = http_client
+        self.group = group or SingleFlight()
+
+    def __getattr__(self, name):
+        return getattr(self.http_client, name)
+
+    def get(self, url, **kwargs):
+        headers = kwargs.get('headers') or {}
+        if headers.get('Cache-Control') == 'no-cache':
+            return self.http_client.get(url, **kwargs)
+        key = context.request_key(
+            url, headers, getattr(self.http_client, 'auth_token', None))
+        (resp, body), shared = self.group.do(
+            key, lambda: self.http_client.get(url, **kwargs))
+        if shared:
+            # NOTE: the shared body is never handed out, it may still be
+            # copied by another waiter.
+            body = copy.deepcopy(body)
+        return resp, body
+
+    def _write(self, method, url, **kwargs):
+        try:
+            return getattr(self.http_client, method)(url, **kwargs)
+        finally:
+            # NOTE: a write may change other collections as well, e.g. the
+            # mappings change the hosts, and writes are rare enough to simply
+            # stop sharing every GET in flight.
+            self.group.forget(lambda key: True)
+
+    def post(self, url, **kwargs):
+        return self._write('post', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._write('put', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._write('patch', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._write('delete', url, **kwargs)
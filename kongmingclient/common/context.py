@@ -0,0 +1,94 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+
+"""
+Per thread request context of the HTTP clients, see :func:`request_context`.
+"""
+
+import contextlib
+import threading
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def request_context(headers=None, auth_token=None):
+    """Customize the requests sent by the calling thread.
+
+    The clients are shared between threads, so per-call settings are kept
+    in a thread-local context rather than on the client::
+
+        with http.request_context(headers={'X-OpenStack-Request-ID': rid}):
+            client.hosts.get('node-1')
+
+    Contexts nest, inner headers taking precedence.
+
+    :param headers: headers added to every request
+    :param auth_token: token used instead of the one of an
+        :class:`http.HTTPClient`, ignored by :class:`http.SessionClient`
+        which gets its tokens from the keystone session
+    """
+    previous = getattr(_local, 'context', None)
+    merged = dict(previous[0]) if previous else {}
+    merged.update(headers or {})
+    token = auth_token or (previous[1] if previous else None)
+    _local.context = (merged, token)
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+def current():
+    """Return the ``(headers, auth_token)`` of the calling thread."""
+    return getattr(_local, 'context', None) or ({}, None)
+
+
+def bind(func):
+    """Return ``func`` running in the request context of the caller.
+
+    The context is thread-local, so work handed to another thread, e.g. to
+    an executor, is bound to it when it is submitted.
+    """
+    context = getattr(_local, 'context', None)
+
+    def _bound(*args, **kwargs):
+        previous = getattr(_local, 'context', None)
+        _local.context = context
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.context = previous
+
+    return _bound
+
+
+def scope(headers=None, auth_token=None):
+    """Return the part of a request key that depends on the caller.
+
+    Two GETs of a URL only get the same response when they are sent with
+    the same headers and credentials, including those of the context.
+
+    :param auth_token: token of the client, overridden by the one of the
+        context
+    """
+    context_headers, context_token = current()
+    merged = dict(context_headers)
+    merged.update(headers or {})
+    return tuple(sorted(merged.items())), context_token or auth_token
+
+
+def request_key(url, headers=None, auth_token=None):
+    """Return the key of a GET of ``url``, see :func:`scope`."""
+    return (url,) + scope(headers, auth_token)
@@ -0,0 +1,327 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Typed model of the CPU mappings of the KongMing API.
+
+The API passes the pinning of an instance as a string of comma separated
+``<vcpu>:<pcpus>`` entries, ``<pcpus>`` being a physical CPU or an
+inclusive range of them, e.g. ``0:4,1:5,2:6-7``. A vCPU pinned to a
+non-contiguous set of physical CPUs appears in several entries.
+
+Sets of physical CPUs are kept as integer bitmasks, so that the overlap of
+two mappings or the free CPUs of a host are a few integer operations
+whatever the number of CPUs.
+"""
+
+import six
+
+from kongmingclient.common.i18n import _
+
+
+def _bits(mask):
+    """Yield the indexes of the bits set in ``mask`` in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _runs(mask):
+    """Yield the ``(first, last)`` runs of consecutive bits of ``mask``."""
+    first = last = None
+    for cpu in _bits(mask):
+        if last is not None and cpu == last + 1:
+            last = cpu
+            continue
+        if first is not None:
+            yield first, last
+        first = last = cpu
+    if first is not None:
+        yield first, last
+
+
+def _range_mask(first, last):
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def _parse_cpu(text, spec):
+    try:
+        cpu = int(text)
+    except ValueError:
+        cpu = -1
+    if cpu < 0:
+        raise ValueError(_("Invalid CPU '%(cpu)s' in '%(spec)s'.") %
+                         {'cpu': text, 'spec': spec})
+    return cpu
+
+
+class CPUSet(object):
+    """Immutable set of CPU ids backed by an integer bitmask.
+
+    Supports the usual set operators (``&``, ``|``, ``-``, ``^``,
+    ``in``, ``len()``, iteration in ascending order) and renders to, and
+    parses from, the Linux cpuset notation, e.g. ``0-3,8``.
+    """
+
+    __slots__ = ('mask',)
+
+    def __init__(self, cpus=()):
+        mask = 0
+        for cpu in cpus:
+            if cpu < 0:
+                raise ValueError(_("Invalid CPU %s.") % cpu)
+            mask |= 1 << cpu
+        self.mask = mask
+
+    @classmethod
+    def from_mask(cls, mask):
+        cpuset = cls.__new__(cls)
+        cpuset.mask = mask
+        return cpuset
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse the cpuset notation, e.g. ``0-3,^2,8``."""
+        mask = 0
+        exclude = 0
+        for item in spec.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            excluded = item.startswith('^')
+            if excluded:
+                item = item[1:]
+            first, sep, last = item.partition('-')
+            first = _parse_cpu(first, spec)
+            last = _parse_cpu(last, spec) if sep else first
+            if last < first:
+                raise ValueError(_("Invalid CPU range '%(range)s' in "
+                                   "'%(spec)s'.") %
+                                 {'range': item, 'spec': spec})
+            if excluded:
+                exclude |= _range_mask(first, last)
+            else:
+                mask |= _range_mask(first, last)
+        return cls.from_mask(mask & ~exclude)
+
+    def __iter__(self):
+        return _bits(self.mask)
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __bool__(self):
+        return bool(self.mask)
+
+    __nonzero__ = __bool__
+
+    def __contains__(self, cpu):
+        return cpu >= 0 and bool(self.mask >> cpu & 1)
+
+    def __and__(self, other):
+        return CPUSet.from_mask(self.mask & other.mask)
+
+    def __or__(self, other):
+        return CPUSet.from_mask(self.mask | other.mask)
+
+    def __sub__(self, other):
+        return CPUSet.from_mask(self.mask & ~other.mask)
+
+    def __xor__(self, other):
+        return CPUSet.from_mask(self.mask ^ other.mask)
+
+    def isdisjoint(self, other):
+        return not self.mask & other.mask
+
+    def issubset(self, other):
+        return not self.mask & ~other.mask
+
+    def __eq__(self, other):
+        if not isinstance(other, CPUSet):
+            return NotImplemented
+        return self.mask == other.mask
+
+    def __ne__(self, other):
+        if not isinstance(other, CPUSet):
+            return NotImplemented
+        return self.mask != other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __str__(self):
+        return ','.join('%d' % first if first == last else
+                        '%d-%d' % (first, last)
+                        for first, last in _runs(self.mask))
+
+    def __repr__(self):
+        return 'CPUSet(%s)' % self
+
+
+class CPUMapping(object):
+    """Immutable pinning of the vCPUs of an instance to physical CPUs.
+
+    Built with :meth:`parse` from the API notation or from a dict of vCPU
+    to physical CPUs, and rendered back to the API notation by ``str()``.
+    It behaves as a read-only mapping of vCPU to :class:`CPUSet`.
+
+    :param pins: dict of vCPU id to a :class:`CPUSet`, a physical CPU id or
+        an iterable of them
+    """
+
+    __slots__ = ('_vcpus', '_masks', '_pcpus')
+
+    def __init__(self, pins=None):
+        masks = {}
+        for vcpu, pcpus in (pins or {}).items():
+            if vcpu < 0:
+                raise ValueError(_("Invalid vCPU %s.") % vcpu)
+            if isinstance(pcpus, six.integer_types):
+                pcpus = (pcpus,)
+            if not isinstance(pcpus, CPUSet):
+                pcpus = CPUSet(pcpus)
+            if pcpus:
+                masks[vcpu] = masks.get(vcpu, 0) | pcpus.mask
+        self._set(masks)
+
+    def _set(self, masks):
+        self._vcpus = tuple(sorted(masks))
+        self._masks = tuple(masks[vcpu] for vcpu in self._vcpus)
+        union = 0
+        for mask in self._masks:
+            union |= mask
+        self._pcpus = union
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse the API notation, e.g. ``0:4,1:5,2:6-7``.
+
+        :raises ValueError: if ``spec`` is malformed
+        """
+        masks = {}
+        for item in spec.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            vcpu, sep, pcpus = item.partition(':')
+            if not sep or not pcpus.strip():
+                raise ValueError(_("Invalid CPU mapping '%(item)s' in "
+                                   "'%(spec)s', expected "
+                                   "<vcpu>:<pcpu>[-<pcpu>].") %
+                                 {'item': item, 'spec': spec})
+            vcpu = _parse_cpu(vcpu.strip(), spec)
+            mask = CPUSet.parse(pcpus).mask
+            masks[vcpu] = masks.get(vcpu, 0) | mask
+        mapping = cls.__new__(cls)
+        mapping._set(masks)
+        return mapping
+
+    @property
+    def vcpus(self):
+        """The pinned vCPU ids in ascending order."""
+        return self._vcpus
+
+    @property
+    def pcpus(self):
+        """:class:`CPUSet` of the physical CPUs used by the mapping."""
+        return CPUSet.from_mask(self._pcpus)
+
+    def __getitem__(self, vcpu):
+        for pinned, mask in zip(self._vcpus, self._masks):
+            if pinned == vcpu:
+                return CPUSet.from_mask(mask)
+        raise KeyError(vcpu)
+
+    def __iter__(self):
+        return iter(self._vcpus)
+
+    def __len__(self):
+        return len(self._vcpus)
+
+    def __contains__(self, vcpu):
+        return vcpu in self._vcpus
+
+    def items(self):
+        return [(vcpu, CPUSet.from_mask(mask))
+                for vcpu, mask in zip(self._vcpus, self._masks)]
+
+    def to_dict(self):
+        """Return a dict of vCPU id to the list of its physical CPUs."""
+        return dict((vcpu, list(_bits(mask)))
+                    for vcpu, mask in zip(self._vcpus, self._masks))
+
+    def overlaps(self, other):
+        """Whether this mapping shares a physical CPU with ``other``."""
+        return bool(self._pcpus & _pcpus_mask(other))
+
+    def conflicts(self, other):
+        """Return the :class:`CPUSet` shared with ``other``."""
+        return CPUSet.from_mask(self._pcpus & _pcpus_mask(other))
+
+    def union(self, other):
+        """Return a mapping pinning the vCPUs of both mappings."""
+        masks = dict(zip(self._vcpus, self._masks))
+        for vcpu, mask in zip(other._vcpus, other._masks):
+            masks[vcpu] = masks.get(vcpu, 0) | mask
+        mapping = CPUMapping.__new__(CPUMapping)
+        mapping._set(masks)
+        return mapping
+
+    __or__ = union
+
+    def __eq__(self, other):
+        if not isinstance(other, CPUMapping):
+            return NotImplemented
+        return (self._vcpus == other._vcpus and
+                self._masks == other._masks)
+
+    def __ne__(self, other):
+        if not isinstance(other, CPUMapping):
+            return NotImplemented
+        return not self == other
+
+    def __hash__(self):
+        return hash((self._vcpus, self._masks))
+
+    def __str__(self):
+        entries = []
+        for vcpu, mask in zip(self._vcpus, self._masks):
+            for first, last in _runs(mask):
+                if first == last:
+                    entries.append('%d:%d' % (vcpu, first))
+                else:
+                    entries.append('%d:%d-%d' % (vcpu, first, last))
+        return ','.join(entries)
+
+    def __repr__(self):
+        return 'CPUMapping(%s)' % self
+
+
+def _pcpus_mask(value):
+    if isinstance(value, CPUMapping):
+        return value._pcpus
+    return value.mask
+
+
+def used_cpus(mappings):
+    """Return the :class:`CPUSet` used by an iterable of mappings."""
+    mask = 0
+    for mapping in mappings:
+        mask |= _pcpus_mask(mapping)
+    return CPUSet.from_mask(mask)
+
+
+def free_cpus(host_cpus, mappings):
+    """Return the CPUs of ``host_cpus`` not used by any of ``mappings``."""
+    return host_cpus - used_cpus(mappings)
@@ -13,13 +13,15 @@
 #   under the License.
 #
 
+from email import utils as email_utils
 import inspect
 import sys
+import time
 
-from oslo_serialization import jsonutils
 import six
 
 from kongmingclient.common.i18n import _
+from kongmingclient.common import jsoncodec
 
 
 class ClientException(Exception):
@@ -83,6 +85,22 @@ class NoUniqueMatch(ClientException):
     pass
 
 
+class WaitTimeout(ClientException):
+    """Timed out waiting for resources to reach the expected status."""
+    pass
+
+
+class CPUMappingConflict(ClientException):
+    """Requested CPUs are already pinned by other instances of the host."""
+    def __init__(self, message=None, host=None, instance_uuid=None,
+                 cpus=None, owners=None):
+        super(CPUMappingConflict, self).__init__(message)
+        self.host = host
+        self.instance_uuid = instance_uuid
+        self.cpus = cpus
+        self.owners = owners or []
+
+
 class EndpointException(ClientException):
     """Something is rotten in Service Catalog."""
     pass
@@ -101,6 +119,21 @@ class AmbiguousEndpoints(EndpointException):
         self.endpoints = endpoints
 
 
+def _parse_retry_after(value):
+    """Return the seconds to wait of a Retry-After header value."""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        date = email_utils.parsedate_tz(value)
+    except TypeError:
+        date = None
+    if date is None:
+        return 0
+    return max(0, int(email_utils.mktime_tz(date) - time.time()))
+
+
 class HttpError(ClientException):
     """The base exception class for all HTTP exceptions."""
     status_code = 0
@@ -108,7 +141,9 @@ class HttpError(ClientException):
 
     def __init__(self, message=None, details=None,
                  response=None, request_id=None,
-                 url=None, method=None, status_code=None):
+                 url=None, method=None, status_code=None,
+                 retry_after=None):
+        self.retry_after = _parse_retry_after(retry_after)
         self.status_code = status_code or self.status_code
         self.message = message or self.message
         self.details = details
@@ -288,14 +323,6 @@ class RequestEntityTooLarge(HTTPClientError):
     status_code = 413
     message = _("Request Entity Too Large")
 
-    def __init__(self, *args, **kwargs):
-        try:
-            self.retry_after = int(kwargs.pop('retry_after'))
-        except (KeyError, ValueError):
-            self.retry_after = 0
-
-        super(RequestEntityTooLarge, self).__init__(*args, **kwargs)
-
 
 class RequestUriTooLong(HTTPClientError):
     """HTTP 414 - Request-URI Too Long.
@@ -345,6 +372,15 @@ class UnprocessableEntity(HTTPClientError):
     message = _("Unprocessable Entity")
 
 
+class TooManyRequests(HTTPClientError):
+    """HTTP 429 - Too Many Requests.
+
+    The user has sent too many requests in a given amount of time.
+    """
+    status_code = 429
+    message = _("Too Many Requests")
+
+
 class InternalServerError(HttpServerError):
     """HTTP 500 - Internal Server Error.
 
@@ -436,7 +472,7 @@ def from_response(response, method, url):
     content_type = response.headers.get("Content-Type", "")
     if content_type.startswith("application/json"):
         try:
-            body = response.json()
+            body = jsoncodec.loads(response.content)
         except ValueError:
             pass
         else:
@@ -459,7 +495,7 @@ def from_response(response, method, url):
                     # "Client", "faultstring": "error message"}'}, the
                     # "error_message" in the body is also a json string.
                     if isinstance(error, six.string_types):
-                        error = jsonutils.loads(error)
+                        error = jsoncodec.loads(error)
 
                 if hasattr(error, 'keys'):
                     kwargs['message'] = (error.get('message') or
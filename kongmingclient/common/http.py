@@ -13,31 +13,54 @@
 #   under the License.
 #
 
-import copy
 import hashlib
 import logging
 import os
+import random
 import socket
+import threading
 
 from keystoneauth1 import adapter
-from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 from oslo_utils import importutils
 import requests
 import six
 from six.moves.urllib import parse
 
+from kongmingclient.common import cache
+from kongmingclient.common import context
 from kongmingclient.common import exceptions as exc
 from kongmingclient.common.i18n import _
+from kongmingclient.common import jsoncodec
+from kongmingclient.common import metrics
+from kongmingclient.common import retry
 from kongmingclient.common import utils
 
 LOG = logging.getLogger(__name__)
 
 USER_AGENT = 'python-kongmingclient'
 CHUNKSIZE = 1024 * 64  # 64kB
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
 SENSITIVE_HEADERS = ('X-Auth-Token',)
 osprofiler_web = importutils.try_import('osprofiler.web')
 
+# Per thread request id, see last_request_id().
+_local = threading.local()
+
+# NOTE: the request context is part of the API of this module.
+request_context = context.request_context
+
+
+def last_request_id():
+    """Return the request id of the last response of the calling thread."""
+    return getattr(_local, 'request_id', None)
+
+
+def _record_response(resp):
+    _local.request_id = (resp.headers.get('x-openstack-request-id') or
+                         resp.headers.get('Openstack-Request-Id'))
+
 
 def get_system_ca_file():
     """Return path to system default CA file."""
@@ -58,6 +81,13 @@ def get_system_ca_file():
 
 
 class HTTPClient(object):
+    """HTTP client of the API, safe to share between threads.
+
+    The client only holds configuration and the connection pool. Per-call
+    metadata comes back with the returned resources (``request_ids``) or
+    from :attr:`last_request_id`, and per-call settings go through
+    :func:`request_context`.
+    """
 
     def __init__(self, endpoint, **kwargs):
         self.endpoint = endpoint
@@ -87,10 +117,44 @@ class HTTPClient(object):
             else:
                 self.verify_cert = kwargs.get('ca_file', get_system_ca_file())
 
-        # FIXME(RuiChen): We need this for compatibility with the oslo
-        # apiclient we should move to inheriting this class from the oslo
-        # HTTPClient
-        self.last_request_id = None
+        # NOTE: keep one long-lived session so that connections to the API
+        # are reused between calls instead of paying a new TCP (and TLS)
+        # handshake for every request.
+        self.session = requests.Session()
+        http_adapter = requests.adapters.HTTPAdapter(
+            pool_connections=kwargs.get('pool_connections',
+                                        DEFAULT_POOL_CONNECTIONS),
+            pool_maxsize=kwargs.get('pool_maxsize', DEFAULT_POOL_MAXSIZE),
+            pool_block=kwargs.get('pool_block', False))
+        self.session.mount('http://', http_adapter)
+        self.session.mount('https://', http_adapter)
+
+        # Opt-in conditional GETs, see cache.ValidatorCache.
+        self.validator_cache = None
+        if kwargs.get('conditional_get'):
+            self.validator_cache = cache.ValidatorCache()
+
+        self.retry_policy = retry.from_kwargs(kwargs)
+
+        # Request observers, see metrics.Observer.
+        self.observers = list(kwargs.get('observers') or ())
+
+        # Debug logging of the bodies: only the first log_body_limit bytes of
+        # a body are logged, and only for a log_body_sample_rate fraction of
+        # the requests.
+        self.log_body_limit = kwargs.get('log_body_limit')
+        self.log_body_sample_rate = kwargs.get('log_body_sample_rate', 1.0)
+
+        self._base_headers_cache = None
+
+    @property
+    def last_request_id(self):
+        """Request id of the last response of the calling thread."""
+        return last_request_id()
+
+    def close(self):
+        """Close the pooled connections held by this client."""
+        self.session.close()
 
     def safe_header(self, name, value):
         if name in SENSITIVE_HEADERS:
@@ -103,7 +167,23 @@ class HTTPClient(object):
             return (encodeutils.safe_decode(name),
                     encodeutils.safe_decode(value))
 
-    def log_curl_request(self, method, url, kwargs):
+    def _sample_body(self):
+        rate = self.log_body_sample_rate
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def _format_body(self, body):
+        """Return ``body`` for the debug log, truncated to log_body_limit."""
+        limit = self.log_body_limit
+        size = len(body)
+        if limit is not None and size > limit:
+            body = body[:limit]
+        if isinstance(body, six.binary_type):
+            body = body.decode('utf-8', 'replace')
+        if limit is not None and size > limit:
+            body += '... (%d bytes truncated)' % (size - limit)
+        return body
+
+    def log_curl_request(self, method, url, kwargs, log_body=True):
         curl = ['curl -g -i -X %s' % method]
 
         for (key, value) in kwargs['headers'].items():
@@ -124,47 +204,56 @@ class HTTPClient(object):
             curl.append('-k')
 
         if 'data' in kwargs:
-            curl.append('-d \'%s\'' % kwargs['data'])
+            data = kwargs['data']
+            if log_body and isinstance(data, (six.binary_type,
+                                              six.text_type)):
+                data = self._format_body(data)
+            elif not log_body:
+                data = '<body not sampled>'
+            curl.append('-d \'%s\'' % data)
 
         curl.append('%s%s' % (self.endpoint, url))
         LOG.debug(' '.join(curl))
 
-    @staticmethod
-    def log_http_response(resp):
+    def log_http_response(self, resp, log_body=True):
         status = (resp.raw.version / 10.0, resp.status_code, resp.reason)
         dump = ['\nHTTP/%.1f %s %s' % status]
         dump.extend(['%s: %s' % (k, v) for k, v in resp.headers.items()])
         dump.append('')
-        if resp.content:
-            content = resp.content
-            if isinstance(content, six.binary_type):
-                content = content.decode()
-            dump.extend([content, ''])
+        if log_body and resp.content:
+            dump.extend([self._format_body(resp.content), ''])
         LOG.debug('\n'.join(dump))
 
     def _http_request(self, url, method, **kwargs):
         """Send an http request with the specified characteristics.
 
-        Wrapper around requests.request to handle tasks such as
+        Wrapper around requests.Session.request to handle tasks such as
         setting headers and error handling.
         """
-        # Copy the kwargs so we can reuse the original in case of redirects
-        kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
-        kwargs['headers'].setdefault('User-Agent', USER_AGENT)
-        if self.auth_token:
-            kwargs['headers'].setdefault('X-Auth-Token', self.auth_token)
-        else:
-            kwargs['headers'].update(self.credentials_headers())
-        if self.auth_url:
-            kwargs['headers'].setdefault('X-Auth-Url', self.auth_url)
-        if self.region_name:
-            kwargs['headers'].setdefault('X-Region-Name', self.region_name)
-        if self.include_pass and 'X-Auth-Key' not in kwargs['headers']:
-            kwargs['headers'].update(self.credentials_headers())
+        # NOTE: a shallow merge is enough, header values are strings. Only
+        # the merged dict is modified so the caller's headers can be reused
+        # as is in case of redirects.
+        context_headers, context_token = context.current()
+        headers = dict(self._base_headers())
+        if context_token:
+            headers['X-Auth-Token'] = context_token
+        headers.update(context_headers)
+        headers.update(kwargs.get('headers') or {})
+        if not (context_token or self.auth_token):
+            headers.update(self.credentials_headers())
+        if self.include_pass and 'X-Auth-Key' not in headers:
+            headers.update(self.credentials_headers())
         if osprofiler_web:
-            kwargs['headers'].update(osprofiler_web.get_trace_id_headers())
+            headers.update(osprofiler_web.get_trace_id_headers())
+        kwargs['headers'] = headers
 
-        self.log_curl_request(method, url, kwargs)
+        # NOTE: building the debug output reads and decodes the bodies and
+        # hashes the token, only pay for it when it is going to be logged.
+        debug = LOG.isEnabledFor(logging.DEBUG)
+        if debug:
+            # NOTE: logging the body of a streamed response would read it.
+            log_body = self._sample_body() and not kwargs.get('stream')
+            self.log_curl_request(method, url, kwargs, log_body)
 
         if self.cert_file and self.key_file:
             kwargs['cert'] = (self.cert_file, self.key_file)
@@ -194,7 +283,7 @@ class HTTPClient(object):
             url = self.endpoint_url + url
 
         try:
-            resp = requests.request(
+            resp = self.session.request(
                 method,
                 url,
                 allow_redirects=allow_redirects,
@@ -209,7 +298,8 @@ class HTTPClient(object):
                        {'endpoint': endpoint, 'e': e})
             raise exc.ConnectionError(message=message)
 
-        self.log_http_response(resp)
+        if debug:
+            self.log_http_response(resp, log_body)
 
         if not ('X-Auth-Key' in kwargs['headers']) and (
                 resp.status_code == 401 or
@@ -230,6 +320,44 @@ class HTTPClient(object):
 
         return resp
 
+    def _base_headers(self):
+        """Return the read-only default headers of every request.
+
+        The headers are only rebuilt when the credentials of the client
+        change.
+        """
+        auth_token = self.auth_token
+        key = (auth_token, self.auth_url, self.region_name)
+        # NOTE: read once, another thread may replace it in the meantime.
+        cached = self._base_headers_cache
+        if cached is None or cached[0] != key:
+            headers = {'User-Agent': USER_AGENT}
+            if auth_token:
+                headers['X-Auth-Token'] = auth_token
+            if self.auth_url:
+                headers['X-Auth-Url'] = self.auth_url
+            if self.region_name:
+                headers['X-Region-Name'] = self.region_name
+            cached = (key, utils.MappingProxy(headers))
+            self._base_headers_cache = cached
+        return cached[1]
+
+    def _request(self, url, method, **kwargs):
+        """Send a request, retrying it according to the retry policy."""
+        resp = metrics.observed(
+            self.observers, method, url,
+            lambda: self._retried_request(url, method, **kwargs))
+        _record_response(resp)
+        return resp
+
+    def _retried_request(self, url, method, **kwargs):
+        if self.retry_policy is None:
+            return self._http_request(url, method, **kwargs)
+        resp, retries = self.retry_policy.call(
+            method, lambda: self._http_request(url, method, **kwargs))
+        resp.retries = retries
+        return resp
+
     def strip_endpoint(self, location):
         if location is None:
             message = _("Location not returned with redirect")
@@ -252,25 +380,45 @@ class HTTPClient(object):
         return creds
 
     def json_request(self, method, url, **kwargs):
-        kwargs.setdefault('headers', {})
+        # NOTE: copied, the caller's headers may be shared with other calls.
+        kwargs['headers'] = dict(kwargs.get('headers') or {})
         kwargs['headers'].setdefault('Content-Type', 'application/json')
         kwargs['headers'].setdefault('Accept', 'application/json')
 
         if 'data' in kwargs:
-            kwargs['data'] = jsonutils.dumps(kwargs['data'])
+            kwargs['data'] = jsoncodec.dumps(kwargs['data'])
 
-        resp = self._http_request(url, method, **kwargs)
-        body = utils.get_response_body(resp)
+        conditional = self.validator_cache is not None and method == 'GET'
+        if conditional:
+            key = context.request_key(url, kwargs['headers'], self.auth_token)
+            self.validator_cache.add_validators(key, kwargs['headers'])
+
+        resp = self._request(url, method, **kwargs)
+        if conditional:
+            body = self.validator_cache.resolve(
+                key, resp, lambda: utils.get_response_body(resp))
+        else:
+            body = utils.get_response_body(resp)
         return resp, body
 
     def raw_request(self, method, url, **kwargs):
-        kwargs.setdefault('headers', {})
+        kwargs['headers'] = dict(kwargs.get('headers') or {})
         kwargs['headers'].setdefault('Content-Type',
                                      'application/octet-stream')
-        resp = self._http_request(url, method, **kwargs)
+        resp = self._request(url, method, **kwargs)
         body = utils.get_response_body(resp)
         return resp, body
 
+    def get_stream(self, url, **kwargs):
+        """GET ``url`` without reading the response body.
+
+        The caller reads the body, e.g. with :mod:`jsonstream`, and must
+        close the response to release the connection.
+        """
+        kwargs['headers'] = dict(kwargs.get('headers') or {})
+        kwargs['headers'].setdefault('Accept', 'application/json')
+        return self._request(url, 'GET', stream=True, **kwargs)
+
     def head(self, url, **kwargs):
         return self.json_request("HEAD", url, **kwargs)
 
@@ -291,32 +439,110 @@ class HTTPClient(object):
 
 
 class SessionClient(adapter.LegacyJsonAdapter):
-    """HTTP client based on Keystone client session."""
+    """HTTP client based on Keystone client session.
+
+    Safe to share between threads like :class:`HTTPClient`, the headers of
+    :func:`request_context` are added to its requests as well.
+    """
+
+    # Opt-in conditional GETs, see cache.ValidatorCache.
+    validator_cache = None
+    # Opt-in retries, see retry.RetryPolicy.
+    retry_policy = None
+    # Request observers, see metrics.Observer.
+    observers = ()
+
+    @property
+    def last_request_id(self):
+        """Request id of the last response of the calling thread."""
+        return last_request_id()
+
+    def _headers(self, kwargs):
+        headers = dict(context.current()[0])
+        headers.update(kwargs.get('headers') or {})
+        headers.setdefault('Accept', 'application/json')
+        return headers
 
     def request(self, url, method, **kwargs):
-        redirect = kwargs.get('redirect')
         kwargs.setdefault('user_agent', USER_AGENT)
+        kwargs['headers'] = self._headers(kwargs)
 
         if 'data' in kwargs:
-            kwargs['json'] = kwargs.pop('data')
+            kwargs['headers'].setdefault('Content-Type', 'application/json')
+            kwargs['data'] = jsoncodec.dumps(kwargs['data'])
 
-        resp, body = super(SessionClient, self).request(
-            url, method,
-            raise_exc=False,
-            **kwargs)
+        return self._json_request(url, method, **kwargs)
 
-        if 400 <= resp.status_code < 600:
-            raise exc.from_response(resp, method, url)
-        elif resp.status_code in (301, 302, 305):
+    def _json_request(self, url, method, **kwargs):
+        redirect = kwargs.get('redirect')
+        conditional = self.validator_cache is not None and method == 'GET'
+        if conditional:
+            # NOTE: the token comes from the session, shared by every caller.
+            key = context.request_key(url, kwargs['headers'])
+            self.validator_cache.add_validators(key, kwargs['headers'])
+
+        def _send():
+            # NOTE: bypass the JSON handling of LegacyJsonAdapter, the bodies
+            # go through jsoncodec instead.
+            resp = adapter.Adapter.request(self, url, method,
+                                           raise_exc=False, **kwargs)
+            if 400 <= resp.status_code < 600:
+                raise exc.from_response(resp, method, url)
+            try:
+                body = jsoncodec.loads(resp.content)
+            except ValueError:
+                body = None
+            return resp, body
+
+        resp, body = self._call(method, url, _send)
+
+        if conditional:
+            body = self.validator_cache.resolve(key, resp, body)
+
+        if resp.status_code in (301, 302, 305):
             if redirect:
                 location = resp.headers.get('location')
                 path = self.strip_endpoint(location)
-                resp, body = self.request(path, method, **kwargs)
+                resp, body = self._json_request(path, method, **kwargs)
         elif resp.status_code == 300:
             raise exc.from_response(resp, method, url)
 
         return resp, body
 
+    def _call(self, method, url, send):
+        """Call ``send`` according to the retry policy and observers."""
+        def _retried_send():
+            if self.retry_policy is None:
+                return send()
+            result, retries = self.retry_policy.call(method, send)
+            resp = result[0] if isinstance(result, tuple) else result
+            resp.retries = retries
+            return result
+
+        result = metrics.observed(self.observers, method, url,
+                                  _retried_send)
+        _record_response(result[0] if isinstance(result, tuple) else result)
+        return result
+
+    def get_stream(self, url, **kwargs):
+        """GET ``url`` without reading the response body.
+
+        The caller reads the body, e.g. with :mod:`jsonstream`, and must
+        close the response to release the connection.
+        """
+        kwargs.setdefault('user_agent', USER_AGENT)
+        kwargs['headers'] = self._headers(kwargs)
+
+        def _send():
+            # NOTE: bypass the JSON decoding of LegacyJsonAdapter.
+            resp = adapter.Adapter.request(self, url, 'GET', stream=True,
+                                           raise_exc=False, **kwargs)
+            if 400 <= resp.status_code < 600:
+                raise exc.from_response(resp, 'GET', url)
+            return resp
+
+        return self._call('GET', url, _send)
+
     def credentials_headers(self):
         return {}
 
@@ -334,12 +560,46 @@ class SessionClient(adapter.LegacyJsonAdapter):
 def _construct_http_client(endpoint=None, username=None, password=None,
                            include_pass=None, endpoint_type=None,
                            auth_url=None, **kwargs):
+    """Build the HTTP client used by the managers.
+
+    When no keystone session is given an :class:`HTTPClient` is returned,
+    which keeps its connections in a pool. The pool can be tuned with
+    ``pool_connections`` (number of per-host pools to cache),
+    ``pool_maxsize`` (maximum connections kept per host) and
+    ``pool_block`` (block instead of opening extra connections when the
+    pool is exhausted).
+
+    ``conditional_get`` enables ETag/Last-Modified based conditional GETs,
+    ``retries`` or ``retry_policy`` (a :class:`retry.RetryPolicy`)
+    retries of transient failures and ``observers`` (a list of
+    :class:`metrics.Observer`) the instrumentation of every request, for
+    both kinds of clients.
+
+    ``log_body_limit`` (bytes) truncates the bodies in the debug log of an
+    :class:`HTTPClient` and ``log_body_sample_rate`` (0 to 1) only logs the
+    bodies of that fraction of the requests.
+    """
     session = kwargs.pop('session', None)
     auth = kwargs.pop('auth', None)
 
     if session:
+        # NOTE: the keystone session owns its own connection pool and does
+        # its own debug logging.
+        for opt in ('pool_connections', 'pool_maxsize', 'pool_block',
+                    'log_body_limit', 'log_body_sample_rate'):
+            kwargs.pop(opt, None)
+        conditional_get = kwargs.pop('conditional_get', False)
+        retry_policy = retry.from_kwargs(kwargs)
+        kwargs.pop('retries', None)
+        kwargs.pop('retry_policy', None)
+        observers = list(kwargs.pop('observers', None) or ())
         kwargs['endpoint_override'] = endpoint
-        return SessionClient(session, auth=auth, **kwargs)
+        client = SessionClient(session, auth=auth, **kwargs)
+        if conditional_get:
+            client.validator_cache = cache.ValidatorCache()
+        client.retry_policy = retry_policy
+        client.observers = observers
+        return client
     else:
         return HTTPClient(endpoint=endpoint, username=username,
                           password=password, include_pass=include_pass,
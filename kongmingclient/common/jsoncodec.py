@@ -0,0 +1,78 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+JSON codec of the request and response bodies.
+
+The fastest available library is picked at import time: orjson, then ujson,
+then the standard library through oslo.serialization. Both functions raise
+ValueError on invalid input whatever the codec.
+"""
+
+import logging
+
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+
+LOG = logging.getLogger(__name__)
+
+orjson = importutils.try_import('orjson')
+ujson = importutils.try_import('ujson')
+
+
+def _stdlib_loads(data):
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return jsonutils.loads(data)
+
+
+def _orjson_dumps(obj):
+    try:
+        return orjson.dumps(obj, default=jsonutils.to_primitive)
+    except TypeError:
+        # NOTE: e.g. non string keys or integers beyond 64 bits.
+        return jsonutils.dumps(obj)
+
+
+def _ujson_dumps(obj):
+    try:
+        return ujson.dumps(obj)
+    except (TypeError, OverflowError):
+        return jsonutils.dumps(obj)
+
+
+CODECS = {
+    'stdlib': (jsonutils.dumps, _stdlib_loads),
+}
+if ujson is not None:
+    CODECS['ujson'] = (_ujson_dumps, ujson.loads)
+if orjson is not None:
+    CODECS['orjson'] = (_orjson_dumps, orjson.loads)
+
+
+def _pick():
+    for name in ('orjson', 'ujson', 'stdlib'):
+        if name in CODECS:
+            return name
+
+
+name = _pick()
+dumps, loads = CODECS[name]
+LOG.debug("Using the %s JSON codec", name)
+
+
+def use(codec_name):
+    """Switch the codec used by the client to ``codec_name``."""
+    global name, dumps, loads
+    dumps, loads = CODECS[codec_name]
+    name = codec_name
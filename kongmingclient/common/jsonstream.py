@@ -0,0 +1,138 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Incremental decoding of large JSON list responses.
+"""
+
+import codecs
+import json
+import re
+
+import six
+
+from kongmingclient.common.i18n import _
+
+CHUNKSIZE = 1024 * 64  # 64kB
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class ArrayStream(object):
+    """Decode the items of one array member of a JSON object as they arrive.
+
+    Iterating yields the items of the ``key`` array of the top-level
+    object, decoding them from ``chunks`` one at a time, so that only the
+    item being decoded and the unread part of the current chunk are kept in
+    memory. The other members of the object, e.g. the pagination links, are
+    collected in :attr:`rest`, which is complete once the iteration is over.
+
+    :param chunks: iterable of bytes or text chunks of the JSON document
+    :param key: name of the array member to stream
+    """
+
+    def __init__(self, chunks, key):
+        self.key = key
+        self.rest = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buf = u''
+        self._pos = 0
+        self._eof = False
+        self._items = self._parse()
+
+    def _fill(self):
+        """Read the next chunk, return False at the end of the document."""
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buf += self._utf8.decode(b'', final=True)
+            return False
+        if isinstance(chunk, six.binary_type):
+            chunk = self._utf8.decode(chunk)
+        self._buf += chunk
+        return True
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError(_("Unexpected end of JSON document"))
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(_("Expecting one of %(chars)s at %(pos)d, got "
+                               "%(char)s") %
+                             {'chars': chars, 'pos': self._pos,
+                              'char': char})
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                # NOTE: most likely a value split between two chunks.
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+            # NOTE: a number at the end of the buffer may go on in the next
+            # chunk.
+            if end < len(self._buf) or self._eof:
+                self._pos = end
+                return value
+            self._fill()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    next = __next__
+
+    def _parse(self):
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            name = self._value()
+            self._expect(':')
+            if name == self.key and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.rest[name] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_response(resp, key, chunk_size=CHUNKSIZE):
+    """Return an :class:`ArrayStream` over the body of a streamed response."""
+    return ArrayStream(resp.iter_content(chunk_size), key)
@@ -0,0 +1,263 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Client side instrumentation of the API requests.
+
+The HTTP clients built with ``observers=[...]`` hand a :class:`RequestEvent`
+to every observer after each request. :class:`HistogramCollector` keeps
+latency histograms in memory and :func:`prometheus_text` renders them in the
+Prometheus text exposition format, e.g.::
+
+    collector = metrics.HistogramCollector()
+    client = Client(session=session, observers=[collector])
+    ...
+    print(metrics.prometheus_text(collector))
+"""
+
+import abc
+import collections
+import logging
+import re
+import threading
+
+from oslo_utils import encodeutils
+import six
+from six.moves.urllib import parse
+
+from kongmingclient.common import utils
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+DEFAULT_PREFIX = 'kongmingclient'
+
+# Placeholder of the item segment of the URLs of each collection, other
+# collections use {uuid}.
+_ITEM_PLACEHOLDERS = {'hosts': '{host_name}'}
+_VERSION_RE = re.compile(r'^v\d+(\.\d+)?$')
+
+RequestEvent = collections.namedtuple('RequestEvent', [
+    'method',          # HTTP method
+    'url',             # requested URL
+    'url_template',    # URL with the IDs replaced by placeholders
+    'status',          # status code, None when no response was received
+    'total',           # wall-clock seconds including retries
+    'connect',         # seconds to connect, None when unknown
+    'ttfb',            # seconds to the response headers, None when unknown
+    'request_bytes',   # size of the request body, None when unknown
+    'response_bytes',  # size of the response body, None when unknown
+    'retries',         # number of retries of the request
+    'request_id',      # x-openstack-request-id of the response
+])
+
+
+def url_template(url):
+    """Return ``url`` with its resource IDs replaced by placeholders.
+
+    ``/instance_cpu_mappings/<uuid>?host=a`` becomes
+    ``/instance_cpu_mappings/{uuid}``, which keeps the number of metric
+    series bounded.
+    """
+    segments = parse.urlparse(url).path.strip('/').split('/')
+    template = []
+    if segments and _VERSION_RE.match(segments[0]):
+        template.append(segments.pop(0))
+    for i, segment in enumerate(segments):
+        if i % 2:
+            segment = _ITEM_PLACEHOLDERS.get(segments[i - 1], '{uuid}')
+        template.append(segment)
+    return '/' + '/'.join(template)
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, six.text_type):
+        body = encodeutils.safe_encode(body)
+    if isinstance(body, six.binary_type):
+        return len(body)
+    return None
+
+
+def _response_bytes(resp):
+    length = resp.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return int(length)
+    # NOTE: do not read the body of streamed responses, requests keeps
+    # _content to False until the body is read.
+    if getattr(resp, '_content', False) is not False:
+        return len(resp.content or b'')
+    return None
+
+
+def build_event(method, url, start, resp=None, error=None, retries=0):
+    """Build the :class:`RequestEvent` of a finished request.
+
+    :param start: ``utils.now()`` when the request was started
+    :param resp: the final response, if any
+    :param error: the exception raised by the request, if any
+    """
+    total = utils.now() - start
+    if resp is None and error is not None:
+        resp = getattr(error, 'response', None)
+        retries = getattr(error, 'retries', retries)
+    status = ttfb = request_bytes = response_bytes = request_id = None
+    if resp is not None:
+        status = resp.status_code
+        elapsed = getattr(resp, 'elapsed', None)
+        if elapsed is not None:
+            ttfb = elapsed.total_seconds()
+        request = getattr(resp, 'request', None)
+        if request is not None:
+            request_bytes = _body_size(request.body)
+        response_bytes = _response_bytes(resp)
+        request_id = (resp.headers.get('x-openstack-request-id') or
+                      resp.headers.get('Openstack-Request-Id'))
+    return RequestEvent(method=method, url=url,
+                        url_template=url_template(url), status=status,
+                        total=total, connect=None, ttfb=ttfb,
+                        request_bytes=request_bytes,
+                        response_bytes=response_bytes, retries=retries,
+                        request_id=request_id)
+
+
+def notify(observers, event):
+    """Hand ``event`` to every observer, logging their failures."""
+    for observer in observers:
+        try:
+            observer.observe(event)
+        except Exception:
+            LOG.warning("Request observer %s failed", observer,
+                        exc_info=True)
+
+
+def observed(observers, method, url, func):
+    """Call ``func`` sending a request and notify the observers.
+
+    ``func`` returns the response or a tuple starting with it.
+    """
+    if not observers:
+        return func()
+    start = utils.now()
+    try:
+        result = func()
+    except Exception as e:
+        notify(observers, build_event(method, url, start, error=e))
+        raise
+    resp = result[0] if isinstance(result, tuple) else result
+    notify(observers, build_event(method, url, start, resp=resp,
+                                  retries=getattr(resp, 'retries', 0)))
+    return result
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Observer(object):
+    """Interface of the request observers."""
+
+    @abc.abstractmethod
+    def observe(self, event):
+        """Called with the :class:`RequestEvent` of every request.
+
+        Called in the thread sending the request, so it should be quick and
+        thread safe.
+        """
+        pass
+
+
+class HistogramCollector(Observer):
+    """Thread safe in-memory latency histograms of the API requests.
+
+    Requests are grouped by method, URL template and status. Each series
+    counts the requests per latency bucket along with the transferred bytes
+    and the retries.
+
+    :param buckets: upper bounds of the latency buckets in seconds
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event):
+        key = (event.method, event.url_template,
+               'error' if event.status is None else str(event.status))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0,
+                    'sum': 0.0, 'request_bytes': 0, 'response_bytes': 0,
+                    'retries': 0}
+            for i, bound in enumerate(self.buckets):
+                if event.total <= bound:
+                    series['buckets'][i] += 1
+            series['count'] += 1
+            series['sum'] += event.total
+            series['request_bytes'] += event.request_bytes or 0
+            series['response_bytes'] += event.response_bytes or 0
+            series['retries'] += event.retries or 0
+
+    def series(self):
+        """Return a copy of the series keyed by (method, template, status).
+
+        The ``buckets`` counts are cumulative, like Prometheus buckets.
+        """
+        with self._lock:
+            return dict((key, dict(value, buckets=list(value['buckets'])))
+                        for key, value in self._series.items())
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _labels(key, **extra):
+    method, template, status = key
+    labels = [('method', method), ('path', template), ('status', status)]
+    labels.extend(sorted(extra.items()))
+    return ','.join('%s="%s"' % (name, value.replace('\\', '\\\\')
+                                 .replace('"', '\\"').replace('\n', '\\n'))
+                    for name, value in labels)
+
+
+def prometheus_text(collector, prefix=DEFAULT_PREFIX):
+    """Render a :class:`HistogramCollector` in Prometheus text format."""
+    series = sorted(collector.series().items())
+    duration = '%s_request_duration_seconds' % prefix
+    lines = ['# HELP %s Latency of the API requests.' % duration,
+             '# TYPE %s histogram' % duration]
+    for key, value in series:
+        for bound, count in zip(collector.buckets, value['buckets']):
+            lines.append('%s_bucket{%s} %d' % (
+                duration, _labels(key, le=repr(float(bound))), count))
+        lines.append('%s_bucket{%s} %d' % (
+            duration, _labels(key, le='+Inf'), value['count']))
+        lines.append('%s_sum{%s} %r' % (duration, _labels(key),
+                                        value['sum']))
+        lines.append('%s_count{%s} %d' % (duration, _labels(key),
+                                          value['count']))
+    for name, field, help_text in (
+            ('request_bytes_total', 'request_bytes',
+             'Bytes sent in the API request bodies.'),
+            ('response_bytes_total', 'response_bytes',
+             'Bytes received in the API response bodies.'),
+            ('retries_total', 'retries', 'Retries of the API requests.')):
+        metric = '%s_%s' % (prefix, name)
+        lines.append('# HELP %s %s' % (metric, help_text))
+        lines.append('# TYPE %s counter' % metric)
+        for key, value in series:
+            lines.append('%s{%s} %d' % (metric, _labels(key), value[field]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,105 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Retry policy for transient API failures.
+"""
+
+import logging
+import random
+import time
+
+from keystoneauth1 import exceptions as ks_exc
+
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import utils
+
+LOG = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+
+class RetryPolicy(object):
+    """Retry idempotent requests on connection errors and busy responses.
+
+    The n-th retry waits a random time between 0 and
+    ``min(max_backoff, backoff * 2 ** n)`` ("full jitter"), but never less
+    than the ``Retry-After`` advertised by the server. No retry is attempted
+    once it would end after ``total_timeout`` seconds.
+
+    :param retries: maximum number of retries of a request
+    :param backoff: base of the exponential backoff in seconds
+    :param max_backoff: ceiling of a single backoff in seconds
+    :param total_timeout: ceiling of the time spent retrying in seconds
+    :param statuses: HTTP status codes to retry
+    :param methods: HTTP methods to retry
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30,
+                 total_timeout=60, statuses=RETRY_STATUSES,
+                 methods=IDEMPOTENT_METHODS):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.total_timeout = total_timeout
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+
+    def is_retryable(self, method, error):
+        if method.upper() not in self.methods:
+            return False
+        if isinstance(error, exc.HttpError):
+            return error.status_code in self.statuses
+        return isinstance(error, (exc.ConnectionError, ks_exc.ConnectionError))
+
+    def delay(self, attempt, retry_after=0):
+        """Return the seconds to wait before the ``attempt``-th retry."""
+        ceiling = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return max(retry_after or 0, random.uniform(0, ceiling))
+
+    def call(self, method, func):
+        """Call ``func`` until it succeeds or the policy gives up.
+
+        :returns: tuple of the result of ``func`` and the number of retries
+        """
+        start = utils.now()
+        attempt = 0
+        while True:
+            try:
+                return func(), attempt
+            except Exception as e:
+                # NOTE: let the caller know how hard we tried.
+                e.retries = attempt
+                if attempt >= self.retries or not self.is_retryable(method,
+                                                                    e):
+                    raise
+                delay = self.delay(attempt, getattr(e, 'retry_after', 0))
+                if utils.now() - start + delay > self.total_timeout:
+                    raise
+                LOG.debug("Retrying %(method)s in %(delay).2fs after: %(e)s",
+                          {'method': method, 'delay': delay, 'e': e})
+                time.sleep(delay)
+                attempt += 1
+
+
+def from_kwargs(kwargs):
+    """Build the retry policy described by the client ``kwargs``.
+
+    ``retry_policy`` takes a :class:`RetryPolicy`, ``retries`` the number
+    of retries of a default policy. Returns None when retries are disabled.
+    """
+    policy = kwargs.get('retry_policy')
+    if policy is None and kwargs.get('retries'):
+        policy = RetryPolicy(retries=kwargs['retries'])
+    return policy
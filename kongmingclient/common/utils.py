@@ -12,18 +12,58 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 #
+import collections
 import logging
+import time
 
+try:
+    from types import MappingProxyType as MappingProxy
+except ImportError:  # Python 2
+    MappingProxy = None
+
+from kongmingclient.common import jsoncodec
 
 LOG = logging.getLogger(__name__)
 
+# Monotonic clock of the timeouts, TTLs and latencies of the client, the
+# wall clock on Python 2.
+now = getattr(time, 'monotonic', time.time)
+
+
+if MappingProxy is None:
+    class MappingProxy(collections.Mapping):
+        """Read-only view of a mapping, see types.MappingProxyType."""
+
+        __slots__ = ('_mapping',)
+
+        def __init__(self, mapping):
+            self._mapping = mapping
+
+        def __getitem__(self, key):
+            return self._mapping[key]
+
+        def __iter__(self):
+            return iter(self._mapping)
+
+        def __len__(self):
+            return len(self._mapping)
+
+        def __contains__(self, key):
+            return key in self._mapping
+
+        def copy(self):
+            return self._mapping.copy()
+
+        def __repr__(self):
+            return 'mappingproxy(%r)' % (self._mapping,)
+
 
 def get_response_body(resp):
     body = resp.content
     content_type = resp.headers.get('Content-Type', '')
     if 'application/json' in content_type:
         try:
-            body = resp.json()
+            body = jsoncodec.loads(resp.content)
         except ValueError:
             LOG.error('Could not decode response body as JSON')
     elif 'application/octet-stream' in content_type:
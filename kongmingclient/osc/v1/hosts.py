@@ -23,9 +23,12 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 from oslo_utils import strutils
+import six
 
+from kongmingclient.common import cpu_mapping
 from kongmingclient.common.i18n import _
 from kongmingclient.common import utils as cli_utils
+from kongmingclient.v1 import cpu_index
 
 LOG = logging.getLogger(__name__)
 
@@ -54,3 +57,118 @@ class ShowHost(command.ShowOne):
             instance_uuid = instance.pop('uuid')
             info['instances:' + instance_uuid] = instance
         return zip(*sorted(info.items()))
+
+
+class ListHost(command.Lister):
+    """List all hosts"""
+
+    def get_parser(self, prog_name):
+        parser = super(ListHost, self).get_parser(prog_name)
+        parser.add_argument(
+            '--long',
+            action='store_true',
+            default=False,
+            help=_("Fetch the details of every host and list their "
+                   "instances and pinned CPUs")
+        )
+        parser.add_argument(
+            '--parallel',
+            metavar='<N>',
+            type=int,
+            default=8,
+            help=_("Number of hosts fetched concurrently with --long "
+                   "(default 8)")
+        )
+        return parser
+
+    @staticmethod
+    def _host_row(host):
+        instances = getattr(host, 'instances', None) or []
+        pinned = cpu_mapping.CPUSet()
+        for instance in instances:
+            try:
+                pinned |= cpu_mapping.CPUMapping.parse(
+                    instance.get('cpu_mappings') or '').pcpus
+            except ValueError:
+                continue
+        uuids = sorted(instance['uuid'] for instance in instances
+                       if instance.get('uuid'))
+        return (host.host_name, len(instances), str(pinned),
+                '\n'.join(uuids))
+
+    def take_action(self, parsed_args):
+        kongmingclient = self.app.client_manager.resource_pin
+        manager = kongmingclient.hosts
+        names = (host.host_name for host in manager.iter_list())
+        if not parsed_args.long:
+            return ("Host Name",), ((name,) for name in names)
+
+        def _rows():
+            # NOTE: rows are yielded as each host is fetched, a slow host
+            # only delays its own row.
+            result = 0
+            total = 0
+            for entry in manager.iter_many(names,
+                                           parallel=parsed_args.parallel):
+                total += 1
+                if entry.error is not None:
+                    result += 1
+                    LOG.error("Failed to fetch host '%(host)s': %(e)s",
+                              {'host': entry.item, 'e': entry.error})
+                    continue
+                yield self._host_row(entry.result)
+
+            if result > 0:
+                msg = (_("%(result)s of %(total)s hosts failed "
+                         "to fetch.") % {'result': result, 'total': total})
+                raise exceptions.CommandError(msg)
+
+        return (("Host Name", "Instance Count", "Pinned CPUs", "Instances"),
+                _rows())
+
+
+class HostCPUUsage(command.Lister):
+    """Display the pinned CPUs of every host"""
+
+    def get_parser(self, prog_name):
+        parser = super(HostCPUUsage, self).get_parser(prog_name)
+        parser.add_argument(
+            '--host',
+            metavar='<host_name>',
+            help=_("Only display the CPUs of this host")
+        )
+        parser.add_argument(
+            '--cpus',
+            metavar='<cpuset>',
+            help=_("Physical CPUs of the hosts in cpuset notation, e.g. "
+                   "0-31,^0-1, to also display their free CPUs")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        kongmingclient = self.app.client_manager.resource_pin
+        host_cpus = None
+        if parsed_args.cpus:
+            try:
+                host_cpus = cpu_mapping.CPUSet.parse(parsed_args.cpus)
+            except ValueError as e:
+                raise exceptions.CommandError(six.text_type(e))
+
+        filters = {'host': parsed_args.host} if parsed_args.host else None
+        # NOTE: a single listing of the mappings covers the whole cloud,
+        # rather than a request per host.
+        index = cpu_index.HostCPUIndex.build(
+            kongmingclient.instance_cpu_mappings, filters)
+
+        column_headers = ["Host", "Pinned CPUs", "Pinned Count", "Instances"]
+        if host_cpus is not None:
+            column_headers.insert(3, "Free CPUs")
+        rows = []
+        for host in index.hosts():
+            pinned = index.pinned(host)
+            row = [host, str(pinned), len(pinned),
+                   '\n'.join(index.instances(host))]
+            if host_cpus is not None:
+                row.insert(3, str(index.free(host, host_cpus)))
+            rows.append(row)
+        return column_headers, rows
@@ -16,20 +16,44 @@
 
 """Kongming v1 Instance CPU mapping action implementations"""
 
+import itertools
 import logging
 
+from cliff import columns as cliff_columns
 from osc_lib.cli import parseractions
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 from oslo_utils import strutils
+from oslo_utils import uuidutils
+import six
 
+from kongmingclient.common import cpu_mapping
 from kongmingclient.common.i18n import _
 from kongmingclient.common import utils as cli_utils
+from kongmingclient.v1 import instance_cpu_mappings as mapping_mgr
 
 LOG = logging.getLogger(__name__)
 
 
+def _check_cpu_mappings(value):
+    """Check the notation of ``value``, which is still sent as given."""
+    try:
+        cpu_mapping.CPUMapping.parse(value)
+    except ValueError as e:
+        raise exceptions.CommandError(six.text_type(e))
+
+
+class CPUMappingsColumn(cliff_columns.FormattableColumn):
+    """Render the CPU mappings in their canonical API notation."""
+
+    def human_readable(self):
+        try:
+            return str(cpu_mapping.CPUMapping.parse(self._value))
+        except (ValueError, AttributeError):
+            return self._value
+
+
 class CreateInstanceCPUMappings(command.ShowOne):
     """Create a new baremetal flavor"""
 
@@ -43,7 +67,9 @@ class CreateInstanceCPUMappings(command.ShowOne):
         parser.add_argument(
             "cpu_mappings",
             metavar="<cpu_mappings>",
-            help=_("The mappings you want to assign for the given instance.")
+            help=_("The mappings you want to assign for the given instance, "
+                   "comma separated <vcpu>:<pcpu> or <vcpu>:<pcpu>-<pcpu> "
+                   "entries, e.g. 0:4,1:5-6.")
         )
         parser.add_argument(
             "--wait-until-active",
@@ -52,20 +78,120 @@ class CreateInstanceCPUMappings(command.ShowOne):
             help=_("Whether to perform this action now or do it "
                    "automatically once the instance turn into ACTIVE status.")
         )
+        parser.add_argument(
+            "--mapping",
+            metavar="<instance_uuid>=<cpu_mappings>",
+            action='append',
+            default=[],
+            help=_("Additional mapping to create together with the given "
+                   "one (repeat option to create multiple mappings).")
+        )
+        parser.add_argument(
+            "--parallel",
+            metavar="<N>",
+            type=int,
+            default=1,
+            help=_("Number of mappings to create concurrently (default 1).")
+        )
+        parser.add_argument(
+            "--no-validate",
+            dest='validate',
+            action='store_false',
+            default=True,
+            help=_("Send the CPU mappings as given, without checking their "
+                   "notation first.")
+        )
+        parser.add_argument(
+            "--check-host",
+            metavar="<host>",
+            help=_("Host of the instance(s). Check the requested CPUs "
+                   "against the CPUs already pinned on it, and against each "
+                   "other, before sending the mapping(s).")
+        )
+        parser.add_argument(
+            "--wait",
+            action='store_true',
+            default=False,
+            help=_("Wait until the created mapping(s) become %s.") %
+            mapping_mgr.ACTIVE
+        )
         return parser
 
+    @staticmethod
+    def _wait(manager, instance_uuids, host=None):
+        mappings = manager.wait_for_mappings(
+            instance_uuids, filters={'host': host} if host else None)
+        failed = [m for m in mappings if m.status != mapping_mgr.ACTIVE]
+        for mapping in failed:
+            LOG.error("CPU mapping of instance UUID '%(uuid)s' became "
+                      "%(status)s.", {'uuid': mapping.instance_uuid,
+                                      'status': mapping.status})
+        if failed:
+            msg = (_("%(result)s of %(total)s mapping failed "
+                     "to become %(status)s.") %
+                   {'result': len(failed), 'total': len(mappings),
+                    'status': mapping_mgr.ACTIVE})
+            raise exceptions.CommandError(msg)
+        return mappings
+
     def take_action(self, parsed_args):
         kongmingclient = self.app.client_manager.resource_pin
 
+        specs = [(parsed_args.instance_uuid, parsed_args.cpu_mappings)]
+        for mapping in parsed_args.mapping:
+            instance_uuid, sep, cpu_mappings = mapping.partition('=')
+            if not sep or not instance_uuid or not cpu_mappings:
+                msg = (_("Invalid mapping '%s', expected "
+                         "<instance_uuid>=<cpu_mappings>.") % mapping)
+                raise exceptions.CommandError(msg)
+            specs.append((instance_uuid, cpu_mappings))
+        if parsed_args.validate:
+            for _instance_uuid, cpu_mappings in specs:
+                _check_cpu_mappings(cpu_mappings)
+
         info = {}
 
-        data = kongmingclient.instance_cpu_mappings.create(
-            instance_uuid=parsed_args.instance_uuid,
-            cpu_mappings=parsed_args.cpu_mappings,
-            wait_until_active=parsed_args.wait_until_active,
-        )
+        if len(specs) == 1:
+            data = kongmingclient.instance_cpu_mappings.create(
+                instance_uuid=parsed_args.instance_uuid,
+                cpu_mappings=specs[0][1],
+                wait_until_active=parsed_args.wait_until_active,
+                check_host=parsed_args.check_host,
+            )
+            if parsed_args.wait:
+                data = self._wait(kongmingclient.instance_cpu_mappings,
+                                  [parsed_args.instance_uuid],
+                                  parsed_args.check_host)[0]
+            info.update(data._info)
+            return zip(*sorted(info.items()))
+
+        results = kongmingclient.instance_cpu_mappings.bulk_create(
+            [{'instance_uuid': instance_uuid,
+              'cpu_mappings': cpu_mappings,
+              'wait_until_active': parsed_args.wait_until_active,
+              'check_host': parsed_args.check_host}
+             for instance_uuid, cpu_mappings in specs],
+            parallel=parsed_args.parallel)
+
+        for entry in results:
+            if entry.error is not None:
+                LOG.error("Failed to create cpu mapping for instance UUID "
+                          "'%(uuid)s': %(e)s",
+                          {'uuid': entry.item['instance_uuid'],
+                           'e': entry.error})
+            else:
+                info[entry.item['instance_uuid']] = entry.item['cpu_mappings']
+
+        if results.failed:
+            msg = (_("%(result)s of %(total)s mapping failed "
+                     "to create.") % {'result': len(results.failed),
+                                      'total': len(results)})
+            raise exceptions.CommandError(msg)
 
-        info.update(data._info)
+        if parsed_args.wait:
+            self._wait(kongmingclient.instance_cpu_mappings,
+                       [instance_uuid for instance_uuid, _m in specs],
+                       parsed_args.check_host)
 
         return zip(*sorted(info.items()))
 
@@ -81,23 +207,64 @@ class DeleteInstanceCPUMappings(command.Command):
             nargs='+',
             help=_("instance_cpu_mapping(s) to delete (instance UUID)")
         )
+        parser.add_argument(
+            "--parallel",
+            metavar="<N>",
+            type=int,
+            default=1,
+            help=_("Number of mappings to delete concurrently (default 1).")
+        )
         return parser
 
+    @staticmethod
+    def _index_by_name(manager):
+        index = {}
+        for mapping in manager.list():
+            name = getattr(mapping, 'name', None)
+            if name:
+                index.setdefault(name, []).append(mapping.instance_uuid)
+        return index
+
     def take_action(self, parsed_args):
         kongmingclient = self.app.client_manager.resource_pin
+        manager = kongmingclient.instance_cpu_mappings
         result = 0
+        instance_uuids = []
+        # NOTE: UUIDs are deleted directly, only name based identifiers need
+        # a lookup and they all share a single listing.
+        name_index = None
         for one_mapping in parsed_args.instance_uuid:
+            if uuidutils.is_uuid_like(one_mapping):
+                instance_uuids.append(one_mapping)
+                continue
             try:
-                data = utils.find_resource(
-                    kongmingclient.instance_cpu_mappings, one_mapping)
-                kongmingclient.instance_cpu_mappings.delete(
-                    data.instance_uuid)
+                if name_index is None:
+                    name_index = self._index_by_name(manager)
+                matches = name_index.get(one_mapping, [])
+                if not matches:
+                    raise exceptions.CommandError(
+                        _("No instance_cpu_mapping with a name or ID of "
+                          "'%s' exists.") % one_mapping)
+                if len(matches) > 1:
+                    raise exceptions.CommandError(
+                        _("More than one instance_cpu_mapping exists with "
+                          "the name '%s'.") % one_mapping)
+                instance_uuids.append(matches[0])
             except Exception as e:
                 result += 1
                 LOG.error("Failed to delete cpu mapping with instance UUID "
                           "'%(uuid)s': %(e)s",
                           {'uuid': one_mapping, 'e': e})
 
+        results = manager.bulk_delete(instance_uuids,
+                                      parallel=parsed_args.parallel,
+                                      ignore_missing=True)
+        for entry in results.failed:
+            result += 1
+            LOG.error("Failed to delete cpu mapping with instance UUID "
+                      "'%(uuid)s': %(e)s",
+                      {'uuid': entry.item, 'e': entry.error})
+
         if result > 0:
             total = len(parsed_args.instance_uuid)
             msg = (_("%(result)s of %(total)s mapping failed "
@@ -116,6 +283,19 @@ class ListInstanceCPUMappings(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        parser.add_argument(
+            '--limit',
+            metavar='<limit>',
+            type=int,
+            help=_("Number of mappings fetched per request, the listing "
+                   "follows the API pagination until it is exhausted")
+        )
+        parser.add_argument(
+            '--marker',
+            metavar='<instance_uuid>',
+            help=_("Instance UUID of the last mapping of the previous page, "
+                   "list mappings after it")
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -138,12 +318,19 @@ class ListInstanceCPUMappings(command.Lister):
             "user_id",
         )
 
-        data = kongmingclient.instance_cpu_mappings.list()
-        if not data:
+        # NOTE: rows are streamed to the formatter page by page, only the
+        # first one is read ahead to select the columns.
+        data = kongmingclient.instance_cpu_mappings.iter_list(
+            marker=parsed_args.marker, limit=parsed_args.limit)
+        try:
+            first = next(data)
+        except StopIteration:
             return (), ()
+        data = itertools.chain([first], data)
         column_headers, columns = cli_utils.clean_listing_columns(
-            column_headers, columns, data[0])
+            column_headers, columns, first)
 
+        formatters = {'cpu_mappings': CPUMappingsColumn}
         return (column_headers,
                 (utils.get_item_properties(
-                    s, columns) for s in data))
+                    s, columns, formatters=formatters) for s in data))
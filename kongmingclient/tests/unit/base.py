@@ -16,19 +16,7 @@
 
 from osc_lib.tests import utils
 
-from moganclient.tests.unit import fakes
-
 
 class TestBase(utils.TestCommand):
     """Test case base class for all unit tests."""
     pass
-
-
-class TestBaremetalComputeV1(TestBase):
-    """Test case base class for the unit tests of Baremetal Compute V1 API."""
-
-    def setUp(self):
-        super(TestBaremetalComputeV1, self).setUp()
-
-        fake_client = fakes.FakeBaremetalComputeV1Client()
-        self.app.client_manager.baremetal_compute = fake_client
@@ -0,0 +1,158 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import cache
+from kongmingclient.common import context
+from kongmingclient.common import http
+from kongmingclient.common import utils
+from kongmingclient.tests.unit import fakes
+from kongmingclient.v1 import client
+
+
+class TestResponseCache(test_base.BaseTestCase):
+
+    def test_lru_eviction(self):
+        response_cache = cache.ResponseCache(maxsize=2)
+        response_cache.set('/hosts/a', 'a')
+        response_cache.set('/hosts/b', 'b')
+        self.assertEqual('a', response_cache.get('/hosts/a'))
+        response_cache.set('/hosts/c', 'c')
+        self.assertIsNone(response_cache.get('/hosts/b'))
+        self.assertEqual('a', response_cache.get('/hosts/a'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'evictions': 1,
+                          'size': 2}, response_cache.stats)
+
+    @mock.patch.object(utils, 'now')
+    def test_ttl(self, mock_now):
+        mock_now.return_value = 100
+        response_cache = cache.ResponseCache(ttls={'hosts': 10})
+        response_cache.set('/hosts/a', 'a')
+        response_cache.set('/flavors/a', 'a')
+        mock_now.return_value = 109
+        self.assertEqual('a', response_cache.get('/hosts/a'))
+        self.assertIsNone(response_cache.get('/flavors/a'))
+        mock_now.return_value = 110
+        self.assertIsNone(response_cache.get('/hosts/a'))
+
+    def test_invalidate_collection(self):
+        response_cache = cache.ResponseCache()
+        response_cache.set('/hosts', 'all')
+        response_cache.set('/hosts?limit=1', 'page')
+        response_cache.set('/hosts/a', 'a')
+        response_cache.invalidate_collection('hosts')
+        self.assertIsNone(response_cache.peek('/hosts'))
+        self.assertIsNone(response_cache.peek('/hosts?limit=1'))
+        self.assertEqual('a', response_cache.peek('/hosts/a'))
+
+
+class TestConditionalGet(test_base.BaseTestCase):
+
+    def test_not_modified_returns_stored_body(self):
+        client = http.HTTPClient('http://kongming:6688',
+                                 conditional_get=True)
+        json_headers = {'Content-Type': 'application/json', 'ETag': '"v1"'}
+        with mock.patch.object(client.session, 'request') as mock_request:
+            mock_request.side_effect = [
+                fakes.create_http_response(200, b'{"name": "node-1"}',
+                                           json_headers),
+                fakes.create_http_response(304),
+            ]
+            first = client.get('/hosts/node-1')[1]
+            resp, second = client.get('/hosts/node-1')
+
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual({'name': 'node-1'}, second)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertNotIn('If-None-Match',
+                         mock_request.call_args_list[0][1]['headers'])
+        self.assertEqual('"v1"',
+                         mock_request.call_args_list[1][1]['headers']
+                         ['If-None-Match'])
+
+    def test_not_modified_scoped_by_credentials(self):
+        client = http.HTTPClient('http://kongming:6688',
+                                 conditional_get=True)
+        json_headers = {'Content-Type': 'application/json', 'ETag': '"v1"'}
+        with mock.patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = fakes.create_http_response(
+                200, b'{"name": "node-1"}', json_headers)
+            with http.request_context(auth_token='tenant-a'):
+                client.get('/hosts/node-1')
+            with http.request_context(auth_token='tenant-b'):
+                client.get('/hosts/node-1')
+
+        self.assertNotIn('If-None-Match',
+                         mock_request.call_args_list[1][1]['headers'])
+
+    def test_without_validators_nothing_stored(self):
+        validator_cache = cache.ValidatorCache()
+        resp = fakes.create_http_response(200)
+        self.assertEqual({}, validator_cache.resolve('/hosts', resp, {}))
+        headers = {}
+        validator_cache.add_validators('/hosts', headers)
+        self.assertEqual({}, headers)
+
+
+class TestClientCache(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestClientCache, self).setUp()
+        self.client = client.Client(endpoint='http://kongming:6688',
+                                    cache=True)
+        self.api = mock.Mock()
+        self.client.hosts.api.http_client = self.api
+
+    def test_get_served_from_cache(self):
+        self.api.get.return_value = (Response(), {'name': 'node-1'})
+        first = self.client.hosts.get('node-1')
+        second = self.client.hosts.get('node-1')
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertEqual(first, second)
+        self.assertIsNot(first._info, second._info)
+        self.assertEqual(1, self.client.cache.hits)
+
+    def test_mapping_write_invalidates_instance_and_host(self):
+        self.api.get.side_effect = [
+            (Response(), {'instance_uuid': 'uuid-1', 'host': 'node-1'}),
+            (Response(), {'name': 'node-1'}),
+            (Response(), {'name': 'node-2'}),
+        ]
+        self.api.delete.return_value = (Response(), None)
+        self.client.instances.get('uuid-1')
+        self.client.hosts.get('node-1')
+        self.client.hosts.get('node-2')
+
+        self.client.instance_cpu_mappings.delete('uuid-1')
+
+        scope = self.client.hosts.api.scope()
+        self.assertIsNone(self.client.cache.peek('/instances/uuid-1', scope))
+        self.assertIsNone(self.client.cache.peek('/hosts/node-1', scope))
+        self.assertIsNotNone(self.client.cache.peek('/hosts/node-2', scope))
+
+    def test_scoped_by_credentials(self):
+        self.api.get.side_effect = lambda url, **kw: (
+            Response(), {'name': context.current()[1]})
+        with http.request_context(auth_token='tenant-a'):
+            self.assertEqual('tenant-a', self.client.hosts.get('n').name)
+        with http.request_context(auth_token='tenant-b'):
+            self.assertEqual('tenant-b', self.client.hosts.get('n').name)
+            self.assertEqual('tenant-b', self.client.hosts.get('n').name)
+        self.assertEqual(2, self.api.get.call_count)
+        self.client.cache.invalidate('/hosts/n')
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0,
+                          'size': 0}, self.client.cache.stats)
@@ -0,0 +1,126 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import threading
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import coalesce
+from kongmingclient.common import exceptions
+from kongmingclient.common import http
+from kongmingclient.v1 import client
+
+WAITERS = 8
+
+
+class TestCoalescingHTTPClient(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestCoalescingHTTPClient, self).setUp()
+        self.release = threading.Event()
+        self.api = mock.Mock(auth_token='token')
+        self.api.get.side_effect = self._get
+        self.client = coalesce.CoalescingHTTPClient(self.api)
+
+    def _get(self, url, headers=None):
+        self.release.wait(5)
+        if url.endswith('/missing'):
+            raise exceptions.NotFound()
+        return Response(), {'host_name': url.rsplit('/', 1)[-1],
+                            'instances': [{'uuid': 'a'}]}
+
+    def _concurrent(self, func, count=WAITERS, coalesced=True):
+        results = [None] * count
+
+        def _run(i):
+            try:
+                results[i] = func(i)
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=_run, args=(i,))
+                   for i in range(count)]
+        for thread in threads:
+            thread.start()
+        # NOTE: let every thread join the call in flight.
+        for _i in range(100 if coalesced else 0):
+            if self.client.group.coalesced >= count - 1:
+                break
+            threading.Event().wait(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_identical_gets_share_one_request(self):
+        results = self._concurrent(
+            lambda i: self.client.get('/hosts/node-1', headers={}))
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertEqual(WAITERS - 1, self.client.group.coalesced)
+        bodies = [body for _resp, body in results]
+        self.assertTrue(all(body == bodies[0] for body in bodies))
+        # NOTE: every caller gets its own copy of the body.
+        self.assertEqual(WAITERS, len(set(id(body) for body in bodies)))
+        self.assertEqual(
+            WAITERS, len(set(id(body['instances']) for body in bodies)))
+
+    def test_error_shared(self):
+        results = self._concurrent(
+            lambda i: self.client.get('/hosts/missing'))
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertTrue(all(isinstance(result, exceptions.NotFound)
+                            for result in results))
+
+    def test_different_requests_not_shared(self):
+        self.release.set()
+
+        def _get(i):
+            with http.request_context(auth_token='token-%d' % (i % 2)):
+                return self.client.get('/hosts/node-1')
+
+        self._concurrent(_get, 2, coalesced=False)
+        self._concurrent(lambda i: self.client.get('/hosts/node-%d' % i), 2,
+                         coalesced=False)
+        self.client.get('/hosts/node-1',
+                        headers={'Cache-Control': 'no-cache'})
+        self.assertEqual(5, self.api.get.call_count)
+        self.assertEqual(0, self.client.group.coalesced)
+
+    def test_write_forgets_calls_in_flight(self):
+        group = self.client.group
+        started = threading.Event()
+
+        def _get(url, headers=None):
+            started.set()
+            return self._get(url, headers)
+
+        self.api.get.side_effect = _get
+        thread = threading.Thread(target=self.client.get,
+                                  args=('/hosts/node-1',))
+        thread.start()
+        started.wait(5)
+        self.client.post('/instance_cpu_mappings', data={})
+        self.assertEqual({}, group._calls)
+        self.release.set()
+        thread.join(5)
+        self.client.get('/hosts/node-1')
+        self.assertEqual(2, self.api.get.call_count)
+
+    def test_client_option(self):
+        c = client.Client(endpoint='http://kongming:6688',
+                          coalesce_gets=True, cache=True)
+        self.addCleanup(c.close)
+        self.assertIsInstance(c.hosts.api.http_client,
+                              coalesce.CoalescingHTTPClient)
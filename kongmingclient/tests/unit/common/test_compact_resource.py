@@ -0,0 +1,97 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import operator
+import pickle
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import base
+from kongmingclient.v1 import instance_cpu_mappings
+
+
+class TestCompactResource(test_base.BaseTestCase):
+
+    def test_attributes_and_storage(self):
+        info = {'instance_uuid': 'uuid-1', 'host': 'node-1'}
+        r = base.CompactResource(None, info, loaded=True)
+        self.assertEqual('node-1', r.host)
+        self.assertIs(info, r._info)
+        self.assertIs(info, r.__dict__)
+        r.extra = 1
+        self.assertEqual(1, info['extra'])
+        r.manager = 'manager'
+        self.assertNotIn('manager', info)
+        self.assertRaises(AttributeError, getattr, r, 'missing')
+
+    def test_same_as_resource(self):
+        info = {'foo': 'bar', 'baz': 'spam'}
+        r = base.Resource(None, dict(info))
+        c = base.CompactResource(None, dict(info))
+        self.assertEqual(repr(r).replace('Resource', 'CompactResource'),
+                         repr(c))
+        self.assertEqual(r.to_dict(), c.to_dict())
+        self.assertEqual(c, base.CompactResource(None, dict(info)))
+        self.assertNotEqual(c, r)
+
+    def test_to_dict_view(self):
+        for resource_class in (base.Resource, base.CompactResource):
+            info = {'uuid': 'u1', 'cpus': [0, 1]}
+            resource = resource_class(mock.Mock(), info, loaded=True)
+            view = resource.to_dict(copy=False)
+            self.assertEqual(info, dict(view))
+            self.assertRaises(TypeError, operator.setitem, view, 'uuid', 'u2')
+            self.assertIsNot(view['cpus'], resource.to_dict()['cpus'])
+            self.assertIs(view['cpus'], resource.cpus)
+
+    def test_lazy_getattr(self):
+        fake_manager = mock.Mock()
+        fake_manager.get.return_value = base.CompactResource(
+            None, {'uuid': 'fake', 'name': 'fake_name'})
+        r = base.CompactResource(fake_manager, {'uuid': 'fake'})
+        self.assertEqual('fake_name', r.name)
+        fake_manager.get.assert_called_once_with('fake')
+        self.assertTrue(r.is_loaded())
+        self.assertRaises(AttributeError, getattr, r, 'blahblah')
+
+    def test_pickle(self):
+        resp = Response()
+        resp.headers['x-openstack-request-id'] = 'req-1'
+        r = base.CompactResource(None, {'foo': 'bar'}, loaded=True,
+                                 resp=resp)
+        r.extra = 1
+        new = pickle.loads(pickle.dumps(r))
+        self.assertEqual(r, new)
+        self.assertEqual(1, new.extra)
+        self.assertEqual(['req-1'], new.request_ids)
+        self.assertTrue(new.is_loaded())
+
+    def test_setstate_from_resource(self):
+        r = base.Resource(None, {'foo': 'bar'}, loaded=True)
+        c = base.CompactResource.__new__(base.CompactResource)
+        c.__setstate__(dict(r.__dict__))
+        self.assertEqual('bar', c.foo)
+        self.assertEqual({'foo': 'bar'}, c.to_dict())
+
+    def test_compact_manager(self):
+        api = mock.Mock()
+        api.get.return_value = (Response(), {'mappings': [
+            {'instance_uuid': 'uuid-1'}]})
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            api, compact=True)
+        mapping = manager.list()[0]
+        self.assertIsInstance(mapping,
+                              instance_cpu_mappings.CompactInstanceCPUMapping)
+        self.assertEqual('uuid-1', mapping.instance_uuid)
@@ -0,0 +1,87 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import cpu_mapping
+from kongmingclient.v1 import instance_cpu_mappings
+
+
+class TestCPUSet(test_base.BaseTestCase):
+
+    def test_parse_and_str(self):
+        cpus = cpu_mapping.CPUSet.parse('0-3,^2, 8,10-11')
+        self.assertEqual([0, 1, 3, 8, 10, 11], list(cpus))
+        self.assertEqual('0-1,3,8,10-11', str(cpus))
+        self.assertEqual(cpus, cpu_mapping.CPUSet.parse(str(cpus)))
+        self.assertEqual(6, len(cpus))
+        self.assertIn(8, cpus)
+        self.assertNotIn(2, cpus)
+        self.assertEqual('', str(cpu_mapping.CPUSet()))
+
+    def test_operations(self):
+        a = cpu_mapping.CPUSet([0, 1, 2])
+        b = cpu_mapping.CPUSet([2, 3])
+        self.assertEqual(cpu_mapping.CPUSet([2]), a & b)
+        self.assertEqual(cpu_mapping.CPUSet([0, 1, 2, 3]), a | b)
+        self.assertEqual(cpu_mapping.CPUSet([0, 1]), a - b)
+        self.assertEqual(cpu_mapping.CPUSet([0, 1, 3]), a ^ b)
+        self.assertFalse(a.isdisjoint(b))
+        self.assertTrue((a - b).issubset(a))
+
+    def test_invalid(self):
+        for spec in ('a', '3-1', '-1', '1-', '0-x'):
+            self.assertRaises(ValueError, cpu_mapping.CPUSet.parse, spec)
+
+
+class TestCPUMapping(test_base.BaseTestCase):
+
+    def test_parse_and_str(self):
+        mapping = cpu_mapping.CPUMapping.parse('1:5, 0:4,2:6-7,2:9')
+        self.assertEqual((0, 1, 2), mapping.vcpus)
+        self.assertEqual(cpu_mapping.CPUSet([6, 7, 9]), mapping[2])
+        self.assertEqual('0:4,1:5,2:6-7,2:9', str(mapping))
+        self.assertEqual(mapping, cpu_mapping.CPUMapping.parse(str(mapping)))
+        self.assertEqual({0: [4], 1: [5], 2: [6, 7, 9]}, mapping.to_dict())
+        self.assertEqual(mapping, cpu_mapping.CPUMapping(mapping.to_dict()))
+        self.assertEqual('4-7,9', str(mapping.pcpus))
+        self.assertRaises(KeyError, mapping.__getitem__, 3)
+
+    def test_invalid(self):
+        for spec in ('0', '0:', 'a:1', '0:1-', '-1:2'):
+            self.assertRaises(ValueError, cpu_mapping.CPUMapping.parse, spec)
+
+    def test_overlap_union_and_free(self):
+        a = cpu_mapping.CPUMapping.parse('0:0,1:1')
+        b = cpu_mapping.CPUMapping.parse('0:1,1:2')
+        c = cpu_mapping.CPUMapping.parse('0:3')
+        self.assertTrue(a.overlaps(b))
+        self.assertFalse(a.overlaps(c))
+        self.assertEqual(cpu_mapping.CPUSet([1]), a.conflicts(b))
+        self.assertEqual('0:0-1,1:1-2', str(a | b))
+        host = cpu_mapping.CPUSet.parse('0-7')
+        self.assertEqual('4-7', str(cpu_mapping.free_cpus(host, [a, b, c])))
+
+    def test_resource_and_create(self):
+        mapping = instance_cpu_mappings.InstanceCPUMapping(
+            None, {'cpu_mappings': '0:2,1:3'}, loaded=True)
+        self.assertEqual(cpu_mapping.CPUMapping({0: 2, 1: 3}),
+                         mapping.cpu_mapping)
+
+        api = mock.Mock()
+        api.post.return_value = (mock.Mock(headers={}), {})
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(api)
+        manager.create('uuid-1', mapping.cpu_mapping)
+        self.assertEqual('0:2,1:3',
+                         api.post.call_args[1]['data']['cpu_mappings'])
@@ -14,9 +14,10 @@
 #
 
 import mock
+from oslo_serialization import jsonutils
 
-from moganclient.common import exceptions as exc
-from moganclient.tests.unit import base
+from kongmingclient.common import exceptions as exc
+from kongmingclient.tests.unit import base
 
 
 class TestHTTPExceptions(base.TestBase):
@@ -24,13 +25,13 @@ class TestHTTPExceptions(base.TestBase):
     def test_from_response(self):
         mock_resp = mock.Mock()
         mock_resp.status_code = 413
-        mock_resp.json.return_value = {
+        mock_resp.content = jsonutils.dumps({
             'entityTooLarge': {
                 'code': 413,
                 'message': 'Request Entity Too Large',
                 'details': 'Error Details...',
             }
-        }
+        })
         mock_resp.headers = {
             'Content-Type': 'application/json',
             'x-openstack-request-id': mock.sentinel.fake_request_id,
@@ -51,11 +52,11 @@ class TestHTTPExceptions(base.TestBase):
     def test_from_response_webob_new_format(self):
         mock_resp = mock.Mock()
         mock_resp.status_code = 413
-        mock_resp.json.return_value = {
+        mock_resp.content = jsonutils.dumps({
             'code': 413,
             'message': 'Request Entity Too Large',
             'details': 'Error Details...',
-        }
+        })
         mock_resp.headers = {
             'Content-Type': 'application/json',
             'x-openstack-request-id': mock.sentinel.fake_request_id,
@@ -76,11 +77,11 @@ class TestHTTPExceptions(base.TestBase):
     def test_from_response_pecan_response_format(self):
         mock_resp = mock.Mock()
         mock_resp.status_code = 400
-        mock_resp.json.return_value = {
+        mock_resp.content = jsonutils.dumps({
             u'error_message': u'{"debuginfo": null, '
                               u'"faultcode": "Client", '
                               u'"faultstring": "Error Details..."}'
-        }
+        })
         mock_resp.headers = {
             'Content-Type': 'application/json',
             'Openstack-Request-Id': 'fake_request_id',
@@ -0,0 +1,179 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import base
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import hosts
+from kongmingclient.v1 import instance_cpu_mappings
+from kongmingclient.v1 import instances
+
+MAPPINGS = [{'instance_uuid': 'uuid-%d' % i, 'host': 'node-1',
+             'cpu_mappings': '0:%d' % i} for i in range(20)]
+
+
+class TestLookupStats(test_base.BaseTestCase):
+
+    def test_choose_without_observations(self):
+        stats = base.LookupStats()
+        self.assertEqual('get', stats.choose(8, 8))
+        self.assertEqual('get', stats.choose(1000, 8))
+        stats.observe_get(0.1)
+        self.assertEqual('get', stats.choose(1000, 8))
+
+    def test_choose_by_cost(self):
+        stats = base.LookupStats()
+        stats.observe_get(0.1)
+        stats.observe_list(0.5, 1000)
+        # 4 rounds of 0.1s beat a 0.5s listing, 6 rounds do not.
+        self.assertEqual('get', stats.choose(32, 8))
+        self.assertEqual('list', stats.choose(48, 8))
+        self.assertEqual('list', stats.choose(1000, 500))
+
+    def test_get_latency_average(self):
+        stats = base.LookupStats()
+        stats.observe_get(1.0)
+        stats.observe_get(2.0)
+        self.assertAlmostEqual(1.2, stats.get_seconds)
+
+
+class TestGetMany(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestGetMany, self).setUp()
+        self.api = mock.Mock(spec=['get'])
+        self.api.get.side_effect = self._get
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def _get(self, url, headers=None):
+        if url.startswith('/instance_cpu_mappings/'):
+            uuid = url.rsplit('/', 1)[-1]
+            for mapping in MAPPINGS:
+                if mapping['instance_uuid'] == uuid:
+                    return Response(), dict(mapping)
+            raise exceptions.NotFound()
+        return Response(), {'mappings': [dict(m) for m in MAPPINGS]}
+
+    def _check(self, results, ids):
+        self.assertEqual(ids, [entry.item for entry in results])
+        self.assertEqual([uuid if uuid != 'missing' else None
+                          for uuid in ids],
+                         [entry.result and entry.result.instance_uuid
+                          for entry in results])
+        self.assertEqual([exceptions.NotFound if uuid == 'missing' else None
+                          for uuid in ids],
+                         [entry.error and type(entry.error)
+                          for entry in results])
+
+    def test_few_ids_use_gets(self):
+        ids = ['uuid-3', 'missing', 'uuid-1']
+        results = self.manager.get_many(ids, parallel=4)
+        self._check(results, ids)
+        self.assertEqual(3, self.api.get.call_count)
+        self.assertIsNotNone(self.manager.lookup_stats.get_seconds)
+
+    def test_many_ids_use_gets_until_listed(self):
+        ids = ['uuid-%d' % i for i in range(10)]
+        self.manager.get_many(ids, parallel=2)
+        self.assertEqual(10, self.api.get.call_count)
+        self.assertIsNone(self.manager.lookup_stats.list_seconds)
+
+    def test_many_ids_use_listing(self):
+        self.manager.lookup_stats.observe_get(0.05)
+        self.manager.lookup_stats.observe_list(0.05, 100)
+        ids = ['uuid-%d' % i for i in range(10)] + ['missing', 'uuid-0']
+        results = self.manager.get_many(ids, parallel=2)
+        self._check(results, ids)
+        self.api.get.assert_called_once_with('/instance_cpu_mappings',
+                                             headers={})
+        self.assertEqual(20, self.manager.lookup_stats.collection_size)
+
+    def test_learned_costs(self):
+        stats = self.manager.lookup_stats
+        stats.observe_get(0.01)
+        stats.observe_list(1.0, 20)
+        ids = ['uuid-%d' % i for i in range(10)]
+        self.manager.get_many(ids, parallel=2)
+        self.assertEqual(10, self.api.get.call_count)
+        self.api.get.reset_mock()
+        # NOTE: the whole collection is wanted.
+        self.manager.get_many([m['instance_uuid'] for m in MAPPINGS] * 2,
+                              parallel=2)
+        self.assertEqual(1, self.api.get.call_count)
+
+    def test_resources_as_ids(self):
+        ids = [self.manager.resource_class(self.manager, dict(m), True)
+               for m in MAPPINGS[:2]]
+        results = self.manager.get_many(ids, strategy='list')
+        self.assertEqual(['uuid-0', 'uuid-1'],
+                         [entry.result.instance_uuid for entry in results])
+
+    def test_light_listing_needs_explicit_strategy(self):
+        self.api.get.side_effect = lambda url, headers=None: (
+            Response(), {'host_name': url.rsplit('/', 1)[-1]})
+        manager = hosts.HostManager(self.api)
+        manager.lookup_stats.observe_get(0.05)
+        manager.lookup_stats.observe_list(0.05, 100)
+        manager.get_many(['a%d' % i for i in range(20)], parallel=2)
+        self.assertEqual(20, self.api.get.call_count)
+
+    def test_listing_switches_to_list(self):
+        self.manager.lookup_stats.observe_get(1.0)
+        ids = ['uuid-%d' % i for i in range(10)]
+        self.manager.get_many(ids, parallel=2)
+        self.assertEqual(10, self.api.get.call_count)
+        # NOTE: a listing of the whole collection is observed, a filtered
+        # one is not.
+        self.manager.list(filters={'host': 'node-1'})
+        self.assertIsNone(self.manager.lookup_stats.list_seconds)
+        self.assertEqual(20, len(list(self.manager.iter_list())))
+        self.assertEqual(20, self.manager.lookup_stats.collection_size)
+        self.api.get.reset_mock()
+        results = self.manager.get_many(ids, parallel=2)
+        self._check(results, ids)
+        self.api.get.assert_called_once_with('/instance_cpu_mappings',
+                                             headers={})
+
+    def test_whole_collection_after_list(self):
+        self.assertEqual(20, len(self.manager.list()))
+        self.api.get.reset_mock()
+        self.manager.get_many([m['instance_uuid'] for m in MAPPINGS],
+                              parallel=2)
+        self.assertEqual(1, self.api.get.call_count)
+
+    def test_instances_listing_is_detailed(self):
+        self.api.get.side_effect = lambda url, headers=None: (
+            Response(), {'instances': [{'uuid': 'a%d' % i}
+                                       for i in range(20)]})
+        manager = instances.InstanceManager(self.api)
+        manager.list()
+        self.api.get.reset_mock()
+        results = manager.get_many(['a%d' % i for i in range(20)])
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertEqual([], results.failed)
+
+    def test_unknown_strategy(self):
+        self.assertRaises(ValueError, self.manager.get_many, ['uuid-1'],
+                          strategy='gets')
+        self.assertFalse(self.api.get.called)
+
+    def test_no_ids(self):
+        self.assertEqual([], self.manager.get_many([]))
+        self.assertFalse(self.api.get.called)
+
+    def test_manager_with_find_is_abstract(self):
+        self.assertRaises(TypeError, base.ManagerWithFind, None)
@@ -20,23 +20,26 @@ from keystoneauth1 import adapter
 import mock
 from osc_lib.tests import fakes as osc_fakes
 from oslo_serialization import jsonutils
+import requests
 import six
 
-from moganclient.common import exceptions as exc
-from moganclient.common import http
-from moganclient.common import utils
-from moganclient.tests.unit import base
-from moganclient.tests.unit import fakes
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import http
+from kongmingclient.common import jsoncodec
+from kongmingclient.common import utils
+from kongmingclient.tests.unit import base
+from kongmingclient.tests.unit import fakes
 
 
-@mock.patch('moganclient.common.http.requests.request')
+# NOTE: HTTPClient sends its requests through a pooled requests.Session.
+@mock.patch.object(requests.Session, 'request')
 class TestHttpClient(base.TestBase):
 
     def setUp(self):
         super(TestHttpClient, self).setUp()
 
     def test_http_raw_request(self, mock_request):
-        headers = {'User-Agent': 'python-moganclient',
+        headers = {'User-Agent': 'python-kongmingclient',
                    'Content-Type': 'application/octet-stream'}
         mock_request.return_value = fakes.FakeHTTPResponse(200, 'OK', {}, '')
         client = http.HTTPClient('http://example.com:6688')
@@ -71,17 +74,17 @@ class TestHttpClient(base.TestBase):
         mock_request.assert_has_calls([
             mock.call('GET', 'http://example.com:6688',
                       allow_redirects=False,
-                      headers={'User-Agent': 'python-moganclient',
+                      headers={'User-Agent': 'python-kongmingclient',
                                'Content-Type': 'application/octet-stream'}),
             mock.call('GET', 'http://example.com:6688',
                       allow_redirects=False,
-                      headers={'User-Agent': 'python-moganclient',
+                      headers={'User-Agent': 'python-kongmingclient',
                                'X-Auth-Key': osc_fakes.PASSWORD,
                                'X-Auth-User': osc_fakes.USERNAME,
                                'Content-Type': 'application/octet-stream'}),
             mock.call('GET', 'http://example.com:6688',
                       allow_redirects=False,
-                      headers={'User-Agent': 'python-moganclient',
+                      headers={'User-Agent': 'python-kongmingclient',
                                'X-Auth-Token': osc_fakes.AUTH_TOKEN,
                                'Content-Type': 'application/octet-stream'})
         ])
@@ -100,7 +103,7 @@ class TestHttpClient(base.TestBase):
             'GET', 'http://example.com:6688',
             allow_redirects=False,
             headers={'X-Region-Name': osc_fakes.REGION_NAME,
-                     'User-Agent': 'python-moganclient',
+                     'User-Agent': 'python-kongmingclient',
                      'Content-Type': 'application/octet-stream'})
 
     def test_http_json_request(self, mock_request):
@@ -118,7 +121,7 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_argument_passed_to_requests(self, mock_request):
         """Check that we have sent the proper arguments to requests."""
@@ -140,11 +143,11 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             cert=('RANDOM_CERT_FILE', 'RANDOM_KEY_FILE'),
             verify=True,
-            data='"text"',
+            data=jsoncodec.dumps('text'),
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
                      'X-Auth-Url': osc_fakes.AUTH_URL,
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_w_req_body(self, mock_request):
         # Record a 200
@@ -157,11 +160,11 @@ class TestHttpClient(base.TestBase):
         self.assertEqual({}, body)
         mock_request.assert_called_once_with(
             'POST', 'http://example.com:6688',
-            data='"test-body"',
+            data=jsoncodec.dumps('test-body'),
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_non_json_resp_cont_type(self, mock_request):
         # Record a 200
@@ -173,11 +176,12 @@ class TestHttpClient(base.TestBase):
         self.assertEqual(200, resp.status_code)
         self.assertIsNone(body)
         mock_request.assert_called_once_with(
-            'POST', 'http://example.com:6688', data='"test-data"',
+            'POST', 'http://example.com:6688',
+            data=jsoncodec.dumps('test-data'),
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_invalid_json(self, mock_request):
         # Record a 200
@@ -193,7 +197,7 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_redirect_delete(self, mock_request):
         mock_request.side_effect = [
@@ -215,12 +219,12 @@ class TestHttpClient(base.TestBase):
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'}),
+                               'User-Agent': 'python-kongmingclient'}),
             mock.call('DELETE', 'http://example.com:6688/foo/bar',
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'})
+                               'User-Agent': 'python-kongmingclient'})
         ])
 
     def test_http_json_request_redirect_post(self, mock_request):
@@ -243,12 +247,12 @@ class TestHttpClient(base.TestBase):
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'}),
+                               'User-Agent': 'python-kongmingclient'}),
             mock.call('POST', 'http://example.com:6688/foo/bar',
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'})
+                               'User-Agent': 'python-kongmingclient'})
         ])
 
     def test_http_json_request_redirect_put(self, mock_request):
@@ -271,12 +275,12 @@ class TestHttpClient(base.TestBase):
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'}),
+                               'User-Agent': 'python-kongmingclient'}),
             mock.call('PUT', 'http://example.com:6688/foo/bar',
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'})
+                               'User-Agent': 'python-kongmingclient'})
         ])
 
     def test_http_json_request_redirect_diff_location(self, mock_request):
@@ -299,12 +303,12 @@ class TestHttpClient(base.TestBase):
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'}),
+                               'User-Agent': 'python-kongmingclient'}),
             mock.call('PUT', 'http://example.com:6688/diff_lcation',
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'})
+                               'User-Agent': 'python-kongmingclient'})
         ])
 
     def test_http_json_request_redirect_error_without_location(self,
@@ -319,7 +323,7 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_json_request_redirect_get(self, mock_request):
         # Record the 302
@@ -343,12 +347,12 @@ class TestHttpClient(base.TestBase):
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'}),
+                               'User-Agent': 'python-kongmingclient'}),
             mock.call('GET', 'http://example.com:6688',
                       allow_redirects=False,
                       headers={'Content-Type': 'application/json',
                                'Accept': 'application/json',
-                               'User-Agent': 'python-moganclient'})
+                               'User-Agent': 'python-kongmingclient'})
         ])
 
     def test_http_404_json_request(self, mock_request):
@@ -365,7 +369,7 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_http_300_json_request(self, mock_request):
         mock_request.return_value = fakes.FakeHTTPResponse(
@@ -382,12 +386,12 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'})
+                     'User-Agent': 'python-kongmingclient'})
 
     def test_fake_json_request(self, mock_request):
         headers = {'Content-Type': 'application/json',
                    'Accept': 'application/json',
-                   'User-Agent': 'python-moganclient'}
+                   'User-Agent': 'python-kongmingclient'}
         mock_request.side_effect = [socket.gaierror]
 
         client = http.HTTPClient('fake://example.com:6688')
@@ -400,7 +404,7 @@ class TestHttpClient(base.TestBase):
     def test_http_request_socket_error(self, mock_request):
         headers = {'Content-Type': 'application/json',
                    'Accept': 'application/json',
-                   'User-Agent': 'python-moganclient'}
+                   'User-Agent': 'python-kongmingclient'}
         mock_request.side_effect = [socket.error]
 
         client = http.HTTPClient('http://example.com:6688')
@@ -413,7 +417,7 @@ class TestHttpClient(base.TestBase):
     def test_http_request_socket_timeout(self, mock_request):
         headers = {'Content-Type': 'application/json',
                    'Accept': 'application/json',
-                   'User-Agent': 'python-moganclient'}
+                   'User-Agent': 'python-kongmingclient'}
         mock_request.side_effect = [socket.timeout]
 
         client = http.HTTPClient('http://example.com:6688')
@@ -436,7 +440,7 @@ class TestHttpClient(base.TestBase):
             allow_redirects=False,
             headers={'Content-Type': 'application/json',
                      'Accept': 'application/json',
-                     'User-Agent': 'python-moganclient'},
+                     'User-Agent': 'python-kongmingclient'},
             timeout=float(123))
 
     def test_get_system_ca_file(self, mock_request):
@@ -457,7 +461,7 @@ class TestHttpClient(base.TestBase):
         client = http.HTTPClient('https://foo', ca_file="NOWHERE")
         self.assertEqual("NOWHERE", client.verify_cert)
 
-        with mock.patch('moganclient.common.http.get_system_ca_file') as gsf:
+        with mock.patch.object(http, 'get_system_ca_file') as gsf:
             gsf.return_value = "SOMEWHERE"
             client = http.HTTPClient('https://foo')
             self.assertEqual("SOMEWHERE", client.verify_cert)
@@ -479,13 +483,20 @@ class TestSessionClient(base.TestBase):
 
     def setUp(self):
         super(TestSessionClient, self).setUp()
-        self.request = mock.patch.object(adapter.LegacyJsonAdapter,
+        # NOTE: SessionClient bypasses the JSON handling of
+        # LegacyJsonAdapter and decodes the bodies through jsoncodec.
+        self.request = mock.patch.object(adapter.Adapter,
                                          'request').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _call_args(self, call):
+        # NOTE: the first argument is the client itself.
+        return call[0][1:], call[1]
 
     def test_session_simple_request(self):
         resp = fakes.FakeHTTPResponse(
             200, 'OK', {'Content-Type': 'application/octet-stream'}, '{}')
-        self.request.return_value = (resp, {})
+        self.request.return_value = resp
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -498,7 +509,7 @@ class TestSessionClient(base.TestBase):
         fake = fakes.FakeHTTPResponse(
             200, 'OK', {'Content-Type': 'application/json'},
             jsonutils.dumps({'some': 'body'}))
-        self.request.return_value = (fake, {'some': 'body'})
+        self.request.return_value = fake
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -508,10 +519,22 @@ class TestSessionClient(base.TestBase):
         self.assertEqual({'some': 'body'}, resp.json())
         self.assertEqual({'some': 'body'}, body)
 
+    def test_last_request_id(self):
+        self.request.return_value = fakes.FakeHTTPResponse(
+            200, 'OK', {'Content-Type': 'application/json',
+                        'x-openstack-request-id': 'req-1'}, '{}')
+
+        client = http.SessionClient(session=mock.ANY,
+                                    auth=mock.ANY)
+        client.request('', 'GET')
+        self.assertEqual('req-1', client.last_request_id)
+        self.assertRaises(AttributeError, setattr, client,
+                          'last_request_id', 'req-2')
+
     def test_404_error_response(self):
         fake = fakes.FakeHTTPResponse(
             404, 'Not Found', {'Content-Type': 'application/json'}, '')
-        self.request.return_value = (fake, '')
+        self.request.return_value = fake
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -526,8 +549,7 @@ class TestSessionClient(base.TestBase):
         fake2 = fakes.FakeHTTPResponse(200, 'OK',
                                        {'Content-Type': 'application/json'},
                                        jsonutils.dumps({'Mount': 'Fuji'}))
-        self.request.side_effect = [
-            (fake1, None), (fake2, {'Mount': 'Fuji'})]
+        self.request.side_effect = [fake1, fake2]
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY,
@@ -538,12 +560,14 @@ class TestSessionClient(base.TestBase):
         self.assertEqual({'Mount': 'Fuji'}, utils.get_response_body(resp))
         self.assertEqual({'Mount': 'Fuji'}, body)
 
-        self.assertEqual(('', 'GET'), self.request.call_args_list[0][0])
-        self.assertEqual(('ishere', 'GET'), self.request.call_args_list[1][0])
-        for call in self.request.call_args_list:
-            self.assertEqual({'user_agent': 'python-moganclient',
+        calls = [self._call_args(c) for c in self.request.call_args_list]
+        self.assertEqual([('', 'GET'), ('ishere', 'GET')],
+                         [args for args, _kwargs in calls])
+        for _args, kwargs in calls:
+            self.assertEqual({'user_agent': 'python-kongmingclient',
+                              'headers': {'Accept': 'application/json'},
                               'raise_exc': False,
-                              'redirect': True}, call[1])
+                              'redirect': True}, kwargs)
 
     def test_302_location_not_override(self):
         fake1 = fakes.FakeHTTPResponse(
@@ -551,8 +575,7 @@ class TestSessionClient(base.TestBase):
         fake2 = fakes.FakeHTTPResponse(200, 'OK',
                                        {'Content-Type': 'application/json'},
                                        jsonutils.dumps({'Mount': 'Fuji'}))
-        self.request.side_effect = [
-            (fake1, None), (fake2, {'Mount': 'Fuji'})]
+        self.request.side_effect = [fake1, fake2]
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY,
@@ -563,18 +586,19 @@ class TestSessionClient(base.TestBase):
         self.assertEqual({'Mount': 'Fuji'}, utils.get_response_body(resp))
         self.assertEqual({'Mount': 'Fuji'}, body)
 
-        self.assertEqual(('', 'GET'), self.request.call_args_list[0][0])
-        self.assertEqual(('http://no.where/ishere',
-                          'GET'), self.request.call_args_list[1][0])
-        for call in self.request.call_args_list:
-            self.assertEqual({'user_agent': 'python-moganclient',
+        calls = [self._call_args(c) for c in self.request.call_args_list]
+        self.assertEqual([('', 'GET'), ('http://no.where/ishere', 'GET')],
+                         [args for args, _kwargs in calls])
+        for _args, kwargs in calls:
+            self.assertEqual({'user_agent': 'python-kongmingclient',
+                              'headers': {'Accept': 'application/json'},
                               'raise_exc': False,
-                              'redirect': True}, call[1])
+                              'redirect': True}, kwargs)
 
     def test_redirect_302_no_location(self):
         fake = fakes.FakeHTTPResponse(
             302, 'OK', {}, '')
-        self.request.side_effect = [(fake, '')]
+        self.request.side_effect = [fake]
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -587,7 +611,7 @@ class TestSessionClient(base.TestBase):
         fake = fakes.FakeHTTPResponse(302, 'OK',
                                       {'location': 'http://no.where/ishere'},
                                       '')
-        self.request.side_effect = [(fake, '')]
+        self.request.side_effect = [fake]
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -598,7 +622,7 @@ class TestSessionClient(base.TestBase):
     def test_300_error_response(self):
         fake = fakes.FakeHTTPResponse(
             300, 'FAIL', {'Content-Type': 'application/octet-stream'}, '')
-        self.request.return_value = (fake, '')
+        self.request.return_value = fake
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -611,7 +635,7 @@ class TestSessionClient(base.TestBase):
         # for 506 we don't have specific exception type
         fake = fakes.FakeHTTPResponse(
             506, 'FAIL', {'Content-Type': 'application/octet-stream'}, '')
-        self.request.return_value = (fake, '')
+        self.request.return_value = fake
 
         client = http.SessionClient(session=mock.ANY,
                                     auth=mock.ANY)
@@ -628,19 +652,22 @@ class TestSessionClient(base.TestBase):
 
         client = http.SessionClient(mock.ANY)
 
-        self.request.return_value = (fake, {})
+        self.request.return_value = fake
 
         resp, body = client.request('', 'GET', **kwargs)
 
+        _args, sent = self._call_args(self.request.call_args)
+        self.assertEqual('some_data', jsonutils.loads(sent.pop('data')))
         self.assertEqual({'endpoint_override': 'http://no.where/',
-                          'json': 'some_data',
-                          'user_agent': 'python-moganclient',
-                          'raise_exc': False}, self.request.call_args[1])
+                          'headers': {'Accept': 'application/json',
+                                      'Content-Type': 'application/json'},
+                          'user_agent': 'python-kongmingclient',
+                          'raise_exc': False}, sent)
         self.assertEqual(200, resp.status_code)
         self.assertEqual({}, body)
         self.assertEqual({}, utils.get_response_body(resp))
 
-    @mock.patch.object(jsonutils, 'dumps')
+    @mock.patch.object(jsoncodec, 'dumps')
     def test_kwargs_with_files(self, mock_dumps):
         fake = fakes.FakeHTTPResponse(
             200, 'OK', {'Content-Type': 'application/json'}, '{}')
@@ -650,14 +677,18 @@ class TestSessionClient(base.TestBase):
                   'data': {'files': data}}
         client = http.SessionClient(mock.ANY)
 
-        self.request.return_value = (fake, {})
+        self.request.return_value = fake
 
         resp, body = client.request('', 'GET', **kwargs)
 
+        mock_dumps.assert_called_once_with({'files': data})
         self.assertEqual({'endpoint_override': 'http://no.where/',
-                          'json': {'files': data},
-                          'user_agent': 'python-moganclient',
-                          'raise_exc': False}, self.request.call_args[1])
+                          'data': "{'files': test}}",
+                          'headers': {'Accept': 'application/json',
+                                      'Content-Type': 'application/json'},
+                          'user_agent': 'python-kongmingclient',
+                          'raise_exc': False},
+                         self._call_args(self.request.call_args)[1])
         self.assertEqual(200, resp.status_code)
         self.assertEqual({}, body)
         self.assertEqual({}, utils.get_response_body(resp))
@@ -665,7 +696,7 @@ class TestSessionClient(base.TestBase):
     def test_methods(self):
         fake = fakes.FakeHTTPResponse(
             200, 'OK', {'Content-Type': 'application/json'}, '{}')
-        self.request.return_value = (fake, {})
+        self.request.return_value = fake
 
         client = http.SessionClient(mock.ANY)
         methods = [client.get, client.put, client.post, client.patch,
@@ -0,0 +1,58 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import http
+
+
+class TestHTTPClientDebugLog(test_base.BaseTestCase):
+
+    def _request(self, client, debug):
+        resp = mock.Mock(status_code=200, headers={}, reason='OK',
+                         raw=mock.Mock(version=11))
+        resp.content_property = mock.PropertyMock(return_value=b'x' * 100)
+        type(resp).content = resp.content_property
+        with mock.patch.object(client.session, 'request',
+                               return_value=resp), \
+                mock.patch.object(http.LOG, 'isEnabledFor',
+                                  return_value=debug), \
+                mock.patch.object(http.LOG, 'debug') as mock_debug:
+            client._http_request('/hosts', 'POST', data='y' * 100)
+        return resp, mock_debug
+
+    def test_disabled(self):
+        client = http.HTTPClient('http://example.com:6688', token='tok')
+        with mock.patch.object(client, 'safe_header') as mock_safe_header:
+            resp, mock_debug = self._request(client, False)
+        self.assertFalse(mock_safe_header.called)
+        self.assertFalse(mock_debug.called)
+        self.assertFalse(resp.content_property.called)
+
+    def test_truncated(self):
+        client = http.HTTPClient('http://example.com:6688',
+                                 log_body_limit=10)
+        resp, mock_debug = self._request(client, True)
+        curl, response = [c[0][0] for c in mock_debug.call_args_list]
+        self.assertIn("-d 'yyyyyyyyyy... (90 bytes truncated)'", curl)
+        self.assertIn('xxxxxxxxxx... (90 bytes truncated)', response)
+
+    def test_not_sampled(self):
+        client = http.HTTPClient('http://example.com:6688',
+                                 log_body_sample_rate=0)
+        resp, mock_debug = self._request(client, True)
+        curl, response = [c[0][0] for c in mock_debug.call_args_list]
+        self.assertIn('<body not sampled>', curl)
+        self.assertNotIn('xxx', response)
+        self.assertFalse(resp.content_property.called)
@@ -0,0 +1,57 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import operator
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import http
+
+
+class TestHTTPClientHeaders(test_base.BaseTestCase):
+
+    def _request(self, client, headers):
+        with mock.patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = mock.Mock(
+                status_code=200, headers={}, content=b'',
+                raw=mock.Mock(version=11), reason='OK')
+            client._http_request('/hosts', 'GET', headers=headers)
+        return mock_request.call_args[1]['headers']
+
+    def test_merge_leaves_caller_headers_untouched(self):
+        client = http.HTTPClient('http://example.com:6688', token='tok',
+                                 region_name='r1')
+        headers = {'Accept': 'application/json', 'X-Region-Name': 'r2'}
+        sent = self._request(client, headers)
+        self.assertEqual({'User-Agent': 'python-kongmingclient',
+                          'X-Auth-Token': 'tok',
+                          'X-Region-Name': 'r2',
+                          'Accept': 'application/json'}, sent)
+        self.assertEqual({'Accept': 'application/json',
+                          'X-Region-Name': 'r2'}, headers)
+
+    def test_base_headers_follow_credentials(self):
+        client = http.HTTPClient('http://example.com:6688', token='tok')
+        base_headers = client._base_headers()
+        self.assertIs(base_headers, client._base_headers())
+        self.assertRaises(TypeError, operator.setitem, base_headers, 'a', 'b')
+        client.auth_token = 'new'
+        self.assertEqual('new', self._request(client, {})['X-Auth-Token'])
+
+    def test_credentials_headers(self):
+        client = http.HTTPClient('http://example.com:6688', username='u',
+                                 password='p')
+        sent = self._request(client, {'X-Auth-Key': 'other'})
+        self.assertEqual('u', sent['X-Auth-User'])
+        self.assertEqual('p', sent['X-Auth-Key'])
@@ -0,0 +1,58 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import http
+
+
+class TestHTTPClientPool(test_base.BaseTestCase):
+
+    def test_default_pool(self):
+        client = http.HTTPClient('http://example.com:6688')
+        adapter = client.session.get_adapter('http://example.com:6688')
+        self.assertEqual(http.DEFAULT_POOL_CONNECTIONS,
+                         adapter._pool_connections)
+        self.assertEqual(http.DEFAULT_POOL_MAXSIZE, adapter._pool_maxsize)
+        self.assertFalse(adapter._pool_block)
+
+    def test_pool_options(self):
+        client = http._construct_http_client(
+            endpoint='https://example.com:6688', insecure=True,
+            pool_connections=2, pool_maxsize=32, pool_block=True)
+        adapter = client.session.get_adapter('https://example.com:6688')
+        self.assertEqual(2, adapter._pool_connections)
+        self.assertEqual(32, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+
+    def test_session_reused(self):
+        client = http.HTTPClient('http://example.com:6688')
+        with mock.patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = mock.Mock(
+                status_code=200, headers={}, content=b'',
+                raw=mock.Mock(version=11), reason='OK')
+            client.raw_request('GET', '/hosts')
+            client.raw_request('GET', '/instances')
+        self.assertEqual(2, mock_request.call_count)
+        mock_request.assert_called_with(
+            'GET', 'http://example.com:6688/instances',
+            allow_redirects=False,
+            headers={'User-Agent': 'python-kongmingclient',
+                     'Content-Type': 'application/octet-stream'})
+
+    def test_pool_options_dropped_for_keystone_session(self):
+        client = http._construct_http_client(
+            endpoint='http://example.com:6688', session=mock.Mock(),
+            pool_maxsize=32)
+        self.assertIsInstance(client, http.SessionClient)
@@ -0,0 +1,33 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import http
+
+
+class TestHTTPClientGetStream(test_base.BaseTestCase):
+
+    def test_get_stream(self):
+        client = http.HTTPClient('http://example.com:6688')
+        with mock.patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = mock.Mock(
+                status_code=200, headers={}, raw=mock.Mock(version=11),
+                reason='OK')
+            resp = client.get_stream('/hosts')
+        self.assertIs(mock_request.return_value, resp)
+        mock_request.assert_called_once_with(
+            'GET', 'http://example.com:6688/hosts', allow_redirects=False,
+            stream=True, headers={'User-Agent': 'python-kongmingclient',
+                                  'Accept': 'application/json'})
@@ -0,0 +1,123 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import threading
+
+from oslotest import base as test_base
+
+from kongmingclient.common import http
+from kongmingclient.tests.unit import fakes
+from kongmingclient.v1 import client
+
+THREADS = 16
+CALLS = 25
+
+
+class TestHTTPClientConcurrency(test_base.BaseTestCase):
+    """Share one client between threads against a local stub server."""
+
+    def setUp(self):
+        super(TestHTTPClientConcurrency, self).setUp()
+        self.server = fakes.StubServer(self._respond)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client = client.Client(endpoint=self.server.endpoint,
+                                    token='shared',
+                                    pool_maxsize=THREADS,
+                                    conditional_get=True)
+        self.addCleanup(self.client.close)
+
+    @staticmethod
+    def _respond(request):
+        """Echo the request back as a host, the request id being its path."""
+        name = request.path.rsplit('/', 1)[-1]
+        body = {
+            'host_name': name,
+            'instances': [],
+            'token': request.headers.get('X-Auth-Token'),
+            'worker': request.headers.get('X-Worker'),
+            'etag_sent': request.headers.get('If-None-Match'),
+        }
+        return 200, body, {'x-openstack-request-id': 'req-' + name,
+                           'ETag': '"%s"' % name}
+
+    def _worker(self, worker, errors):
+        token = 'token-%d' % worker if worker % 2 else None
+        try:
+            with http.request_context(headers={'X-Worker': str(worker)},
+                                      auth_token=token):
+                for call in range(CALLS):
+                    name = 'w%d-c%d' % (worker, call)
+                    host = self.client.hosts.get(name)
+                    expected = (name, str(worker), token or 'shared', None,
+                                ['req-' + name], 'req-' + name,
+                                'req-' + name)
+                    actual = (host.host_name, host.worker, host.token,
+                              host.etag_sent, host.request_ids,
+                              http.last_request_id(),
+                              self.client.http_client.last_request_id)
+                    if actual != expected:
+                        errors.append((expected, actual))
+        except Exception as e:
+            errors.append(e)
+
+    def test_shared_client(self):
+        before = http.last_request_id()
+        errors = []
+        threads = [threading.Thread(target=self._worker, args=(i, errors))
+                   for i in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        self.assertEqual([], errors[:5])
+        self.assertEqual(before, http.last_request_id())
+
+    def test_async_calls(self):
+        pending = dict((name, self.client.hosts.get_async(name))
+                       for name in ('n%d' % i for i in range(THREADS * 4)))
+        for name, future in pending.items():
+            host = future.result(60)
+            self.assertEqual(name, host.host_name)
+            self.assertEqual(['req-' + name], host.request_ids)
+
+    def test_context_nesting(self):
+        with http.request_context(headers={'X-Worker': 'outer'},
+                                  auth_token='outer'):
+            with http.request_context(headers={'X-Worker': 'inner'}):
+                host = self.client.hosts.get('a')
+                self.assertEqual(('inner', 'outer'),
+                                 (host.worker, host.token))
+            host = self.client.hosts.get('b')
+            self.assertEqual('outer', host.worker)
+        host = self.client.hosts.get('c')
+        self.assertEqual((None, 'shared'), (host.worker, host.token))
+
+    def test_context_on_executor(self):
+        with http.request_context(headers={'X-Worker': 'caller'},
+                                  auth_token='caller'):
+            future = self.client.hosts.get_async('a')
+            hosts = self.client.hosts.iter_many(['b', 'c'], parallel=2)
+            many = self.client.hosts.get_many(['e', 'f'], parallel=2,
+                                              strategy='get')
+        host = future.result(60)
+        self.assertEqual(('caller', 'caller'), (host.worker, host.token))
+        # NOTE: iterated outside of the context it was created in.
+        for entry in hosts:
+            self.assertEqual(('caller', 'caller'),
+                             (entry.result.worker, entry.result.token))
+        for entry in many:
+            self.assertEqual(('caller', 'caller'),
+                             (entry.result.worker, entry.result.token))
+        host = self.client.hosts.get_async('d').result(60)
+        self.assertEqual((None, 'shared'), (host.worker, host.token))
@@ -0,0 +1,86 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import datetime
+
+from keystoneauth1 import session as ks_session
+from oslotest import base as test_base
+from requests_mock.contrib import fixture as rm_fixture
+
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import http
+from kongmingclient.common import jsoncodec
+
+
+class TestJSONCodec(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestJSONCodec, self).setUp()
+        self.addCleanup(jsoncodec.use, jsoncodec.name)
+
+    def test_codecs(self):
+        document = {'mappings': [{'instance_uuid': u'uuid-\xe9',
+                                  'cpus': [0, 1], 'weight': 1.5,
+                                  'host': None}]}
+        for name in jsoncodec.CODECS:
+            jsoncodec.use(name)
+            data = jsoncodec.dumps(document)
+            self.assertEqual(document, jsoncodec.loads(data))
+            self.assertEqual(document, jsoncodec.loads(
+                data if isinstance(data, bytes) else data.encode('utf-8')))
+            self.assertRaises(ValueError, jsoncodec.loads, b'{"a": ')
+            self.assertRaises(ValueError, jsoncodec.loads, b'')
+
+    def test_fallback_to_primitive(self):
+        now = datetime.datetime(2017, 1, 1, 12, 0)
+        for name in jsoncodec.CODECS:
+            jsoncodec.use(name)
+            self.assertEqual({'1': '2017-01-01T12:00:00.000000'},
+                             jsoncodec.loads(jsoncodec.dumps({1: now})))
+
+    def test_fastest_codec_picked(self):
+        for name in ('orjson', 'ujson', 'stdlib'):
+            if name in jsoncodec.CODECS:
+                break
+        self.assertEqual(name, jsoncodec.name)
+
+
+class TestSessionClientCodec(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestSessionClientCodec, self).setUp()
+        self.requests = self.useFixture(rm_fixture.Fixture())
+        self.client = http._construct_http_client(
+            endpoint='http://kongming', session=ks_session.Session())
+
+    def test_request_and_response(self):
+        self.requests.post('http://kongming/hosts', status_code=201,
+                           json={'name': 'node-1'})
+        resp, body = self.client.post('/hosts', data={'name': 'node-1'})
+        self.assertEqual({'name': 'node-1'}, body)
+        request = self.requests.last_request
+        self.assertEqual({'name': 'node-1'}, request.json())
+        self.assertEqual('application/json', request.headers['Content-Type'])
+        self.assertEqual('application/json', request.headers['Accept'])
+
+    def test_empty_response(self):
+        self.requests.delete('http://kongming/hosts/node-1', status_code=204)
+        resp, body = self.client.delete('/hosts/node-1')
+        self.assertIsNone(body)
+
+    def test_error(self):
+        self.requests.get('http://kongming/hosts/node-1', status_code=404,
+                          json={'message': 'Host node-1 not found'},
+                          headers={'Content-Type': 'application/json'})
+        e = self.assertRaises(exc.NotFound, self.client.get, '/hosts/node-1')
+        self.assertEqual('Host node-1 not found (HTTP 404)', e.message)
@@ -0,0 +1,72 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import json
+
+from oslotest import base as test_base
+
+from kongmingclient.common import jsonstream
+
+
+def _chunks(document, size):
+    data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestArrayStream(test_base.BaseTestCase):
+
+    document = {
+        'mappings_links': [{'rel': 'self', 'href': 'http://a'}],
+        'mappings': [{'instance_uuid': u'uuid-é', 'cpus': [0, 1]},
+                     {'instance_uuid': 'uuid-2', 'weight': 12345},
+                     'uuid-3', 42],
+        'next': 'http://kongming/instance_cpu_mappings?marker=uuid-3',
+        'total': 1024,
+    }
+
+    def test_chunk_sizes(self):
+        rest = dict(self.document)
+        items = rest.pop('mappings')
+        for size in (1, 2, 3, 7, 64, 1 << 16):
+            stream = jsonstream.ArrayStream(_chunks(self.document, size),
+                                            'mappings')
+            self.assertEqual(items, list(stream))
+            self.assertEqual(rest, stream.rest)
+
+    def test_lazy(self):
+        chunks = _chunks({'mappings': [{'n': i} for i in range(100)]}, 16)
+        read = []
+
+        def _read():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        stream = jsonstream.ArrayStream(_read(), 'mappings')
+        self.assertEqual({'n': 0}, next(stream))
+        self.assertLess(len(read), 3)
+        self.assertEqual(99, len(list(stream)))
+        self.assertEqual(len(chunks), len(read))
+
+    def test_missing_or_empty(self):
+        for document in ({}, {'mappings': []}, {'other': [1]}):
+            stream = jsonstream.ArrayStream(_chunks(document, 3), 'mappings')
+            self.assertEqual([], list(stream))
+            document.pop('mappings', None)
+            self.assertEqual(document, stream.rest)
+
+    def test_invalid(self):
+        for data in (b'', b'[1, 2]', b'{"mappings": [1, 2}',
+                     b'{"mappings": [{"a": 1'):
+            stream = jsonstream.ArrayStream([data], 'mappings')
+            self.assertRaises(ValueError, list, stream)
@@ -0,0 +1,119 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import base
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import hosts
+from kongmingclient.v1 import instance_cpu_mappings
+
+MAPPINGS = [
+    {'instance_uuid': 'uuid-1', 'host': 'node-1', 'cpu_mappings': '0:1'},
+    {'instance_uuid': 'uuid-2', 'host': 'node-1', 'cpu_mappings': '0:2'},
+]
+
+
+class TestLazyLoad(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestLazyLoad, self).setUp()
+        base.reset_lazy_load_counts()
+        self.addCleanup(base.reset_lazy_load_counts)
+        self.api = mock.Mock(spec=['get'])
+
+        def _get(url, headers=None):
+            if url.startswith('/instance_cpu_mappings/'):
+                return Response(), MAPPINGS[0]
+            if url.startswith('/hosts/'):
+                return Response(), {'host_name': url[7:], 'instances': []}
+            return Response(), {'mappings': MAPPINGS}
+
+        self.api.get.side_effect = _get
+
+    def _stale(self, manager, compact=False):
+        cls = (manager.compact_resource_class if compact else
+               manager.resource_class)
+        return [cls(manager, {'instance_uuid': mapping['instance_uuid']})
+                for mapping in MAPPINGS]
+
+    def test_lazy_load_counted(self):
+        for compact in (False, True):
+            manager = instance_cpu_mappings.InstanceCPUMapingManager(
+                self.api, compact)
+            mapping = self._stale(manager)[0]
+            self.assertEqual('0:1', mapping.cpu_mappings)
+        self.api.get.assert_called_with('/instance_cpu_mappings/uuid-1',
+                                        headers={})
+        self.assertEqual(
+            {('InstanceCPUMapping', 'cpu_mappings'): 1,
+             ('CompactInstanceCPUMapping', 'cpu_mappings'): 1},
+            base.lazy_load_counts())
+
+    def test_strict_mode(self):
+        for compact in (False, True):
+            manager = instance_cpu_mappings.InstanceCPUMapingManager(
+                self.api, compact, lazy_load=False)
+            mapping = self._stale(manager)[0]
+            self.assertFalse(hasattr(mapping, 'cpu_mappings'))
+            self.assertRaises(AttributeError, getattr, mapping, 'host')
+            self.assertEqual('uuid-1', mapping.instance_uuid)
+        self.assertFalse(self.api.get.called)
+        self.assertEqual({}, base.lazy_load_counts())
+
+    def test_ensure_loaded_single_listing(self):
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api, lazy_load=False)
+        stale = self._stale(manager)
+        stale.append(manager.resource_class(manager,
+                                            {'instance_uuid': 'gone'}))
+        loaded = manager.resource_class(manager, dict(MAPPINGS[0]),
+                                        loaded=True)
+        result = manager.ensure_loaded(stale + [loaded],
+                                       filters={'host': 'node-1'})
+        self.assertEqual(stale + [loaded], [entry.item for entry in result])
+        self.assertEqual([stale[2]], [entry.item for entry in result.failed])
+        self.assertIsInstance(result.failed[0].error, exceptions.NotFound)
+        self.api.get.assert_called_once_with(
+            '/instance_cpu_mappings?host=node-1', headers={})
+        self.assertEqual(['0:1', '0:2'],
+                         [mapping.cpu_mappings for mapping in stale[:2]])
+        self.assertEqual([True, True, False],
+                         [mapping.is_loaded() for mapping in stale])
+
+    def test_ensure_loaded_get_fallback(self):
+        manager = hosts.HostManager(self.api)
+        stale = [manager.resource_class(manager, {'host_name': name})
+                 for name in ('node-1', 'node-2')]
+        manager.ensure_loaded(stale, parallel=1)
+        self.assertEqual(2, self.api.get.call_count)
+        self.assertEqual([[], []], [host.instances for host in stale])
+        self.assertEqual({}, base.lazy_load_counts())
+
+    def test_ensure_loaded_get_failure(self):
+        manager = hosts.HostManager(self.api)
+        self.api.get.side_effect = exceptions.NotFound()
+        stale = [manager.resource_class(manager, {'host_name': 'gone'})]
+        result = manager.ensure_loaded(stale)
+        self.assertIsInstance(result.failed[0].error, exceptions.NotFound)
+        self.assertFalse(stale[0].is_loaded())
+
+    def test_ensure_loaded_nothing_stale(self):
+        manager = hosts.HostManager(self.api)
+        host = manager.resource_class(manager, {'host_name': 'a'},
+                                      loaded=True)
+        self.assertEqual([host], [entry.result
+                                  for entry in manager.ensure_loaded([host])])
+        self.assertFalse(self.api.get.called)
@@ -0,0 +1,66 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import instance_cpu_mappings
+from kongmingclient.v1 import instances
+
+MAPPINGS = [
+    {'instance_uuid': 'uuid-1', 'host': 'node-1', 'name': 'vm1',
+     'cpu_mappings': '0:1'},
+    {'instance_uuid': 'uuid-2', 'host': 'node-1', 'name': 'vm2',
+     'cpu_mappings': '0:2'},
+    {'instance_uuid': 'uuid-3', 'host': 'node-2', 'name': 'vm1',
+     'cpu_mappings': '0:1'},
+]
+
+
+class TestManagerFind(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestManagerFind, self).setUp()
+        self.api = mock.Mock()
+        self.api.get.return_value = (Response(), {'mappings': MAPPINGS,
+                                                  'instances': MAPPINGS})
+
+    def test_findall_server_side_filter(self):
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(self.api)
+        found = manager.findall(host='node-1', name='vm1')
+        self.api.get.assert_called_once_with(
+            '/instance_cpu_mappings?host=node-1', headers={})
+        self.assertEqual(['uuid-1'], [m.instance_uuid for m in found])
+
+    def test_findall_client_side_only(self):
+        manager = instances.InstanceManager(self.api)
+        found = manager.findall(name='vm1')
+        self.api.get.assert_called_once_with('/instances', headers={})
+        self.assertEqual(['uuid-1', 'uuid-3'],
+                         [m.instance_uuid for m in found])
+
+    def test_findall_missing_attribute(self):
+        manager = instances.InstanceManager(self.api)
+        self.assertEqual([], manager.findall(flavor='small'))
+
+    def test_find_detailed_list_skips_get(self):
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(self.api)
+        found = manager.find(name='vm2')
+        self.assertEqual('uuid-2', found.instance_uuid)
+        self.assertEqual(1, self.api.get.call_count)
+
+    def test_find_no_unique_match(self):
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(self.api)
+        self.assertRaises(exceptions.NoUniqueMatch, manager.find, name='vm1')
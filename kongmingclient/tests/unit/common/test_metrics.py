@@ -0,0 +1,138 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import datetime
+
+import mock
+from oslotest import base as test_base
+import requests
+
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import http
+from kongmingclient.common import metrics
+
+
+def _response(status_code, content=b'{}', request_id='req-1'):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = content
+    resp.headers['Content-Type'] = 'application/json'
+    resp.headers['x-openstack-request-id'] = request_id
+    resp.elapsed = datetime.timedelta(milliseconds=20)
+    resp.request = requests.Request(
+        'POST', 'http://example.com:6688/hosts', data='{"a": 1}').prepare()
+    resp.raw = mock.Mock(version=11)
+    return resp
+
+
+def _event(total, status=200, method='GET', template='/hosts'):
+    return metrics.RequestEvent(
+        method=method, url=template, url_template=template, status=status,
+        total=total, connect=None, ttfb=None, request_bytes=10,
+        response_bytes=100, retries=1, request_id='req-1')
+
+
+class TestURLTemplate(test_base.BaseTestCase):
+
+    def test_templates(self):
+        self.assertEqual('/instance_cpu_mappings',
+                         metrics.url_template('/instance_cpu_mappings'))
+        self.assertEqual('/instance_cpu_mappings/{uuid}',
+                         metrics.url_template(
+                             '/instance_cpu_mappings/4c2a?host=a'))
+        self.assertEqual('/hosts/{host_name}',
+                         metrics.url_template('/hosts/node-1'))
+        self.assertEqual('/v1/instances/{uuid}', metrics.url_template(
+            'http://example.com:6688/v1/instances/4c2a'))
+
+
+class TestObserver(test_base.BaseTestCase):
+
+    def test_observe_is_abstract(self):
+        self.assertRaises(TypeError, metrics.Observer)
+        self.assertIsInstance(metrics.HistogramCollector(), metrics.Observer)
+
+
+class TestHistogramCollector(test_base.BaseTestCase):
+
+    def test_observe(self):
+        collector = metrics.HistogramCollector(buckets=(0.1, 1))
+        collector.observe(_event(0.05))
+        collector.observe(_event(0.5))
+        collector.observe(_event(5, status=None))
+        series = collector.series()
+        ok = series[('GET', '/hosts', '200')]
+        self.assertEqual([1, 2], ok['buckets'])
+        self.assertEqual(2, ok['count'])
+        self.assertAlmostEqual(0.55, ok['sum'])
+        self.assertEqual(200, ok['response_bytes'])
+        self.assertEqual(2, ok['retries'])
+        self.assertEqual([0, 0], series[('GET', '/hosts', 'error')]['buckets'])
+
+    def test_prometheus_text(self):
+        collector = metrics.HistogramCollector(buckets=(0.1,))
+        collector.observe(_event(0.05))
+        text = metrics.prometheus_text(collector)
+        labels = 'method="GET",path="/hosts",status="200"'
+        self.assertIn('# TYPE kongmingclient_request_duration_seconds '
+                      'histogram\n', text)
+        self.assertIn('kongmingclient_request_duration_seconds_bucket{%s,'
+                      'le="0.1"} 1\n' % labels, text)
+        self.assertIn('kongmingclient_request_duration_seconds_bucket{%s,'
+                      'le="+Inf"} 1\n' % labels, text)
+        self.assertIn('kongmingclient_request_duration_seconds_count{%s} 1\n'
+                      % labels, text)
+        self.assertIn('kongmingclient_response_bytes_total{%s} 100\n'
+                      % labels, text)
+        self.assertIn('kongmingclient_retries_total{%s} 1\n' % labels, text)
+
+
+class TestHTTPClientObservers(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestHTTPClientObservers, self).setUp()
+        self.observer = mock.Mock()
+        self.client = http._construct_http_client(
+            endpoint='http://example.com:6688', observers=[self.observer])
+        patcher = mock.patch.object(self.client.session, 'request')
+        self.mock_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_event(self):
+        self.mock_request.return_value = _response(201)
+        self.client.post('/hosts', data={'a': 1})
+        event = self.observer.observe.call_args[0][0]
+        self.assertEqual('POST', event.method)
+        self.assertEqual('/hosts', event.url_template)
+        self.assertEqual(201, event.status)
+        self.assertEqual(0.02, event.ttfb)
+        self.assertEqual(8, event.request_bytes)
+        self.assertEqual(2, event.response_bytes)
+        self.assertEqual(0, event.retries)
+        self.assertEqual('req-1', event.request_id)
+        self.assertGreaterEqual(event.total, 0)
+
+    def test_error_event(self):
+        self.mock_request.return_value = _response(
+            404, b'{"message": "missing"}', request_id='req-2')
+        self.assertRaises(exc.NotFound, self.client.get, '/hosts/node-1')
+        event = self.observer.observe.call_args[0][0]
+        self.assertEqual('/hosts/{host_name}', event.url_template)
+        self.assertEqual(404, event.status)
+        self.assertEqual('req-2', event.request_id)
+
+    def test_failing_observer(self):
+        self.observer.observe.side_effect = ValueError
+        self.mock_request.return_value = _response(200)
+        resp, body = self.client.get('/hosts')
+        self.assertEqual({}, body)
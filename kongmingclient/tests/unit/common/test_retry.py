@@ -0,0 +1,79 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import socket
+
+import mock
+from oslotest import base as test_base
+
+from kongmingclient.common import exceptions as exc
+from kongmingclient.common import http
+from kongmingclient.common import retry
+from kongmingclient.tests.unit import fakes
+from kongmingclient.v1 import hosts
+
+
+@mock.patch('time.sleep')
+class TestRetryPolicy(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestRetryPolicy, self).setUp()
+        self.client = http.HTTPClient('http://kongming:6688', retries=3)
+        patcher = mock.patch.object(self.client.session, 'request')
+        self.mock_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retry_service_unavailable(self, mock_sleep):
+        json_headers = {'Content-Type': 'application/json'}
+        self.mock_request.side_effect = [
+            fakes.create_http_response(503, headers={'Retry-After': '7'}),
+            fakes.create_http_response(502),
+            fakes.create_http_response(200, b'{"name": "node-1"}',
+                                       json_headers),
+        ]
+        host = hosts.HostManager(self.client).get('node-1')
+        self.assertEqual('node-1', host.name)
+        self.assertEqual(2, host.request_retries)
+        self.assertEqual(7, mock_sleep.call_args_list[0][0][0])
+        self.assertEqual(2, mock_sleep.call_count)
+
+    def test_retry_connection_error(self, mock_sleep):
+        self.mock_request.side_effect = [socket.error('refused'),
+                                         fakes.create_http_response(200)]
+        resp, body = self.client.raw_request('GET', '/hosts')
+        self.assertEqual(1, resp.retries)
+
+    def test_no_retry_on_post(self, mock_sleep):
+        self.mock_request.return_value = fakes.create_http_response(503)
+        self.assertRaises(exc.ServiceUnavailable, self.client.post,
+                          '/instance_cpu_mappings', data={})
+        self.assertEqual(1, self.mock_request.call_count)
+        self.assertFalse(mock_sleep.called)
+
+    def test_gives_up(self, mock_sleep):
+        self.mock_request.return_value = fakes.create_http_response(429)
+        self.assertRaises(exc.TooManyRequests, self.client.get, '/hosts')
+        self.assertEqual(4, self.mock_request.call_count)
+
+    def test_total_timeout(self, mock_sleep):
+        self.client.retry_policy = retry.RetryPolicy(total_timeout=5)
+        self.mock_request.return_value = fakes.create_http_response(
+            503, headers={'Retry-After': '10'})
+        self.assertRaises(exc.ServiceUnavailable, self.client.get, '/hosts')
+        self.assertEqual(1, self.mock_request.call_count)
+
+    def test_backoff_ceiling(self, mock_sleep):
+        policy = retry.RetryPolicy(backoff=1, max_backoff=4)
+        for attempt in range(10):
+            self.assertLessEqual(policy.delay(attempt), 4)
+        self.assertEqual(9, policy.delay(10, retry_after=9))
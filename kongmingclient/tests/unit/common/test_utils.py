@@ -15,8 +15,8 @@
 
 import mock
 
-from moganclient.common import utils
-from moganclient.tests.unit import base
+from kongmingclient.common import utils
+from kongmingclient.tests.unit import base
 
 
 class TestUtils(base.TestBase):
@@ -24,17 +24,16 @@ class TestUtils(base.TestBase):
     def test_get_response_body_json(self):
         resp = mock.Mock()
         resp.headers = {'Content-Type': 'application/json'}
-        resp.json.return_value = mock.sentinel.fake_body
+        resp.content = b'{"some": "body"}'
         body = utils.get_response_body(resp)
-        self.assertEqual(mock.sentinel.fake_body, body)
+        self.assertEqual({'some': 'body'}, body)
 
     def test_get_response_body_json_value_error(self):
         resp = mock.Mock()
-        resp.content = mock.sentinel.fake_content
+        resp.content = b'{json format error.'
         resp.headers = {'Content-Type': 'application/json'}
-        resp.json.side_effect = ValueError('json format error.')
         body = utils.get_response_body(resp)
-        self.assertEqual(mock.sentinel.fake_content, body)
+        self.assertEqual(b'{json format error.', body)
 
     def test_get_response_body_raw(self):
         resp = mock.Mock()
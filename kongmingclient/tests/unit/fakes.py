@@ -14,20 +14,17 @@
 #
 
 import copy
+import json
+import threading
 
 import mock
 from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 from requests import Response
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
 
-from moganclient.common import base
-from moganclient.v1 import aggregate
-from moganclient.v1 import availability_zone
-from moganclient.v1 import flavor
-from moganclient.v1 import manageable_server
-from moganclient.v1 import node
-from moganclient.v1 import server
-from moganclient.v1 import server_group
+from kongmingclient.common import base
 
 
 # fake request id
@@ -55,28 +52,19 @@ def create_response_obj_with_compute_header():
     return resp
 
 
-def create_resource_manager():
-    return FakeManager()
-
-
-class FakeBaremetalComputeV1Client(object):
+def create_http_response(status_code, content=b'', headers=None):
+    """Return a :class:`requests.Response` as sent back by the API."""
+    resp = Response()
+    resp.status_code = status_code
+    resp.reason = 'OK'
+    resp.raw = mock.Mock(version=11)
+    resp.headers.update(headers or {})
+    resp._content = content
+    return resp
 
-    def __init__(self, **kwargs):
-        self.fake_http_client = mock.Mock()
 
-        self.flavor = flavor.FlavorManager(
-            self.fake_http_client)
-        self.server = server.ServerManager(self.fake_http_client)
-        self.availability_zone = availability_zone.AvailabilityZoneManager(
-            self.fake_http_client)
-        self.node = node.NodeManager(self.fake_http_client)
-        self.aggregate = aggregate.AggregateManager(self.fake_http_client)
-        self.server_group = server_group.ServerGroupManager(
-            self.fake_http_client)
-        self.aggregate_node = aggregate.AggregateNodeManager(
-            self.fake_http_client)
-        self.manageable_server = manageable_server.ManageableServerManager(
-            self.fake_http_client)
+def create_resource_manager():
+    return FakeManager()
 
 
 class FakeHTTPClient(object):
@@ -427,3 +415,62 @@ class FakeServerGroup(object):
             info=copy.deepcopy(server_group_info),
             loaded=True)
         return server_group
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight,
+                                       server.in_flight)
+        try:
+            status, body, headers = server.respond(self)
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in sorted(headers.items()):
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Threaded HTTP server on a free local port, answering every GET.
+
+    :param respond: callable taking the request handler and returning the
+        status, the JSON body and the extra headers of the response
+    """
+
+    daemon_threads = True
+
+    def __init__(self, respond):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0),
+                                           StubHandler)
+        self.respond = respond
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def endpoint(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,57 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from osc_lib import exceptions
+from osc_lib.tests import utils
+
+from kongmingclient.common import base
+from kongmingclient.osc.v1 import hosts
+from kongmingclient.v1 import hosts as host_mgr
+
+
+class TestListHost(utils.TestCommand):
+
+    def setUp(self):
+        super(TestListHost, self).setUp()
+        self.manager = mock.Mock(spec=host_mgr.HostManager)
+        self.app.client_manager.resource_pin = mock.Mock(hosts=self.manager)
+        self.cmd = hosts.ListHost(self.app, None)
+        self.manager.iter_list.return_value = iter([
+            self._host({'host_name': 'node-1'}),
+            self._host({'host_name': 'node-2'})])
+
+    def _host(self, info):
+        return host_mgr.Host(None, info, loaded=True)
+
+    def test_list_long(self):
+        host = self._host({'host_name': 'node-1', 'instances': [
+            {'uuid': 'uuid-1', 'cpu_mappings': '0:0-1'}]})
+        self.manager.iter_many.return_value = iter([
+            base.BulkItem('node-1', host, None)])
+        parsed_args = self.check_parser(self.cmd, ['--long'],
+                                        [('long', True)])
+        columns, rows = self.cmd.take_action(parsed_args)
+        self.assertEqual([('node-1', 1, '0-1', 'uuid-1')], list(rows))
+
+    def test_list_long_failures(self):
+        host = self._host({'host_name': 'node-1', 'instances': []})
+        self.manager.iter_many.return_value = iter([
+            base.BulkItem('node-1', host, None),
+            base.BulkItem('node-2', None, Exception('boom'))])
+        parsed_args = self.check_parser(self.cmd, ['--long'],
+                                        [('long', True)])
+        columns, rows = self.cmd.take_action(parsed_args)
+        self.assertEqual(('node-1', 0, '', ''), next(rows))
+        e = self.assertRaises(exceptions.CommandError, next, rows)
+        self.assertEqual('1 of 2 hosts failed to fetch.', str(e))
@@ -0,0 +1,169 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from osc_lib import exceptions
+from osc_lib.tests import utils
+
+from kongmingclient.common import base
+from kongmingclient.osc.v1 import instance_cpu_mapping
+from kongmingclient.v1 import instance_cpu_mappings as mapping_mgr
+
+UUID_1 = '6e4e4c2a-1f3b-4a55-9c3b-6b8f2d1f0a01'
+UUID_2 = '6e4e4c2a-1f3b-4a55-9c3b-6b8f2d1f0a02'
+
+
+class TestInstanceCPUMapping(utils.TestCommand):
+
+    def setUp(self):
+        super(TestInstanceCPUMapping, self).setUp()
+        self.manager = mock.Mock(spec=mapping_mgr.InstanceCPUMapingManager)
+        self.app.client_manager.resource_pin = mock.Mock(
+            instance_cpu_mappings=self.manager)
+
+    def _mapping(self, info):
+        return mapping_mgr.InstanceCPUMapping(None, info, loaded=True)
+
+
+class TestDeleteInstanceCPUMappings(TestInstanceCPUMapping):
+
+    def setUp(self):
+        super(TestDeleteInstanceCPUMappings, self).setUp()
+        self.cmd = instance_cpu_mapping.DeleteInstanceCPUMappings(
+            self.app, None)
+        self.manager.bulk_delete.return_value = base.BulkResult([])
+
+    def test_delete_uuids_without_lookup(self):
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, UUID_2],
+            [('instance_uuid', [UUID_1, UUID_2]), ('parallel', 1)])
+        self.cmd.take_action(parsed_args)
+        self.assertFalse(self.manager.list.called)
+        self.assertFalse(self.manager.find.called)
+        self.manager.bulk_delete.assert_called_once_with(
+            [UUID_1, UUID_2], parallel=1, ignore_missing=True)
+
+    def test_delete_names_share_one_listing(self):
+        self.manager.list.return_value = [
+            self._mapping({'instance_uuid': UUID_1, 'name': 'vm-1'}),
+            self._mapping({'instance_uuid': UUID_2, 'name': 'vm-2'}),
+        ]
+        parsed_args = self.check_parser(
+            self.cmd, ['vm-1', 'vm-2', UUID_1], [])
+        self.cmd.take_action(parsed_args)
+        self.manager.list.assert_called_once_with()
+        self.assertFalse(self.manager.find.called)
+        self.manager.bulk_delete.assert_called_once_with(
+            [UUID_1, UUID_2, UUID_1], parallel=1, ignore_missing=True)
+
+    def test_delete_parallel(self):
+        self.manager.bulk_delete.return_value = base.BulkResult([
+            base.BulkItem(UUID_1, None, None),
+            base.BulkItem(UUID_2, None, exceptions.CommandError('boom')),
+        ])
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, UUID_2, '--parallel', '8'],
+            [('parallel', 8)])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.manager.bulk_delete.assert_called_once_with(
+            [UUID_1, UUID_2], parallel=8, ignore_missing=True)
+
+    def test_delete_unknown_name(self):
+        self.manager.list.return_value = []
+        parsed_args = self.check_parser(self.cmd, ['vm-1', UUID_1], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.manager.bulk_delete.assert_called_once_with(
+            [UUID_1], parallel=1, ignore_missing=True)
+
+
+class TestCreateInstanceCPUMappings(TestInstanceCPUMapping):
+
+    def setUp(self):
+        super(TestCreateInstanceCPUMappings, self).setUp()
+        self.cmd = instance_cpu_mapping.CreateInstanceCPUMappings(
+            self.app, None)
+        self.manager.create.side_effect = lambda **kwargs: self._mapping(
+            {'instance_uuid': kwargs['instance_uuid'],
+             'cpu_mappings': kwargs['cpu_mappings']})
+
+    def test_create_sends_notation_as_given(self):
+        parsed_args = self.check_parser(self.cmd, [UUID_1, '1:5,0:4'],
+                                        [('validate', True)])
+        self.cmd.take_action(parsed_args)
+        self.assertEqual('1:5,0:4',
+                         self.manager.create.call_args[1]['cpu_mappings'])
+
+    def test_create_invalid_notation(self):
+        parsed_args = self.check_parser(self.cmd, [UUID_1, '0:x'], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.assertFalse(self.manager.create.called)
+
+    def test_create_without_validation(self):
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, '0:x', '--no-validate'],
+            [('validate', False)])
+        self.cmd.take_action(parsed_args)
+        self.assertEqual('0:x',
+                         self.manager.create.call_args[1]['cpu_mappings'])
+
+    def test_create_many(self):
+        self.manager.bulk_create.return_value = base.BulkResult([
+            base.BulkItem({'instance_uuid': UUID_1, 'cpu_mappings': '0:1'},
+                          None, None),
+            base.BulkItem({'instance_uuid': UUID_2, 'cpu_mappings': '0:2'},
+                          None, None),
+        ])
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, '0:1', '--mapping', UUID_2 + '=0:2',
+                       '--parallel', '4', '--check-host', 'node-1'],
+            [('mapping', [UUID_2 + '=0:2']), ('parallel', 4)])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertFalse(self.manager.create.called)
+        self.manager.bulk_create.assert_called_once_with(
+            [{'instance_uuid': UUID_1, 'cpu_mappings': '0:1',
+              'wait_until_active': False, 'check_host': 'node-1'},
+             {'instance_uuid': UUID_2, 'cpu_mappings': '0:2',
+              'wait_until_active': False, 'check_host': 'node-1'}],
+            parallel=4)
+        self.assertEqual(((UUID_1, UUID_2), ('0:1', '0:2')),
+                         (columns, data))
+
+    def test_create_many_failure(self):
+        self.manager.bulk_create.return_value = base.BulkResult([
+            base.BulkItem({'instance_uuid': UUID_2, 'cpu_mappings': '0:2'},
+                          None, exceptions.CommandError('boom')),
+        ])
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, '0:1', '--mapping', UUID_2 + '=0:2'], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+    def test_create_invalid_mapping_option(self):
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, '0:1', '--mapping', UUID_2], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.assertFalse(self.manager.bulk_create.called)
+
+    def test_create_wait_on_checked_host(self):
+        self.manager.wait_for_mappings.return_value = [self._mapping(
+            {'instance_uuid': UUID_1, 'status': mapping_mgr.ACTIVE})]
+        parsed_args = self.check_parser(
+            self.cmd, [UUID_1, '0:1', '--check-host', 'node-1', '--wait'],
+            [('wait', True)])
+        self.cmd.take_action(parsed_args)
+        self.manager.wait_for_mappings.assert_called_once_with(
+            [UUID_1], filters={'host': 'node-1'})
@@ -0,0 +1,330 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import sys
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+import testtools
+
+from kongmingclient.common import exceptions
+from kongmingclient.tests.unit import fakes
+
+# NOTE: the asyncio client needs Python 3.6 for asynchronous generators.
+if sys.version_info >= (3, 6):
+    import asyncio
+
+    from kongmingclient.common import async_http
+    from kongmingclient.v1 import async_client
+    aiohttp = async_http.aiohttp
+else:
+    aiohttp = None
+
+
+@testtools.skipIf(aiohttp is None, 'aiohttp is not available')
+class TestAsyncClient(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestAsyncClient, self).setUp()
+        self.respond = mock.Mock(side_effect=self._respond)
+        self.server = fakes.StubServer(self.respond)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.endpoint = self.server.endpoint
+
+    @staticmethod
+    def _respond(request):
+        uuid = request.path.rsplit('/', 1)[-1]
+        if uuid == 'missing':
+            status, body = 404, {'message': 'not found'}
+        else:
+            status, body = 200, {'instance_uuid': uuid, 'host': 'node-1'}
+        return status, body, {'x-openstack-request-id': 'req-%s' % uuid}
+
+    def _run(self, coro):
+        return asyncio.new_event_loop().run_until_complete(coro)
+
+    def test_get_fan_out(self):
+        async def fan_out():
+            async with async_client.AsyncClient(
+                    endpoint=self.endpoint, token='token',
+                    max_concurrency=4) as client:
+                return await asyncio.gather(
+                    *[client.instance_cpu_mappings.get('uuid-%d' % i)
+                      for i in range(40)])
+
+        results = self._run(fan_out())
+        self.assertEqual(['uuid-%d' % i for i in range(40)],
+                         [r.instance_uuid for r in results])
+        self.assertEqual(['req-uuid-3'], results[3].request_ids)
+        self.assertTrue(results[0].is_loaded())
+        self.assertLessEqual(self.server.max_in_flight, 4)
+
+    def test_shared_host_manager(self):
+        client = async_client.AsyncClient(endpoint=self.endpoint)
+        self.assertIs(client.hosts,
+                      client.instance_cpu_mappings.host_manager)
+
+    def test_error_mapping(self):
+        async def get_missing():
+            async with async_client.AsyncClient(
+                    endpoint=self.endpoint, token='token') as client:
+                return await client.hosts.get('missing')
+
+        self.assertRaises(exceptions.NotFound, self._run, get_missing())
+
+    def test_client_error_mapping(self):
+        async def get_disconnected():
+            async with async_client.AsyncClient(
+                    endpoint=self.endpoint, token='token') as client:
+                with mock.patch.object(
+                        aiohttp.ClientSession, 'request',
+                        side_effect=aiohttp.ServerDisconnectedError()):
+                    return await client.hosts.get('node-1')
+
+        self.assertRaises(exceptions.ConnectionError, self._run,
+                          get_disconnected())
+
+    def test_coalesced_gets(self):
+        async def herd():
+            async with async_client.AsyncClient(
+                    endpoint=self.endpoint, token='token',
+                    coalesce_gets=True) as client:
+                return await asyncio.gather(
+                    *[client.hosts.get('node-1') for _i in range(20)])
+
+        results = self._run(herd())
+        self.assertEqual(1, self.respond.call_count)
+        self.assertEqual(20, len(set(id(r._info) for r in results)))
+        self.assertTrue(all(r.instance_uuid == 'node-1' for r in results))
+
+
+class FakeAsyncAPI(object):
+    """Answer the requests of the asyncio managers from ``routes``.
+
+    ``routes`` maps ``(method, url)`` to the body of the response, or to
+    the exception to raise.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    async def _request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        body = self.routes[(method, url)]
+        if isinstance(body, Exception):
+            raise body
+        resp = Response()
+        resp.headers['x-openstack-request-id'] = 'req-%d' % len(self.calls)
+        return resp, body
+
+    def get(self, url, **kwargs):
+        return self._request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._request('DELETE', url, **kwargs)
+
+
+@testtools.skipIf(sys.version_info < (3, 6), 'Python 3.6 is required')
+class TestAsyncManagers(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestAsyncManagers, self).setUp()
+        self.api = FakeAsyncAPI({})
+        self.mappings = async_client.AsyncInstanceCPUMapingManager(self.api)
+        self.hosts = async_client.AsyncHostManager(self.api)
+
+    def _run(self, coro):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        return loop.run_until_complete(coro)
+
+    def _route_mapping(self, uuid, status='ACTIVE'):
+        self.api.routes[('GET', '/instance_cpu_mappings/%s' % uuid)] = {
+            'instance_uuid': uuid, 'status': status}
+
+    def test_delete_ignore_missing(self):
+        url = '/instance_cpu_mappings/a'
+        self.api.routes[('DELETE', url)] = exceptions.NotFound()
+        result = self._run(self.mappings.delete('a', ignore_missing=True))
+        self.assertEqual((), result)
+        self.assertRaises(exceptions.NotFound, self._run,
+                          self.mappings.delete('a'))
+
+    def test_create_check_host(self):
+        self.api.routes[('GET', '/hosts/node-1')] = {
+            'host_name': 'node-1',
+            'instances': [{'uuid': 'b', 'cpu_mappings': '0:1'}]}
+        self.api.routes[('POST', '/instance_cpu_mappings')] = {
+            'instance_uuid': 'a', 'cpu_mappings': '0:2'}
+        mapping = self._run(self.mappings.create('a', '0:2',
+                                                 check_host='node-1'))
+        self.assertEqual('a', mapping.instance_uuid)
+        self.assertRaises(exceptions.CPUMappingConflict, self._run,
+                          self.mappings.create('c', '0:1',
+                                               check_host='node-1'))
+        self.assertEqual(1, self.api.calls.count(
+            ('POST', '/instance_cpu_mappings')))
+
+    def test_host_manager(self):
+        host_manager = self.mappings._hosts()
+        self.assertIsInstance(host_manager, async_client.AsyncHostManager)
+        self.assertIs(host_manager, self.mappings._hosts())
+
+    def test_bulk_create_fetches_each_host_once(self):
+        self.api.routes[('GET', '/hosts/node-1')] = {
+            'host_name': 'node-1', 'instances': []}
+        self.api.routes[('GET', '/hosts/missing')] = exceptions.NotFound()
+        self.api.routes[('POST', '/instance_cpu_mappings')] = {
+            'instance_uuid': 'a'}
+        specs = [{'instance_uuid': 'a', 'cpu_mappings': '0:1',
+                  'check_host': 'node-1'},
+                 {'instance_uuid': 'b', 'cpu_mappings': '1:1',
+                  'check_host': 'node-1'},
+                 {'instance_uuid': 'c', 'cpu_mappings': '0:2',
+                  'check_host': 'missing'}]
+        result = self._run(self.mappings.bulk_create(specs, parallel=4))
+        self.assertIsNone(result[0].error)
+        self.assertIsInstance(result[1].error,
+                              exceptions.CPUMappingConflict)
+        self.assertIsInstance(result[2].error, exceptions.NotFound)
+        self.assertEqual(1, self.api.calls.count(('GET', '/hosts/node-1')))
+        self.assertEqual(1, self.api.calls.count(('GET', '/hosts/missing')))
+
+    def test_bulk_delete(self):
+        self.api.routes[('DELETE', '/instance_cpu_mappings/a')] = None
+        self.api.routes[('DELETE', '/instance_cpu_mappings/b')] = \
+            exceptions.NotFound()
+        result = self._run(self.mappings.bulk_delete(['a', 'b'],
+                                                     ignore_missing=True))
+        self.assertEqual(['a', 'b'], [entry.item for entry in result])
+        self.assertEqual([], result.failed)
+
+    def test_update(self):
+        self.api.routes[('PATCH', '/instance_cpu_mappings/a')] = {
+            'instance_uuid': 'a', 'status': 'ACTIVE'}
+        mapping = self._run(self.mappings.update('a', {'status': 'ACTIVE'}))
+        self.assertEqual('ACTIVE', mapping.status)
+
+    @mock.patch('asyncio.sleep')
+    def test_wait_for_mappings(self, mock_sleep):
+        self._route_mapping('a', 'BUILDING')
+        self._route_mapping('b')
+
+        async def sleep(delay):
+            self._route_mapping('a')
+
+        mock_sleep.side_effect = sleep
+        settled = []
+        result = self._run(self.mappings.wait_for_mappings(
+            ['a', 'b'], callback=settled.append))
+        self.assertEqual(['a', 'b'], [m.instance_uuid for m in result])
+        self.assertEqual(['b', 'a'], [m.instance_uuid for m in settled])
+        mock_sleep.assert_called_once_with(0.5)
+
+    @mock.patch('asyncio.sleep')
+    def test_wait_for_mappings_listing(self, mock_sleep):
+        self.api.routes[('GET', '/instance_cpu_mappings?host=node-1')] = {
+            'mappings': [{'instance_uuid': 'a', 'status': 'ACTIVE'},
+                         {'instance_uuid': 'b', 'status': 'ERROR'}]}
+        result = self._run(self.mappings.wait_for_mappings(
+            ['a', 'b'], filters={'host': 'node-1'}, parallel=1))
+        self.assertEqual(['ACTIVE', 'ERROR'], [m.status for m in result])
+        self.assertFalse(mock_sleep.called)
+
+    def test_get_many(self):
+        self._route_mapping('a')
+        self.api.routes[('GET', '/instance_cpu_mappings/missing')] = \
+            exceptions.NotFound()
+        result = self._run(self.mappings.get_many(['a', 'missing'],
+                                                  strategy='get'))
+        self.assertEqual('a', result[0].result.instance_uuid)
+        self.assertIsInstance(result[1].error, exceptions.NotFound)
+
+        self.api.routes[('GET', '/instance_cpu_mappings')] = {
+            'mappings': [{'instance_uuid': 'a'}]}
+        result = self._run(self.mappings.get_many(['missing', 'a'],
+                                                  strategy='list'))
+        self.assertIsInstance(result[0].error, exceptions.NotFound)
+        self.assertEqual('a', result[1].result.instance_uuid)
+        self.assertEqual(1, self.mappings.lookup_stats.collection_size)
+
+    def test_get_many_after_list(self):
+        self.api.routes[('GET', '/instance_cpu_mappings')] = {
+            'mappings': [{'instance_uuid': 'a'}, {'instance_uuid': 'b'}]}
+        self._run(self.mappings.list())
+        self.assertEqual(2, self.mappings.lookup_stats.collection_size)
+        result = self._run(self.mappings.get_many(['b', 'a']))
+        self.assertEqual(['b', 'a'],
+                         [entry.result.instance_uuid for entry in result])
+        self.assertEqual(2, len(self.api.calls))
+
+    def test_ensure_loaded(self):
+        self.api.routes[('GET', '/hosts/node-1')] = {
+            'host_name': 'node-1', 'instances': ['x']}
+        self.api.routes[('GET', '/hosts/missing')] = exceptions.NotFound()
+        stale = [self.hosts.resource_class(self.hosts, {'host_name': name})
+                 for name in ('node-1', 'missing')]
+        result = self._run(self.hosts.ensure_loaded(stale))
+        self.assertEqual(['x'], stale[0].instances)
+        self.assertTrue(stale[0].is_loaded())
+        self.assertIsInstance(result[1].error, exceptions.NotFound)
+        self.assertFalse(stale[1].is_loaded())
+
+    def test_ensure_loaded_listing(self):
+        self.api.routes[('GET', '/instance_cpu_mappings')] = {
+            'mappings': [{'instance_uuid': 'a', 'status': 'ACTIVE'}]}
+        stale = self.mappings.resource_class(self.mappings,
+                                             {'instance_uuid': 'a'})
+        result = self._run(self.mappings.ensure_loaded([stale]))
+        self.assertEqual([], result.failed)
+        self.assertEqual('ACTIVE', stale.status)
+
+    def test_iter_many(self):
+        self.api.routes[('GET', '/hosts/node-1')] = {'host_name': 'node-1'}
+        self.api.routes[('GET', '/hosts/missing')] = exceptions.NotFound()
+
+        async def collect():
+            return [entry async for entry in self.hosts.iter_many(
+                ['node-1', 'missing'], parallel=1)]
+
+        result = self._run(collect())
+        self.assertEqual(['node-1', 'missing'],
+                         [entry.item for entry in result])
+        self.assertIsInstance(result[1].error, exceptions.NotFound)
+
+    def test_async_variants(self):
+        self.api.routes[('GET', '/hosts/node-1')] = {'host_name': 'node-1'}
+
+        async def get():
+            task = self.hosts.get_async('node-1')
+            self.assertIsInstance(task, asyncio.Task)
+            return await task
+
+        self.assertEqual('node-1', self._run(get()).host_name)
+
+    def test_find_gets_by_id_attr(self):
+        self.api.routes[('GET', '/hosts')] = {
+            'instances': [{'host_name': 'node-1'}]}
+        self.api.routes[('GET', '/hosts/node-1')] = {
+            'host_name': 'node-1', 'instances': []}
+        host = self._run(self.hosts.find(host_name='node-1'))
+        self.assertEqual([], host.instances)
@@ -0,0 +1,80 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+from concurrent import futures
+
+import mock
+from oslotest import base as test_base
+from requests_mock.contrib import fixture as rm_fixture
+
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import client
+
+ENDPOINT = 'http://kongming:6688'
+JSON = {'Content-Type': 'application/json'}
+
+
+class TestClientAsync(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestClientAsync, self).setUp()
+        self.mock = self.useFixture(rm_fixture.Fixture())
+        self.client = client.Client(endpoint=ENDPOINT, max_workers=4)
+        self.addCleanup(self.client.close)
+
+    def test_get_async(self):
+        for name in ('node-1', 'node-2'):
+            self.mock.get(ENDPOINT + '/hosts/' + name, headers=JSON,
+                          json={'host_name': name, 'instances': []})
+        pending = [self.client.hosts.get_async(name)
+                   for name in ('node-1', 'node-2')]
+        self.assertTrue(all(isinstance(future, futures.Future)
+                            for future in pending))
+        self.assertEqual(['node-1', 'node-2'],
+                         [future.result().host_name for future in pending])
+        self.assertIs(self.client.executor,
+                      self.client.instances.executor)
+
+    def test_list_async(self):
+        self.mock.get(ENDPOINT + '/instances', headers=JSON,
+                      json={'instances': [{'uuid': 'a'}, {'uuid': 'b'}]})
+        future = self.client.instances.list_async()
+        self.assertEqual(['a', 'b'], [i.uuid for i in future.result()])
+
+    def test_create_checks_with_client_hosts(self):
+        self.mock.get(ENDPOINT + '/hosts/node-1', headers=JSON,
+                      json={'host_name': 'node-1', 'instances': [
+                          {'uuid': 'b', 'cpu_mappings': '0:1'}]})
+        mappings = self.client.instance_cpu_mappings
+        self.assertIs(self.client.hosts, mappings.host_manager)
+        self.assertRaises(exceptions.CPUMappingConflict, mappings.create,
+                          'a', '0:1', check_host='node-1')
+
+    def test_create_async_error(self):
+        self.mock.post(ENDPOINT + '/instance_cpu_mappings', status_code=400,
+                       headers=JSON, json={'message': 'bad'})
+        future = self.client.instance_cpu_mappings.create_async('a', '0:1')
+        self.assertRaises(exceptions.BadRequest, future.result)
+
+    def test_default_workers(self):
+        c = client.Client(endpoint=ENDPOINT, pool_maxsize=3)
+        self.addCleanup(c.close)
+        self.assertEqual(3, c.executor._max_workers)
+
+    def test_external_executor(self):
+        executor = mock.Mock()
+        c = client.Client(endpoint=ENDPOINT, executor=executor)
+        c.hosts.get_async('node-1')
+        self.assertEqual(('node-1',), executor.submit.call_args[0][1:])
+        c.close()
+        self.assertFalse(executor.shutdown.called)
@@ -0,0 +1,216 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import cpu_mapping
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import cpu_index
+from kongmingclient.v1 import hosts
+from kongmingclient.v1 import instance_cpu_mappings
+
+
+def _host(name, **instances):
+    info = {'host_name': name,
+            'instances': [{'uuid': uuid, 'cpu_mappings': cpus}
+                          for uuid, cpus in sorted(instances.items())]}
+    return hosts.Host(None, info, loaded=True)
+
+
+def _mapping(uuid, host, cpus):
+    return instance_cpu_mappings.InstanceCPUMapping(
+        None, {'instance_uuid': uuid, 'host': host, 'cpu_mappings': cpus},
+        loaded=True)
+
+
+class TestHostCPUIndex(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestHostCPUIndex, self).setUp()
+        self.index = cpu_index.HostCPUIndex()
+        self.index.load_host('node-1', _host('node-1', a='0:0,1:1',
+                                             b='0:2-3', c='bad'))
+
+    def test_load_host(self):
+        self.assertEqual(cpu_mapping.CPUSet([0, 1, 2, 3]),
+                         self.index.pinned('node-1'))
+        self.assertEqual(cpu_mapping.CPUSet(), self.index.pinned('node-2'))
+
+    def test_conflicts(self):
+        self.assertEqual(cpu_mapping.CPUSet([1, 2]),
+                         self.index.conflicts('node-1', '0:1-2,1:4'))
+        self.assertEqual(cpu_mapping.CPUSet([2]),
+                         self.index.conflicts('node-1', '0:1-2', 'a'))
+        self.assertFalse(self.index.conflicts('node-2', '0:1'))
+
+    def test_reserve_and_remove(self):
+        e = self.assertRaises(exceptions.CPUMappingConflict,
+                              self.index.reserve, 'node-1', 'd', '0:3-4')
+        self.assertEqual(['b'], e.owners)
+        self.assertEqual(cpu_mapping.CPUSet([3]), e.cpus)
+        self.index.reserve('node-1', 'd', '0:4')
+        self.assertEqual('0-4', str(self.index.pinned('node-1')))
+        self.index.remove('b')
+        self.assertEqual('0-1,4', str(self.index.pinned('node-1')))
+        self.index.reserve('node-1', 'e', '0:2-3')
+
+    def test_ensure_host_loads_once(self):
+        loader = mock.Mock(return_value=_host('node-2', a='0:5'))
+        self.index.ensure_host('node-2', loader)
+        self.index.ensure_host('node-2', loader)
+        self.index.ensure_host('node-1', loader)
+        loader.assert_called_once_with('node-2')
+        self.assertEqual('5', str(self.index.pinned('node-2')))
+
+
+class TestHostCPUIndexBuild(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestHostCPUIndexBuild, self).setUp()
+        self.manager = mock.Mock()
+        self.manager.iter_list.side_effect = lambda filters=None: iter(
+            self.mappings)
+        self.mappings = [_mapping('a', 'node-1', '0:0,1:1'),
+                         _mapping('b', 'node-1', '0:2-3'),
+                         _mapping('c', 'node-2', '0:0'),
+                         _mapping('d', None, None)]
+        self.index = cpu_index.HostCPUIndex.build(self.manager)
+
+    def test_build(self):
+        self.manager.iter_list.assert_called_once_with(filters=None)
+        self.assertEqual(['node-1', 'node-2'], self.index.hosts())
+        self.assertEqual(['a', 'b'], self.index.instances('node-1'))
+        self.assertEqual('0-3', str(self.index.pinned('node-1')))
+        self.assertEqual(3, len(self.index))
+
+    def test_owner_and_free(self):
+        self.assertEqual('b', self.index.owner('node-1', 3))
+        self.assertEqual('c', self.index.owner('node-2', 0))
+        self.assertIsNone(self.index.owner('node-2', 1))
+        self.assertIsNone(self.index.owner('node-3', 0))
+        host_cpus = cpu_mapping.CPUSet.parse('0-7')
+        self.assertEqual('4-7', str(self.index.free('node-1', host_cpus)))
+        self.assertEqual('0-7', str(self.index.free('node-3', host_cpus)))
+
+    def test_shared_cpu_owner(self):
+        self.index.add('e', 'node-2', '0:0-1')
+        self.assertEqual('c', self.index.owner('node-2', 0))
+        self.index.remove('c')
+        self.assertEqual('e', self.index.owner('node-2', 0))
+        self.index.remove('e')
+        self.assertEqual(['node-1'], self.index.hosts())
+
+    def test_refresh(self):
+        self.mappings = [_mapping('a', 'node-1', '0:0,1:1'),
+                         _mapping('b', 'node-1', '0:4'),
+                         _mapping('d', 'node-2', '0:1')]
+        self.assertEqual(3, self.index.refresh(self.manager))
+        self.assertEqual('0-1,4', str(self.index.pinned('node-1')))
+        self.assertEqual('1', str(self.index.pinned('node-2')))
+        self.assertEqual('d', self.index.owner('node-2', 1))
+        self.assertEqual(0, self.index.refresh(self.manager))
+
+    def test_refresh_filtered(self):
+        self.mappings = [_mapping('c', 'node-2', '0:5')]
+        self.assertEqual(
+            1, self.index.refresh(self.manager, {'host': 'node-2'}))
+        self.assertEqual('0-3', str(self.index.pinned('node-1')))
+        self.assertEqual('5', str(self.index.pinned('node-2')))
+
+    def test_refresh_filtered_by_status(self):
+        # NOTE: 'b' may just not be ACTIVE, the index cannot tell.
+        self.mappings = [_mapping('a', 'node-1', '0:0,1:1')]
+        self.assertEqual(
+            0, self.index.refresh(self.manager, {'status': 'ACTIVE'}))
+        self.assertEqual(['a', 'b'], self.index.instances('node-1'))
+        self.assertEqual(['c'], self.index.instances('node-2'))
+
+        self.mappings = [_mapping('a', 'node-1', '0:6')]
+        self.assertEqual(1, self.index.refresh(
+            self.manager, {'host': 'node-1', 'status': 'ACTIVE'}))
+        self.assertEqual('2-3,6', str(self.index.pinned('node-1')))
+
+    def test_apply(self):
+        self.index.apply(_mapping('a', 'node-2', '0:6'))
+        self.index.apply(_mapping('b', 'node-1', None))
+        self.assertEqual(['node-2'], self.index.hosts())
+        self.assertEqual('0,6', str(self.index.pinned('node-2')))
+
+
+class TestCreatePreflight(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestCreatePreflight, self).setUp()
+        self.api = mock.Mock()
+        self.api.get.return_value = (Response(), {
+            'host_name': 'node-1',
+            'instances': [{'uuid': 'a', 'cpu_mappings': '0:0-1'}]})
+        self.api.post.side_effect = lambda url, data=None, headers=None: (
+            Response(), data)
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def test_create_conflict_rejected_locally(self):
+        self.assertRaises(exceptions.CPUMappingConflict,
+                          self.manager.create, 'b', '0:1', check_host='node-1')
+        self.api.get.assert_called_once_with('/hosts/node-1', headers={})
+        self.assertFalse(self.api.post.called)
+
+    def test_create_builds_one_host_manager(self):
+        self.manager.create('b', '0:2', check_host='node-1')
+        host_manager = self.manager.host_manager
+        self.assertIsInstance(host_manager, hosts.HostManager)
+        self.manager.create('c', '0:3', check_host='node-1')
+        self.assertIs(host_manager, self.manager.host_manager)
+        self.assertEqual(2, self.api.get.call_count)
+
+    def test_create_unchecked(self):
+        self.manager.create('b', '0:1')
+        self.assertFalse(self.api.get.called)
+        self.assertTrue(self.api.post.called)
+
+    def test_create_sends_notation_as_given(self):
+        for check_host in (None, 'node-1'):
+            mapping = self.manager.create('b', '1:5,0:4',
+                                          check_host=check_host)
+            self.assertEqual('1:5,0:4', mapping.cpu_mappings)
+        mapping = self.manager.create(
+            'c', cpu_mapping.CPUMapping.parse('1:5,0:4'))
+        self.assertEqual('0:4,1:5', mapping.cpu_mappings)
+
+    def test_bulk_create(self):
+        specs = [{'instance_uuid': 'b', 'cpu_mappings': '0:2',
+                  'check_host': 'node-1'},
+                 {'instance_uuid': 'c', 'cpu_mappings': '0:1',
+                  'check_host': 'node-1'},
+                 {'instance_uuid': 'd', 'cpu_mappings': '0:2-3',
+                  'check_host': 'node-1'},
+                 {'instance_uuid': 'e', 'cpu_mappings': '0:3',
+                  'check_host': 'node-1'}]
+        results = self.manager.bulk_create(specs, parallel=1)
+        self.assertEqual(['b', 'e'], [entry.item['instance_uuid']
+                                      for entry in results.succeeded])
+        self.assertEqual(['c', 'd'], [entry.item['instance_uuid']
+                                      for entry in results.failed])
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertEqual(2, self.api.post.call_count)
+
+    def test_failed_create_releases_cpus(self):
+        self.api.post.side_effect = exceptions.BadRequest()
+        specs = [{'instance_uuid': uuid, 'cpu_mappings': '0:2',
+                  'check_host': 'node-1'} for uuid in ('b', 'c')]
+        results = self.manager.bulk_create(specs, parallel=1)
+        self.assertEqual([exceptions.BadRequest] * 2,
+                         [type(entry.error) for entry in results])
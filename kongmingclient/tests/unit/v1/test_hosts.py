@@ -0,0 +1,87 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import threading
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import hosts
+
+
+class TestHostIterMany(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestHostIterMany, self).setUp()
+        self.api = mock.Mock()
+        self.manager = hosts.HostManager(self.api)
+
+    def _get(self, url, headers=None):
+        name = url.rsplit('/', 1)[-1]
+        if name == 'missing':
+            raise exceptions.NotFound()
+        return Response(), {'host_name': name, 'instances': []}
+
+    def test_iter_many(self):
+        self.api.get.side_effect = self._get
+        results = list(self.manager.iter_many(['a', 'missing', 'b'],
+                                              parallel=4))
+        self.assertEqual(['a', 'b'], sorted(entry.result.host_name
+                                            for entry in results
+                                            if entry.error is None))
+        self.assertEqual(['missing'], [entry.item for entry in results
+                                       if entry.error is not None])
+
+    def test_iter_many_streams(self):
+        # NOTE: the slow host must not hold back the others.
+        release = threading.Event()
+
+        def _get(url, headers=None):
+            if url.endswith('/slow'):
+                release.wait(5)
+            return self._get(url, headers)
+
+        self.api.get.side_effect = _get
+        results = self.manager.iter_many(['slow', 'a', 'b'], parallel=2)
+        first = next(results)
+        second = next(results)
+        self.assertEqual(['a', 'b'], sorted([first.item, second.item]))
+        release.set()
+        self.assertEqual('slow', next(results).item)
+        self.assertRaises(StopIteration, next, results)
+
+    def test_iter_many_bounded(self):
+        self.api.get.side_effect = self._get
+        names = iter(['host-%d' % i for i in range(100)])
+        results = self.manager.iter_many(names, parallel=2)
+        next(results)
+        results.close()
+        # NOTE: at most twice the workers are queued ahead.
+        self.assertLessEqual(self.api.get.call_count, 4)
+        self.assertEqual(96, len(list(names)))
+
+
+class TestHostFind(test_base.BaseTestCase):
+
+    def test_find_gets_by_host_name(self):
+        api = mock.Mock(spec=['get'])
+        api.get.side_effect = [
+            (Response(), {'instances': [{'host_name': 'node-1'},
+                                        {'host_name': 'node-2'}]}),
+            (Response(), {'host_name': 'node-2', 'instances': []}),
+        ]
+        host = hosts.HostManager(api).find(host_name='node-2')
+        self.assertEqual([], host.instances)
+        api.get.assert_called_with('/hosts/node-2', headers={})
@@ -0,0 +1,272 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from oslotest import base as test_base
+from requests import Response
+
+from kongmingclient.common import exceptions
+from kongmingclient.common import utils
+from kongmingclient.v1 import instance_cpu_mappings
+
+
+def _response(request_id):
+    resp = Response()
+    resp.headers['x-openstack-request-id'] = request_id
+    return resp
+
+
+class TestInstanceCPUMappingBulk(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestInstanceCPUMappingBulk, self).setUp()
+        self.api = mock.Mock()
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def test_bulk_create(self):
+        def post(url, data=None, headers=None):
+            return (_response('req-' + data['instance_uuid']),
+                    dict(data, status='ACTIVE'))
+        self.api.post.side_effect = post
+
+        specs = [{'instance_uuid': 'uuid-%d' % i, 'cpu_mappings': '0:%d' % i}
+                 for i in range(10)]
+        results = self.manager.bulk_create(specs, parallel=4)
+
+        self.assertEqual(10, len(results.succeeded))
+        self.assertEqual([], results.failed)
+        self.assertEqual(specs, [entry.item for entry in results])
+        self.assertEqual(['uuid-%d' % i for i in range(10)],
+                         [entry.result.instance_uuid for entry in results])
+        self.assertEqual(['req-uuid-%d' % i for i in range(10)],
+                         results.request_ids)
+
+    def test_bulk_delete_reports_errors(self):
+        def delete(url, headers=None):
+            if url.endswith('bad'):
+                raise exceptions.NotFound(request_id='req-bad')
+            return _response('req-' + url.rsplit('/', 1)[-1]), None
+        self.api.delete.side_effect = delete
+
+        results = self.manager.bulk_delete(['one', 'bad', 'two'],
+                                           parallel=2)
+
+        self.assertEqual(['one', 'two'],
+                         [entry.item for entry in results.succeeded])
+        self.assertEqual(['bad'], [entry.item for entry in results.failed])
+        self.assertIsInstance(results.failed[0].error, exceptions.NotFound)
+        self.assertEqual(['req-one', 'req-bad', 'req-two'],
+                         results.request_ids)
+
+    def test_bulk_delete_mappings(self):
+        self.api.delete.side_effect = lambda url, headers=None: (
+            _response('req-' + url.rsplit('/', 1)[-1]), None)
+        mappings = [self.manager.resource_class(
+            self.manager, {'instance_uuid': 'uuid-%d' % i}, loaded=True)
+            for i in range(3)]
+
+        results = self.manager.bulk_delete(mappings, parallel=2)
+
+        self.assertEqual(mappings, [entry.item for entry in results])
+        self.assertEqual(['req-uuid-0', 'req-uuid-1', 'req-uuid-2'],
+                         results.request_ids)
+
+    def test_bulk_delete_ignore_missing(self):
+        self.api.delete.side_effect = exceptions.NotFound(
+            request_id='req-gone')
+
+        results = self.manager.bulk_delete(['gone'], ignore_missing=True)
+
+        self.assertEqual([], results.failed)
+        self.assertEqual(['gone'], [entry.item for entry in results])
+
+
+class TestInstanceCPUMappingDelete(test_base.BaseTestCase):
+
+    def test_delete_mapping(self):
+        api = mock.Mock()
+        api.delete.return_value = (_response('req-1'), None)
+        manager = instance_cpu_mappings.InstanceCPUMapingManager(api)
+        mapping = manager.resource_class(
+            manager, {'instance_uuid': 'uuid-1', 'host': 'node-1'},
+            loaded=True)
+        manager.delete(mapping)
+        api.delete.assert_called_once_with('/instance_cpu_mappings/uuid-1',
+                                           headers={})
+
+
+class TestInstanceCPUMappingPagination(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestInstanceCPUMappingPagination, self).setUp()
+        self.pages = {
+            '/instance_cpu_mappings?limit=2': {
+                'mappings': [{'instance_uuid': 'uuid-1'},
+                             {'instance_uuid': 'uuid-2'}],
+                'next': 'http://kongming/v1/instance_cpu_mappings'
+                        '?limit=2&marker=uuid-2'},
+            'http://kongming/v1/instance_cpu_mappings?limit=2&marker=uuid-2': {
+                'mappings': [{'instance_uuid': 'uuid-3'}],
+                'mappings_links': [{'rel': 'self', 'href': 'ignored'}]},
+        }
+        self.api = mock.Mock()
+        # NOTE: clients without streamed responses, see
+        # TestInstanceCPUMappingStreaming.
+        del self.api.get_stream
+        self.api.get.side_effect = lambda url, headers=None: (
+            _response('req-%d' % self.api.get.call_count), self.pages[url])
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def test_list_follows_next_links(self):
+        mappings = self.manager.list(limit=2)
+        self.assertEqual(['uuid-1', 'uuid-2', 'uuid-3'],
+                         [m.instance_uuid for m in mappings])
+        self.assertEqual(['req-1', 'req-2'], mappings.request_ids)
+
+    def test_iter_list_is_lazy(self):
+        mappings = self.manager.iter_list(limit=2)
+        self.assertEqual(0, self.api.get.call_count)
+        self.assertEqual('uuid-1', next(mappings).instance_uuid)
+        self.assertEqual('uuid-2', next(mappings).instance_uuid)
+        self.assertEqual(1, self.api.get.call_count)
+        self.assertEqual(['uuid-3'], [m.instance_uuid for m in mappings])
+        self.assertEqual(2, self.api.get.call_count)
+
+
+class TestInstanceCPUMappingStreaming(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestInstanceCPUMappingStreaming, self).setUp()
+        self.pages = {
+            '/instance_cpu_mappings?limit=2': (
+                b'{"mappings": [{"instance_uuid": "uuid-1"}, '
+                b'{"instance_uuid": "uuid-2"}], "next": "http://kongming/v1/'
+                b'instance_cpu_mappings?limit=2&marker=uuid-2"}'),
+            'http://kongming/v1/instance_cpu_mappings?limit=2&marker=uuid-2':
+                b'{"mappings": [{"instance_uuid": "uuid-3"}]}',
+        }
+        self.responses = []
+        self.api = mock.Mock()
+        self.api.get_stream.side_effect = self._get_stream
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def _get_stream(self, url, headers=None):
+        body = self.pages[url]
+        resp = mock.Mock()
+        resp.iter_content.side_effect = lambda size: iter(
+            [body[i:i + 5] for i in range(0, len(body), 5)])
+        self.responses.append(resp)
+        return resp
+
+    def test_iter_list_streams_pages(self):
+        mappings = self.manager.iter_list(limit=2)
+        self.assertEqual('uuid-1', next(mappings).instance_uuid)
+        self.assertEqual(1, len(self.responses))
+        self.assertFalse(self.responses[0].close.called)
+        self.assertEqual(['uuid-2', 'uuid-3'],
+                         [m.instance_uuid for m in mappings])
+        self.assertEqual(2, len(self.responses))
+        self.assertTrue(all(r.close.called for r in self.responses))
+        self.assertFalse(self.api.get.called)
+
+    def test_iter_list_closed_early(self):
+        mappings = self.manager.iter_list(limit=2)
+        next(mappings)
+        mappings.close()
+        self.responses[0].close.assert_called_once_with()
+        self.assertEqual(1, len(self.responses))
+
+
+@mock.patch('time.sleep')
+class TestWaitForMappings(test_base.BaseTestCase):
+
+    def setUp(self):
+        super(TestWaitForMappings, self).setUp()
+        self.api = mock.Mock()
+        self.manager = instance_cpu_mappings.InstanceCPUMapingManager(
+            self.api)
+
+    def _listing(self, *statuses):
+        return (_response('req-%d' % len(statuses)),
+                {'mappings': [{'instance_uuid': 'uuid-%d' % i,
+                               'status': status}
+                              for i, status in enumerate(statuses)]})
+
+    def test_one_list_per_cycle(self, mock_sleep):
+        self.api.get.side_effect = [
+            self._listing('PENDING', 'PENDING', 'PENDING'),
+            self._listing('PENDING', 'PENDING', 'PENDING'),
+            self._listing('ACTIVE', 'PENDING', 'ERROR'),
+            (_response('req-uuid-1'),
+             {'instance_uuid': 'uuid-1', 'status': 'ACTIVE'}),
+        ]
+        settled = []
+        mappings = self.manager.wait_for_mappings(
+            ['uuid-2', 'uuid-1', 'uuid-0'], callback=settled.append,
+            filters={'host': 'node-1'}, parallel=2)
+
+        self.assertEqual(4, self.api.get.call_count)
+        self.api.get.assert_any_call(
+            '/instance_cpu_mappings?host=node-1',
+            headers={'Cache-Control': 'no-cache'})
+        # NOTE: the last mapping is polled on its own.
+        self.api.get.assert_called_with(
+            '/instance_cpu_mappings/uuid-1',
+            headers={'Cache-Control': 'no-cache'})
+        self.assertEqual(['ERROR', 'ACTIVE', 'ACTIVE'],
+                         [m.status for m in mappings])
+        self.assertEqual(['uuid-0', 'uuid-2', 'uuid-1'],
+                         [m.instance_uuid for m in settled])
+        # Backs off while nothing changes, restarts after progress.
+        self.assertEqual([0.5, 1, 0.5],
+                         [c[0][0] for c in mock_sleep.call_args_list])
+
+    def test_few_pending_use_gets(self, mock_sleep):
+        # NOTE: the mapping of uuid-2 is not created yet on the first cycle.
+        statuses = {'uuid-0': ['PENDING', 'ACTIVE'], 'uuid-1': ['ACTIVE'],
+                    'uuid-2': [None, 'ACTIVE']}
+
+        def get(url, headers=None):
+            uuid = url.rsplit('/', 1)[-1]
+            status = statuses[uuid].pop(0)
+            if status is None:
+                raise exceptions.NotFound()
+            return (_response('req-' + uuid),
+                    {'instance_uuid': uuid, 'status': status})
+
+        self.api.get.side_effect = get
+        mappings = [self.manager.resource_class(
+            self.manager, {'instance_uuid': 'uuid-%d' % i}, loaded=True)
+            for i in range(3)]
+
+        result = self.manager.wait_for_mappings(mappings[::-1], parallel=4)
+
+        self.assertEqual(['uuid-2', 'uuid-1', 'uuid-0'],
+                         [m.instance_uuid for m in result])
+        self.assertEqual(5, self.api.get.call_count)
+        self.api.get.assert_any_call('/instance_cpu_mappings/uuid-2',
+                                     headers={'Cache-Control': 'no-cache'})
+
+    @mock.patch.object(utils, 'now')
+    def test_timeout(self, mock_now, mock_sleep):
+        mock_now.side_effect = [0, 1, 400]
+        self.api.get.return_value = (
+            _response('req-0'), {'instance_uuid': 'uuid-0',
+                                 'status': 'PENDING'})
+        self.assertRaises(exceptions.WaitTimeout,
+                          self.manager.wait_for_mappings, ['uuid-0'],
+                          timeout=300)
+        self.assertEqual(2, self.api.get.call_count)
@@ -0,0 +1,178 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""asyncio client for the KongMing v1 API (Python 3.6 or later).
+
+Example::
+
+    client = AsyncClient(endpoint='http://kongming:6688', token=token)
+    mappings = await asyncio.gather(
+        *[client.instance_cpu_mappings.get(uuid) for uuid in uuids])
+    await client.close()
+"""
+
+import asyncio
+
+from kongmingclient.common import async_base
+from kongmingclient.common import async_http
+from kongmingclient.common import base
+from kongmingclient.common import exceptions
+from kongmingclient.v1 import cpu_index
+from kongmingclient.v1 import hosts
+from kongmingclient.v1 import instance_cpu_mappings
+from kongmingclient.v1 import instances
+
+
+class AsyncInstanceManager(async_base.AsyncManagerMixin,
+                           instances.InstanceManager):
+    pass
+
+
+class AsyncHostManager(async_base.AsyncManagerMixin, hosts.HostManager):
+    pass
+
+
+class AsyncInstanceCPUMapingManager(
+        async_base.AsyncManagerMixin,
+        instance_cpu_mappings.InstanceCPUMapingManager):
+    host_manager_class = AsyncHostManager
+
+    async def _create_checked(self, index, instance_uuid, cpu_mappings,
+                              check_host=None, **kwargs):
+        if check_host is None:
+            return await self._create_mapping(instance_uuid, cpu_mappings,
+                                              **kwargs)
+        if index is None:
+            index = cpu_index.HostCPUIndex()
+        requested = self._requested(cpu_mappings)
+        instance_uuid = self._lookup_id(instance_uuid)
+        if not index.is_loaded(check_host):
+            host = await self._hosts().get(check_host)
+            index.load_host(check_host, host)
+        index.reserve(check_host, instance_uuid, requested)
+        try:
+            return await self._create_mapping(instance_uuid, cpu_mappings,
+                                              **kwargs)
+        except Exception:
+            index.remove(instance_uuid)
+            raise
+
+    async def bulk_create(self, specs, parallel=None):
+        """Create many mappings concurrently, see
+        :meth:`instance_cpu_mappings.InstanceCPUMapingManager.bulk_create`.
+        """
+        specs = list(specs)
+        index = cpu_index.HostCPUIndex()
+        # NOTE: fetched up front, the creates checked against one host
+        # would otherwise all fetch it at once.
+        names = set(spec.get('check_host') for spec in specs)
+        names.discard(None)
+        fetched = await self._bulk(self._hosts().get,
+                                   sorted(names), parallel=parallel)
+        errors = {}
+        for entry in fetched:
+            if entry.error is None:
+                index.load_host(entry.item, entry.result)
+            else:
+                errors[entry.item] = entry.error
+
+        async def _create(spec):
+            if spec.get('check_host') in errors:
+                raise errors[spec['check_host']]
+            return await self._create_checked(index, **spec)
+
+        return await self._bulk(_create, specs, parallel=parallel)
+
+    async def delete(self, instance_uuid, ignore_missing=False):
+        url = '/instance_cpu_mappings/%s' % self._lookup_id(instance_uuid)
+        try:
+            return await self._delete(url)
+        except exceptions.NotFound as e:
+            if not ignore_missing:
+                raise
+            return self.convert_into_with_meta(None, e.response)
+
+    async def wait_for_mappings(
+            self, instance_uuids, target_status=instance_cpu_mappings.ACTIVE,
+            timeout=instance_cpu_mappings.DEFAULT_WAIT_TIMEOUT,
+            failure_statuses=(instance_cpu_mappings.ERROR,), callback=None,
+            min_interval=0.5, max_interval=10, filters=None, parallel=None):
+        """Wait until the mappings of many instances settle, see
+        :meth:`instance_cpu_mappings.InstanceCPUMapingManager.wait_for_mappings`.
+        """
+        wait = instance_cpu_mappings._MappingWait(
+            [self._lookup_id(uuid) for uuid in instance_uuids],
+            target_status, timeout, failure_statuses, callback, min_interval,
+            max_interval)
+        workers = parallel or base.DEFAULT_BULK_WORKERS
+        resps = []
+        while wait.pending:
+            delay = wait.update(await self._poll(wait.pending, filters,
+                                                 workers, resps))
+            if delay is not None:
+                await asyncio.sleep(delay)
+        return wait.result(resps)
+
+    async def _poll(self, pending, filters, workers, resps):
+        mappings = []
+        if len(pending) > workers:
+            url = self._build_query('/instance_cpu_mappings', filters)
+            async for resp, data in self._list_pages(
+                    url, response_key='mappings'):
+                resps.append(resp)
+                mappings.extend(self._to_items(data))
+            return mappings
+
+        results = await self._bulk(
+            lambda uuid: self._get('/instance_cpu_mappings/%s' % uuid),
+            sorted(pending), parallel=workers)
+        for entry in results:
+            if entry.error is None:
+                mappings.append(entry.result)
+            elif not isinstance(entry.error, exceptions.NotFound):
+                raise entry.error
+        resps.extend(results.request_ids)
+        return mappings
+
+
+class AsyncClient(object):
+    """asyncio client for the KongMing v1 API.
+
+    Accepts the same arguments as :class:`kongmingclient.v1.client.Client`
+    plus ``max_concurrency``, the number of requests allowed in flight at
+    once, and ``pool_maxsize``, the size of the connection pool. There is
+    no ``lazy_load``: the resources returned by the asyncio managers are
+    always loaded, see :class:`async_base.AsyncManagerMixin`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize a new asyncio client for the KongMing v1 API."""
+        self.http_client = async_http._construct_async_http_client(
+            *args, **kwargs)
+
+        self.instance_cpu_mappings = \
+            AsyncInstanceCPUMapingManager(self.http_client)
+
+        self.instances = AsyncInstanceManager(self.http_client)
+
+        self.hosts = AsyncHostManager(self.http_client)
+        self.instance_cpu_mappings.host_manager = self.hosts
+
+    async def close(self):
+        await self.http_client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
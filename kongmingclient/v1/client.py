@@ -13,6 +13,10 @@
 #   under the License.
 #
 
+from concurrent import futures
+
+from kongmingclient.common import cache
+from kongmingclient.common import coalesce
 from kongmingclient.common import http
 from kongmingclient.v1 import hosts
 from kongmingclient.v1 import instance_cpu_mappings
@@ -23,14 +27,65 @@ class Client(object):
     """Client for the KongMing v1 API."""
 
     def __init__(self, *args, **kwargs):
-        """Initialize a new client for the KongMing v1 API."""
+        """Initialize a new client for the KongMing v1 API.
+
+        :param cache: opt-in cache of GET responses, either True for the
+            defaults or a :class:`cache.ResponseCache` instance
+        :param compact_resources: build memory efficient
+            :class:`base.CompactResource` objects
+        :param lazy_load: when False, reading a missing attribute of a
+            resource which is not loaded raises AttributeError instead of
+            silently sending a GET, see :func:`base.lazy_load_counts`
+        :param executor: :class:`concurrent.futures.Executor` running the
+            ``*_async`` methods of the managers. By default the client
+            creates a thread pool of ``max_workers`` threads, which defaults
+            to the size of the connection pool so that concurrent calls do
+            not wait for a connection.
+        :param coalesce_gets: share the response of concurrent identical
+            GETs, see :class:`coalesce.CoalescingHTTPClient`
+        """
+        response_cache = kwargs.pop('cache', None)
+        compact = kwargs.pop('compact_resources', False)
+        lazy_load = kwargs.pop('lazy_load', True)
+        executor = kwargs.pop('executor', None)
+        max_workers = kwargs.pop('max_workers', None)
+        coalesce_gets = kwargs.pop('coalesce_gets', False)
+        self._own_executor = executor is None
+        if executor is None:
+            executor = futures.ThreadPoolExecutor(
+                max_workers=max_workers or kwargs.get(
+                    'pool_maxsize', http.DEFAULT_POOL_MAXSIZE))
+        self.executor = executor
         self.http_client = http._construct_http_client(*args, **kwargs)
 
+        self.cache = None
+        api = self.http_client
+        if coalesce_gets:
+            # NOTE: below the cache, only its misses need coalescing.
+            api = coalesce.CoalescingHTTPClient(api)
+        if response_cache:
+            if response_cache is True:
+                response_cache = cache.ResponseCache()
+            self.cache = response_cache
+            api = cache.CachingHTTPClient(api, self.cache)
+
         self.instance_cpu_mappings = \
-            instance_cpu_mappings.InstanceCPUMapingManager(self.http_client)
+            instance_cpu_mappings.InstanceCPUMapingManager(
+                api, compact, lazy_load, executor)
 
         self.instances = \
-            instances.InstanceManager(self.http_client)
+            instances.InstanceManager(api, compact, lazy_load, executor)
 
         self.hosts = \
-            hosts.HostManager(self.http_client)
+            hosts.HostManager(api, compact, lazy_load, executor)
+        self.instance_cpu_mappings.host_manager = self.hosts
+
+    def close(self):
+        """Release the executor created by the client and the connections.
+
+        An executor passed to the client is left running.
+        """
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+        if hasattr(self.http_client, 'close'):
+            self.http_client.close()
@@ -0,0 +1,308 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+In-memory index of the physical CPUs pinned on each host.
+"""
+
+import logging
+import threading
+
+from kongmingclient.common import cpu_mapping
+from kongmingclient.common import exceptions
+from kongmingclient.common.i18n import _
+
+LOG = logging.getLogger(__name__)
+
+
+def _to_mapping(value):
+    if isinstance(value, cpu_mapping.CPUMapping):
+        return value
+    return cpu_mapping.CPUMapping.parse(value)
+
+
+class HostCPUIndex(object):
+    """Thread safe index of the pinned physical CPUs of each host.
+
+    The pinned CPUs of a host are kept as a bitmask, so checking a new
+    mapping against them or computing the free CPUs of a host is a single
+    integer operation, and the instance owning each pinned CPU is kept in a
+    reverse map.
+
+    Build it from a single mapping listing with :meth:`build` and keep it
+    current with :meth:`refresh` or :meth:`apply`, or load the allocations
+    of single hosts with :meth:`ensure_host`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # host -> bitmask of the pinned pCPUs
+        self._pinned = {}
+        # host -> set of the instance UUIDs pinned on it
+        self._host_instances = {}
+        # host -> {pCPU: instance UUID}
+        self._cpu_owners = {}
+        # instance UUID -> (host, bitmask of its pCPUs)
+        self._instances = {}
+        # hosts whose allocations were loaded, see ensure_host()
+        self._loaded = set()
+        self._host_locks = {}
+
+    def _add(self, instance_uuid, host, mask):
+        if self._instances.get(instance_uuid) == (host, mask):
+            return
+        self._remove(instance_uuid)
+        self._instances[instance_uuid] = (host, mask)
+        self._host_instances.setdefault(host, set()).add(instance_uuid)
+        self._pinned[host] = self._pinned.get(host, 0) | mask
+        owners = self._cpu_owners.setdefault(host, {})
+        for cpu in cpu_mapping.CPUSet.from_mask(mask):
+            owners.setdefault(cpu, instance_uuid)
+
+    def _remove(self, instance_uuid):
+        entry = self._instances.pop(instance_uuid, None)
+        if entry is None:
+            return
+        host, removed = entry
+        instances = self._host_instances[host]
+        instances.discard(instance_uuid)
+        # NOTE: rebuilt rather than masked out, the CPUs may be shared with
+        # another instance of the host.
+        mask = 0
+        for uuid in instances:
+            mask |= self._instances[uuid][1]
+        self._pinned[host] = mask
+        owners = self._cpu_owners[host]
+        for cpu in cpu_mapping.CPUSet.from_mask(removed):
+            if owners.get(cpu) != instance_uuid:
+                continue
+            del owners[cpu]
+            if mask >> cpu & 1:
+                owners[cpu] = next(uuid for uuid in sorted(instances)
+                                   if self._instances[uuid][1] >> cpu & 1)
+        if not instances:
+            del self._host_instances[host]
+            del self._pinned[host]
+            del self._cpu_owners[host]
+
+    def add(self, instance_uuid, host, mapping):
+        """Record the mapping of an instance pinned on ``host``.
+
+        :param mapping: :class:`cpu_mapping.CPUMapping` or its API notation
+        """
+        mask = _to_mapping(mapping).pcpus.mask
+        with self._lock:
+            self._add(instance_uuid, host, mask)
+
+    def remove(self, instance_uuid):
+        """Forget the mapping of an instance, if any."""
+        with self._lock:
+            self._remove(instance_uuid)
+
+    def load_host(self, name, host):
+        """Record the allocations listed in the resource of host ``name``."""
+        with self._lock:
+            for uuid in list(self._host_instances.get(name, ())):
+                self._remove(uuid)
+            for instance in getattr(host, 'instances', None) or []:
+                uuid = instance.get('uuid')
+                cpu_mappings = instance.get('cpu_mappings')
+                if not uuid or not cpu_mappings:
+                    continue
+                try:
+                    mask = _to_mapping(cpu_mappings).pcpus.mask
+                except ValueError:
+                    LOG.warning("Ignoring the invalid cpu mappings %(cpus)s "
+                                "of instance %(uuid)s on host %(host)s.",
+                                {'cpus': cpu_mappings, 'uuid': uuid,
+                                 'host': name})
+                    continue
+                self._add(uuid, name, mask)
+            self._loaded.add(name)
+
+    def is_loaded(self, host_name):
+        """Whether the allocations of ``host_name`` were loaded."""
+        with self._lock:
+            return host_name in self._loaded
+
+    def ensure_host(self, host_name, loader):
+        """Load the allocations of ``host_name`` unless already loaded.
+
+        :param loader: callable returning the host resource of a host name,
+            called at most once per host
+        """
+        with self._lock:
+            if host_name in self._loaded:
+                return
+            host_lock = self._host_locks.setdefault(host_name,
+                                                    threading.Lock())
+        with host_lock:
+            with self._lock:
+                if host_name in self._loaded:
+                    return
+            self.load_host(host_name, loader(host_name))
+
+    @classmethod
+    def build(cls, manager, filters=None):
+        """Build the index of the whole cloud from a single listing.
+
+        :param manager: :class:`InstanceCPUMapingManager`
+        :param filters: filters of the listing, e.g. ``{'host': name}``
+        """
+        index = cls()
+        index.refresh(manager, filters)
+        return index
+
+    @staticmethod
+    def _entry(mapping):
+        """Return the ``(uuid, host, mask)`` of a mapping resource."""
+        uuid = getattr(mapping, 'instance_uuid', None)
+        host = getattr(mapping, 'host', None)
+        cpu_mappings = getattr(mapping, 'cpu_mappings', None)
+        if not host or not cpu_mappings:
+            return uuid, None, 0
+        try:
+            return uuid, host, _to_mapping(cpu_mappings).pcpus.mask
+        except ValueError:
+            LOG.warning("Ignoring the invalid cpu mappings %(cpus)s of "
+                        "instance %(uuid)s.",
+                        {'cpus': cpu_mappings, 'uuid': uuid})
+            return uuid, None, 0
+
+    def apply(self, mapping):
+        """Record the current state of a single mapping resource.
+
+        A mapping without host or CPUs is removed from the index.
+        """
+        uuid, host, mask = self._entry(mapping)
+        with self._lock:
+            if host is None:
+                self._remove(uuid)
+            else:
+                self._add(uuid, host, mask)
+
+    def refresh(self, manager, filters=None):
+        """Bring the index up to date with a new listing.
+
+        Only the mappings which changed since the last refresh are updated,
+        mappings missing from the listing are removed. The listing is
+        streamed, see :meth:`InstanceCPUMapingManager.iter_list`.
+
+        :param filters: filters of the listing. The index only knows the
+            host of the mappings, so with filters on other attributes the
+            mappings missing from the listing are kept, they may just not
+            match the filters.
+        :returns: number of mappings added, changed or removed
+        """
+        host_filter = (filters or {}).get('host')
+        seen = set()
+        changes = 0
+        with self._lock:
+            if set(filters or ()) - set(['host']):
+                known = set()
+            else:
+                known = set(uuid for uuid, entry in self._instances.items()
+                            if host_filter in (None, entry[0]))
+        for mapping in manager.iter_list(filters=filters):
+            uuid, host, mask = self._entry(mapping)
+            seen.add(uuid)
+            with self._lock:
+                if host is None:
+                    if uuid in self._instances:
+                        self._remove(uuid)
+                        changes += 1
+                elif self._instances.get(uuid) != (host, mask):
+                    self._add(uuid, host, mask)
+                    changes += 1
+        with self._lock:
+            for uuid in known - seen:
+                self._remove(uuid)
+                changes += 1
+        return changes
+
+    def hosts(self):
+        """Return the names of the hosts with pinned CPUs."""
+        with self._lock:
+            return sorted(self._pinned)
+
+    def instances(self, host_name):
+        """Return the UUIDs of the instances pinned on a host."""
+        with self._lock:
+            return sorted(self._host_instances.get(host_name, ()))
+
+    def pinned(self, host_name):
+        """Return the :class:`cpu_mapping.CPUSet` pinned on a host."""
+        return cpu_mapping.CPUSet.from_mask(self._pinned.get(host_name, 0))
+
+    def free(self, host_name, host_cpus):
+        """Return the CPUs of ``host_cpus`` not pinned on a host.
+
+        :param host_cpus: :class:`cpu_mapping.CPUSet` of the host
+        """
+        return cpu_mapping.CPUSet.from_mask(
+            host_cpus.mask & ~self._pinned.get(host_name, 0))
+
+    def owner(self, host_name, cpu):
+        """Return the UUID of the instance pinned on a CPU of a host."""
+        return self._cpu_owners.get(host_name, {}).get(cpu)
+
+    def conflicts(self, host_name, mapping, instance_uuid=None):
+        """Return the pCPUs of ``mapping`` already pinned on ``host_name``.
+
+        The current mapping of ``instance_uuid`` itself is not a conflict.
+        """
+        mask = _to_mapping(mapping).pcpus.mask
+        with self._lock:
+            return cpu_mapping.CPUSet.from_mask(
+                mask & self._pinned_by_others(host_name, instance_uuid))
+
+    def _pinned_by_others(self, host_name, instance_uuid):
+        own = self._instances.get(instance_uuid)
+        if own is None or own[0] != host_name:
+            return self._pinned.get(host_name, 0)
+        mask = 0
+        for uuid in self._host_instances[host_name]:
+            if uuid != instance_uuid:
+                mask |= self._instances[uuid][1]
+        return mask
+
+    def _owners(self, host_name, mask):
+        return sorted(uuid for uuid in self._host_instances.get(host_name, ())
+                      if self._instances[uuid][1] & mask)
+
+    def __len__(self):
+        return len(self._instances)
+
+    def reserve(self, host_name, instance_uuid, mapping):
+        """Atomically check and record a new mapping of ``instance_uuid``.
+
+        :raises exceptions.CPUMappingConflict: if one of the pCPUs of
+            ``mapping`` is pinned by another instance of ``host_name``
+        """
+        mask = _to_mapping(mapping).pcpus.mask
+        with self._lock:
+            conflict = mask & self._pinned_by_others(host_name, instance_uuid)
+            if conflict:
+                owners = [uuid for uuid in self._owners(host_name, conflict)
+                          if uuid != instance_uuid]
+                cpus = cpu_mapping.CPUSet.from_mask(conflict)
+                msg = (_("CPUs %(cpus)s of host %(host)s requested for "
+                         "instance %(uuid)s are already pinned by "
+                         "instance(s) %(owners)s.") %
+                       {'cpus': cpus, 'host': host_name,
+                        'uuid': instance_uuid,
+                        'owners': ', '.join(owners)})
+                raise exceptions.CPUMappingConflict(
+                    msg, host=host_name, instance_uuid=instance_uuid,
+                    cpus=cpus, owners=owners)
+            self._add(instance_uuid, host_name, mask)
@@ -20,14 +20,40 @@ class Host(base.Resource):
     pass
 
 
+class CompactHost(base.CompactResource):
+    __slots__ = ()
+
+
 class HostManager(base.ManagerWithFind):
     resource_class = Host
+    compact_resource_class = CompactHost
+    id_attr = 'host_name'
 
     def get(self, host_name):
-        url = '/hosts/%s' % base.getid(host_name)
+        url = '/hosts/%s' % self._lookup_id(host_name)
         return self._get(url)
 
-    def list(self):
-        url = '/hosts'
+    def iter_many(self, host_names, parallel=None):
+        """Fetch the details of many hosts concurrently.
+
+        Unlike :meth:`get_many`, the hosts are yielded as soon as they are
+        fetched rather than once all of them are.
+
+        :param host_names: iterable of host names or hosts
+        :param parallel: maximum number of concurrent requests
+        :returns: iterator of :class:`base.BulkItem` yielded as each host is
+            fetched, so not in the order of ``host_names``
+        """
+        return self._bulk_iter(self.get, host_names, parallel=parallel)
+
+    def list(self, filters=None, marker=None, limit=None):
+        url = self._build_query(
+            '/hosts', self._page_params(filters, marker, limit))
         return self._list(url, response_key='instances')
 
+    def iter_list(self, filters=None, marker=None, limit=None):
+        """Yield hosts page by page, ``limit`` being the page size."""
+        url = self._build_query(
+            '/hosts', self._page_params(filters, marker, limit))
+        return self._iter(url, response_key='instances')
+
@@ -13,18 +13,171 @@
 #   under the License.
 #
 
+import time
+
 from kongmingclient.common import base
+from kongmingclient.common import cache as response_cache
+from kongmingclient.common import cpu_mapping
+from kongmingclient.common import exceptions
+from kongmingclient.common.i18n import _
+from kongmingclient.common import utils
+from kongmingclient.v1 import cpu_index
+from kongmingclient.v1 import hosts
+
+ACTIVE = 'ACTIVE'
+ERROR = 'ERROR'
+DEFAULT_WAIT_TIMEOUT = 300
+
+
+class _CPUMappingMixin(object):
+    __slots__ = ()
+
+    @property
+    def cpu_mapping(self):
+        """The ``cpu_mappings`` as a :class:`cpu_mapping.CPUMapping`."""
+        return cpu_mapping.CPUMapping.parse(self.cpu_mappings)
 
 
-class InstanceCPUMapping(base.Resource):
+class InstanceCPUMapping(_CPUMappingMixin, base.Resource):
     pass
 
 
+class CompactInstanceCPUMapping(_CPUMappingMixin, base.CompactResource):
+    __slots__ = ()
+
+
+class _MappingWait(object):
+    """Progress of :meth:`InstanceCPUMapingManager.wait_for_mappings`.
+
+    The polling itself is left to the manager, so that the asyncio manager
+    can await it.
+    """
+
+    def __init__(self, order, target_status, timeout, failure_statuses,
+                 callback, min_interval, max_interval):
+        self.order = order
+        self.pending = set(order)
+        self.settled = {}
+        self.target_status = target_status
+        self.final_statuses = set(failure_statuses) | set([target_status])
+        self.callback = callback
+        self.deadline = utils.now() + timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+    def update(self, mappings):
+        """Record the mappings of a polling cycle.
+
+        :returns: seconds to sleep before the next cycle, None once every
+            mapping settled
+        :raises exceptions.WaitTimeout: if some mappings did not settle in
+            time
+        """
+        progress = False
+        for mapping in mappings:
+            uuid = getattr(mapping, 'instance_uuid', None)
+            if (uuid in self.pending and
+                    getattr(mapping, 'status', None) in self.final_statuses):
+                self.pending.discard(uuid)
+                self.settled[uuid] = mapping
+                progress = True
+                if self.callback is not None:
+                    self.callback(mapping)
+        if not self.pending:
+            return None
+
+        remaining = self.deadline - utils.now()
+        if remaining <= 0:
+            msg = (_("Timed out waiting for the cpu mappings of "
+                     "instance(s) %(uuids)s to become %(status)s.") %
+                   {'uuids': ', '.join(sorted(self.pending)),
+                    'status': self.target_status})
+            raise exceptions.WaitTimeout(msg)
+        if progress:
+            self.interval = self.min_interval
+        delay = min(self.interval, remaining)
+        self.interval = min(self.max_interval, self.interval * 2)
+        return delay
+
+    def result(self, resps):
+        return base.ListWithMeta([self.settled[uuid] for uuid in self.order],
+                                 resps)
+
+
 class InstanceCPUMapingManager(base.ManagerWithFind):
     resource_class = InstanceCPUMapping
+    compact_resource_class = CompactInstanceCPUMapping
+    id_attr = 'instance_uuid'
+    filter_attrs = ('host', 'status', 'project_id', 'user_id')
+    detailed_list = True
+    # Manager fetching the hosts of check_host, the client sets it to its
+    # own hosts manager.
+    host_manager = None
+    host_manager_class = hosts.HostManager
+
+    def _hosts(self):
+        if self.host_manager is None:
+            self.host_manager = self.host_manager_class(
+                self.api, lazy_load=self.lazy_load, executor=self._executor)
+        return self.host_manager
 
     def create(self, instance_uuid, cpu_mappings, wait_until_active=False,
-               project_id=None, user_id=None):
+               project_id=None, user_id=None, check_host=None):
+        """Create the CPU mapping of an instance.
+
+        :param cpu_mappings: :class:`cpu_mapping.CPUMapping` or its API
+            notation, e.g. ``0:4,1:5``, sent as given
+        :param check_host: name of the host of the instance. When given, the
+            requested CPUs are first checked against the allocations of the
+            host, a conflict raises :class:`exceptions.CPUMappingConflict`
+            without calling the create API.
+        """
+        return self._create_checked(
+            None, instance_uuid, cpu_mappings,
+            wait_until_active=wait_until_active, project_id=project_id,
+            user_id=user_id, check_host=check_host)
+
+    def _create_checked(self, index, instance_uuid, cpu_mappings,
+                        check_host=None, **kwargs):
+        """Create a mapping checked against the allocations of ``index``.
+
+        :param index: :class:`cpu_index.HostCPUIndex` shared by a batch of
+            creates, None to check a single create against a fresh copy of
+            the allocations of ``check_host``
+        """
+        if check_host is None:
+            return self._create_mapping(instance_uuid, cpu_mappings,
+                                        **kwargs)
+        if index is None:
+            index = cpu_index.HostCPUIndex()
+        requested = self._requested(cpu_mappings)
+        instance_uuid = self._lookup_id(instance_uuid)
+        index.ensure_host(check_host, self._hosts().get)
+        index.reserve(check_host, instance_uuid, requested)
+        try:
+            return self._create_mapping(instance_uuid, cpu_mappings,
+                                        **kwargs)
+        except Exception:
+            index.remove(instance_uuid)
+            raise
+
+    @staticmethod
+    def _requested(cpu_mappings):
+        """Return ``cpu_mappings`` as a :class:`cpu_mapping.CPUMapping`."""
+        if isinstance(cpu_mappings, cpu_mapping.CPUMapping):
+            return cpu_mappings
+        try:
+            return cpu_mapping.CPUMapping.parse(cpu_mappings)
+        except ValueError as e:
+            raise exceptions.ValidationError(str(e))
+
+    def _create_mapping(self, instance_uuid, cpu_mappings,
+                        wait_until_active=False, project_id=None,
+                        user_id=None):
+        if isinstance(cpu_mappings, cpu_mapping.CPUMapping):
+            cpu_mappings = str(cpu_mappings)
+        instance_uuid = self._lookup_id(instance_uuid)
         url = '/instance_cpu_mappings'
         data = {
             'instance_uuid': instance_uuid,
@@ -35,21 +188,182 @@ class InstanceCPUMapingManager(base.ManagerWithFind):
             data['project_id'] = project_id
         if user_id:
             data['user_id'] = user_id
-        return self._create(url, data=data)
+        return self._invalidating(instance_uuid,
+                                  lambda: self._create(url, data=data))
+
+    def bulk_create(self, specs, parallel=None):
+        """Create many mappings concurrently.
+
+        The allocations of each ``check_host`` of the specs are fetched once
+        for the whole batch, and every mapping is also checked against the
+        other mappings of the batch.
+
+        :param specs: iterable of dicts holding the keyword arguments of
+            :meth:`create`
+        :param parallel: maximum number of concurrent requests
+        :returns: :class:`base.BulkResult` in the order of ``specs``
+        """
+        index = cpu_index.HostCPUIndex()
+        return self._bulk(lambda spec: self._create_checked(index, **spec),
+                          specs, parallel=parallel)
+
+    def bulk_delete(self, instance_uuids, parallel=None,
+                    ignore_missing=False):
+        """Delete many mappings concurrently.
 
-    def delete(self, instance_uuid):
-        url = '/instance_cpu_mappings/%s' % base.getid(instance_uuid)
-        return self._delete(url)
+        :param instance_uuids: iterable of instance UUIDs or mappings
+        :param parallel: maximum number of concurrent requests
+        :param ignore_missing: see :meth:`delete`
+        :returns: :class:`base.BulkResult` in the order of ``instance_uuids``
+        """
+        return self._bulk(
+            lambda uuid: self.delete(uuid, ignore_missing=ignore_missing),
+            instance_uuids, parallel=parallel)
+
+    def delete(self, instance_uuid, ignore_missing=False):
+        """Delete the mapping of an instance.
+
+        :param instance_uuid: instance UUID or mapping
+        :param ignore_missing: treat a 404 as the mapping being already gone
+            instead of raising :class:`exceptions.NotFound`
+        """
+        instance_uuid = self._lookup_id(instance_uuid)
+        url = '/instance_cpu_mappings/%s' % instance_uuid
+        try:
+            return self._invalidating(instance_uuid,
+                                      lambda: self._delete(url))
+        except exceptions.NotFound as e:
+            if not ignore_missing:
+                raise
+            return self.convert_into_with_meta(None, e.response)
 
     def get(self, instance_uuid):
-        url = '/instance_cpu_mappings/%s' % base.getid(instance_uuid)
+        url = '/instance_cpu_mappings/%s' % self._lookup_id(instance_uuid)
         return self._get(url)
 
-    def list(self):
-        url = '/instance_cpu_mappings'
+    def list(self, filters=None, marker=None, limit=None):
+        url = self._build_query('/instance_cpu_mappings',
+                                self._page_params(filters, marker, limit))
         return self._list(url, response_key='mappings')
 
+    def iter_list(self, filters=None, marker=None, limit=None):
+        """Yield mappings page by page, ``limit`` being the page size."""
+        url = self._build_query('/instance_cpu_mappings',
+                                self._page_params(filters, marker, limit))
+        return self._iter(url, response_key='mappings')
+
     def update(self, instance_uuid, data):
-        url = '/instance_cpu_mappings/%s' % base.getid(instance_uuid)
-        return self._update(url, data)
+        instance_uuid = self._lookup_id(instance_uuid)
+        url = '/instance_cpu_mappings/%s' % instance_uuid
+        return self._invalidating(instance_uuid,
+                                  lambda: self._update(url, data))
+
+    def wait_for_mappings(self, instance_uuids, target_status=ACTIVE,
+                          timeout=DEFAULT_WAIT_TIMEOUT,
+                          failure_statuses=(ERROR,), callback=None,
+                          min_interval=0.5, max_interval=10, filters=None,
+                          parallel=None):
+        """Wait until the mappings of many instances settle.
+
+        Every polling cycle fetches the pending mappings with concurrent
+        GETs when there are at most ``parallel`` of them, and with a single
+        listing otherwise. The interval between cycles starts at
+        ``min_interval`` and doubles, up to ``max_interval``, while no
+        mapping changes, it goes back to ``min_interval`` as soon as one
+        does.
+
+        :param instance_uuids: iterable of instance UUIDs or mappings
+        :param target_status: status the mappings are expected to reach
+        :param timeout: seconds to wait before giving up
+        :param failure_statuses: statuses which end the wait of a mapping
+            without it reaching ``target_status``
+        :param callback: called with each mapping as soon as it settles
+        :param filters: filters of the listing, e.g. the host of the
+            instances, to keep it small
+        :param parallel: maximum number of concurrent GETs, defaults to
+            base.DEFAULT_BULK_WORKERS
+        :returns: list of the settled mappings in the order of
+            ``instance_uuids``
+        :raises exceptions.WaitTimeout: if some mappings did not settle in
+            time
+        """
+        wait = _MappingWait([self._lookup_id(uuid) for uuid in instance_uuids],
+                            target_status, timeout, failure_statuses,
+                            callback, min_interval, max_interval)
+        workers = parallel or base.DEFAULT_BULK_WORKERS
+        resps = []
+        while wait.pending:
+            delay = wait.update(self._poll(wait.pending, filters, workers,
+                                           resps))
+            if delay is not None:
+                time.sleep(delay)
+        return wait.result(resps)
+
+    def _poll(self, pending, filters, workers, resps):
+        """Return the current mappings of the ``pending`` instance UUIDs.
+
+        The mappings not created yet are left out.
+        """
+        # NOTE: polling must not be answered by the response cache.
+        headers = {'Cache-Control': 'no-cache'}
+        mappings = []
+        if len(pending) > workers:
+            url = self._build_query('/instance_cpu_mappings', filters)
+            for resp, data in self._list_pages(url, response_key='mappings',
+                                               headers=headers):
+                resps.append(resp)
+                mappings.extend(self._to_items(data))
+            return mappings
+
+        results = self._bulk(
+            lambda uuid: self._get('/instance_cpu_mappings/%s' % uuid,
+                                   headers=headers),
+            sorted(pending), parallel=workers)
+        for entry in results:
+            if entry.error is None:
+                mappings.append(entry.result)
+            elif not isinstance(entry.error, exceptions.NotFound):
+                raise entry.error
+        resps.extend(results.request_ids)
+        return mappings
+
+    create_async = base.async_variant('create')
+    delete_async = base.async_variant('delete')
+    update_async = base.async_variant('update')
+    wait_for_mappings_async = base.async_variant('wait_for_mappings')
+
+    def _invalidating(self, instance_uuid, func):
+        """Run the write ``func`` and drop the cache entries it affects.
+
+        The cached mapping and instance of ``instance_uuid`` are dropped
+        together with the hosts they were, or now are, pinned on.
+        """
+        if not isinstance(self.api, response_cache.CachingHTTPClient):
+            return func()
+
+        cache = self.api.cache
+        scope = self.api.scope()
+
+        instance_uuid = self._lookup_id(instance_uuid)
+        urls = ['/instance_cpu_mappings/%s' % instance_uuid,
+                '/instances/%s' % instance_uuid]
+        hosts = set()
+        for url in urls:
+            cached = cache.peek(url, scope)
+            if cached and isinstance(cached[1], dict):
+                hosts.add(cached[1].get('host'))
+        result = None
+        try:
+            result = func()
+            return result
+        finally:
+            hosts.add(getattr(result, '_info', {}).get('host'))
+            hosts.discard(None)
+            for url in urls:
+                cache.invalidate(url)
+            for host in hosts:
+                cache.invalidate('/hosts/%s' % host)
+            for collection in ('instance_cpu_mappings', 'instances',
+                               'hosts'):
+                cache.invalidate_collection(collection)
 
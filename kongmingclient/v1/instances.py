@@ -20,14 +20,27 @@ class Instance(base.Resource):
     pass
 
 
+class CompactInstance(base.CompactResource):
+    __slots__ = ()
+
+
 class InstanceManager(base.ManagerWithFind):
     resource_class = Instance
+    compact_resource_class = CompactInstance
+    detailed_list = True
 
     def get(self, instance_uuid):
         url = '/instances/%s' % base.getid(instance_uuid)
         return self._get(url)
 
-    def list(self):
-        url = '/instances'
+    def list(self, filters=None, marker=None, limit=None):
+        url = self._build_query(
+            '/instances', self._page_params(filters, marker, limit))
         return self._list(url, response_key='instances')
 
+    def iter_list(self, filters=None, marker=None, limit=None):
+        """Yield instances page by page, ``limit`` being the page size."""
+        url = self._build_query(
+            '/instances', self._page_params(filters, marker, limit))
+        return self._iter(url, response_key='instances')
+
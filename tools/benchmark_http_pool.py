@@ -0,0 +1,91 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Compare per-call connections with the pooled HTTPClient transport.
+
+Starts a keep-alive capable stub of the Kongming API on localhost and
+issues the same GET many times, once through the module level
+``requests.request`` (a new connection per call) and once through
+:class:`kongmingclient.common.http.HTTPClient` (pooled session).
+
+Usage: python tools/benchmark_http_pool.py [--requests N]
+"""
+
+import argparse
+import threading
+import time
+
+import requests
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from kongmingclient.common import http
+
+BODY = (b'{"instance_uuid": "0594c66b-6973-405c-ae2c-43fcfc00f2e3", '
+        b'"cpu_mappings": "0:1,1:2", "host": "node-1", '
+        b'"status": "ACTIVE"}')
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def _timeit(func, count):
+    start = time.time()
+    for _i in range(count):
+        func()
+    return (time.time() - start) / count * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    endpoint = 'http://127.0.0.1:%d' % server.server_address[1]
+    url = '/instance_cpu_mappings/0594c66b-6973-405c-ae2c-43fcfc00f2e3'
+
+    unpooled = _timeit(lambda: requests.request('GET', endpoint + url),
+                       args.requests)
+    client = http.HTTPClient(endpoint)
+    pooled = _timeit(lambda: client.get(url), args.requests)
+    client.close()
+    server.shutdown()
+
+    print('requests:          %d' % args.requests)
+    print('per-call connect:  %.3f ms/request' % unpooled)
+    print('pooled session:    %.3f ms/request' % pooled)
+    print('speedup:           %.2fx' % (unpooled / pooled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Compare the JSON codecs available to kongmingclient.
+
+Encodes and decodes a mapping listing and a host listing the size of a large
+deployment with every codec of kongmingclient.common.jsoncodec and reports
+the best time of a few runs.
+
+Usage: python tools/benchmark_json.py [--rows N] [--runs N]
+"""
+
+import argparse
+import timeit
+import uuid
+
+from kongmingclient.common import jsoncodec
+
+
+def _mappings(count):
+    return {'mappings': [
+        {'instance_uuid': str(uuid.uuid4()),
+         'cpu_mappings': '0:%d,1:%d' % (i % 64, (i + 1) % 64),
+         'host': 'node-%d' % (i % 800),
+         'status': 'ACTIVE',
+         'project_id': uuid.uuid4().hex,
+         'user_id': uuid.uuid4().hex,
+         'created_at': '2017-03-01T10:00:00+00:00',
+         'updated_at': None}
+        for i in range(count)]}
+
+
+def _hosts(count):
+    return {'instances': [
+        {'host_name': 'node-%d' % i,
+         'cpu_topology': {'sockets': 2, 'cores': 16, 'threads': 2},
+         'cpus': list(range(64)),
+         'pinned_cpus': list(range(i % 64)),
+         'instance_uuids': [str(uuid.uuid4()) for _ in range(i % 8)]}
+        for i in range(count)]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = (('mappings', _mappings(args.rows)),
+                ('hosts', _hosts(args.rows // 10)))
+    print('%-10s %-8s %10s %10s %10s' % (
+        'payload', 'codec', 'KiB', 'dumps ms', 'loads ms'))
+    for payload_name, payload in payloads:
+        for name, (dumps, loads) in sorted(jsoncodec.CODECS.items()):
+            data = dumps(payload)
+            if not isinstance(data, bytes):
+                data = data.encode('utf-8')
+            dump_time = min(timeit.repeat(lambda: dumps(payload),
+                                          number=1, repeat=args.runs))
+            load_time = min(timeit.repeat(lambda: loads(data),
+                                          number=1, repeat=args.runs))
+            print('%-10s %-8s %10.1f %10.1f %10.1f' % (
+                payload_name, name, len(data) / 1024.0, dump_time * 1000,
+                load_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
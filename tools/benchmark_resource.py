@@ -0,0 +1,85 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Compare memory and CPU cost of Resource and CompactResource.
+
+Builds a mapping listing the size of a large deployment with both resource
+representations and reports the build time, the time to read every column
+and the memory retained by the resources (Python 3 only, tracemalloc).
+CompactResource only saves memory, the timings are reported to check that
+it does not cost CPU time: expect them within run to run noise of each
+other.
+
+Usage: python tools/benchmark_resource.py [--rows N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+
+from kongmingclient.common import base
+
+COLUMNS = ('instance_uuid', 'cpu_mappings', 'host', 'status', 'project_id',
+           'user_id')
+
+
+def _rows(count):
+    return [{'instance_uuid': str(uuid.uuid4()),
+             'cpu_mappings': '0:%d,1:%d' % (i % 64, (i + 1) % 64),
+             'host': 'node-%d' % (i % 800),
+             'status': 'ACTIVE',
+             'project_id': 'project-%d' % (i % 50),
+             'user_id': 'user-%d' % (i % 200)}
+            for i in range(count)]
+
+
+def _measure(resource_class, rows):
+    start = time.time()
+    items = [resource_class(None, row, loaded=True) for row in rows]
+    build = time.time() - start
+
+    start = time.time()
+    for item in items:
+        for column in COLUMNS:
+            getattr(item, column)
+    access = time.time() - start
+
+    del items
+    rows = [dict(row) for row in rows]
+    gc.collect()
+    tracemalloc.start()
+    items = [resource_class(None, row, loaded=True) for row in rows]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return build, access, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    print('%-16s %10s %10s %12s' % ('representation', 'build ms',
+                                    'access ms', 'retained KiB'))
+    for resource_class in (base.Resource, base.CompactResource):
+        build, access, size = _measure(resource_class, _rows(args.rows))
+        print('%-16s %10.1f %10.1f %12.1f' % (resource_class.__name__,
+                                              build * 1000, access * 1000,
+                                              size / 1024.0))
+
+
+if __name__ == '__main__':
+    main()